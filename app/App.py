@@ -1,6 +1,7 @@
 import streamlit as st
-import time
-from utils import apply_theme
+from theme import apply_theme
+from instrumentation import finish_run, stage, start_run
+from warmup import WARMUP_STEPS, start_background_warmup # Light: heavy imports happen inside the warm-up thread
 
 # ───────────────────────────────
 # Streamlit Page Configuration
@@ -11,6 +12,9 @@ st.set_page_config(
     layout="wide"
 )
 
+start_run("App") # Per-stage timings when debugging (?debug=1)
+warmup = start_background_warmup() # Once per process; already running when started by scripts/serve.py
+
 # ───────────────────────────────
 # Apply Custom Theme
 # ───────────────────────────────
@@ -19,15 +23,26 @@ apply_theme()
 # ───────────────────────────────
 # Loading / Intro Screen
 # ───────────────────────────────
-st.markdown("""
-    <div style='text-align:center; margin-top:20%;'>
-        <h2 style='color:#E50914;'>Loading Netflix Analysis App...</h2>
-        <p style='color:#aaa;'>Please wait while we set things up.</p>
-    </div>
-""", unsafe_allow_html=True)
-
-# Short pause for smooth visual transition
-time.sleep(1.5)
+# Painted first; stays up until the shared data and model caches are warm (skipped once the process is warm)
+if not st.session_state.get("warmed_up"):
+    if not warmup.is_ready():
+        splash = st.empty()
+        splash.markdown("""
+            <div style='text-align:center; margin-top:20%;'>
+                <h2 style='color:#E50914;'>Loading Netflix Analysis App...</h2>
+                <p style='color:#aaa;'>Please wait while we set things up.</p>
+            </div>
+        """, unsafe_allow_html=True)
+        progress = st.progress(0.0)
+        with stage("warm-up wait"):
+            for i, (label, _) in enumerate(WARMUP_STEPS):
+                progress.progress(i / len(WARMUP_STEPS), text=f"Loading {label}...")
+                warmup.wait(label)
+        progress.empty()
+        splash.empty()
+    for label, error in warmup.errors().items():
+        st.warning(f"⚠️ Could not prepare {label}: {error}")
+    st.session_state["warmed_up"] = True
 
 # ───────────────────────────────
 # Navigation Entry
@@ -61,4 +76,6 @@ if st.button("🚀 Enter App"):
     except Exception as e:
         st.error(f"Navigation failed: {e}")
 
-st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("</div>", unsafe_allow_html=True)
+
+finish_run()
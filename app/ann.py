@@ -0,0 +1,171 @@
+"""
+Approximate nearest-neighbour search for large catalogs
+
+- Projects the TF-IDF rows to ~128 dense dimensions with TruncatedSVD
+- Clusters the projected rows into inverted lists (IVF) with k-means
+- Answers a query by scanning only the nprobe closest lists, then re-ranks the candidates
+  with the exact sparse cosine similarity
+- Saves / loads the index as memory-mappable .npy files next to the other model artifacts
+"""
+
+from typing import Optional, Sequence, Tuple
+import os
+import numpy as np
+from scipy import sparse
+
+from recommender import top_k
+
+# Artifact name prefix inside app/models
+ANN_INDEX_FILE = "ann"
+
+# Catalog size from which the neighbour index is built through the ANN index instead of exact all-pairs search
+ANN_MIN_TITLES = 200_000
+
+DEFAULT_COMPONENTS = 128
+DEFAULT_NPROBE = 16
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalise the rows of a dense matrix (zero rows stay zero)
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class IVFIndex:
+    """
+    SVD projection + inverted lists over k-means clusters
+
+    components: (d, V) projection, centroids: (L, d), vectors: (N, d) projected rows,
+    list_items: row positions grouped by list, list_offsets: (L + 1,) boundaries into list_items.
+    """
+
+    def __init__(self, components: np.ndarray, centroids: np.ndarray, vectors: np.ndarray,
+                 list_items: np.ndarray, list_offsets: np.ndarray):
+        self.components = components
+        self.centroids = centroids
+        self.vectors = vectors
+        self.list_items = list_items
+        self.list_offsets = list_offsets
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.list_offsets) - 1
+
+    def project(self, rows) -> np.ndarray:
+        """
+        Project sparse TF-IDF rows (e.g. a free-text query) into the index space
+        """
+        return _normalize_rows(np.asarray(rows @ self.components.T, dtype=np.float32))
+
+    def candidates(self, query_vectors: np.ndarray, nprobe: int = DEFAULT_NPROBE) -> list:
+        """
+        Row positions stored in the nprobe lists closest to each query vector
+        """
+        nprobe = max(1, min(nprobe, self.n_lists))
+        cent_scores = np.atleast_2d(query_vectors) @ self.centroids.T
+        probes = np.argpartition(-cent_scores, nprobe - 1, axis=1)[:, :nprobe]
+        return [
+            np.concatenate([self.list_items[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists])
+            for lists in probes
+        ]
+
+    def search(self, tfidf_matrix, idxs: Sequence[int], k: int = 10, nprobe: int = DEFAULT_NPROBE,
+               rerank: bool = True, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k neighbours of catalog titles (the title itself is excluded)
+
+        With rerank the candidates are scored with the exact sparse cosine similarity, otherwise
+        with the projected vectors. Returns (indices, scores) of shape (Q, k); rows with fewer
+        than k candidates are padded with -1 / -inf. allowed (see filters.py) drops candidates before scoring.
+        """
+        idxs = np.asarray(idxs, dtype=np.int64)
+        return self._search(tfidf_matrix, tfidf_matrix[idxs] if rerank else None, self.vectors[idxs], k, nprobe, idxs, allowed)
+
+    def search_rows(self, tfidf_matrix, query_rows, k: int = 10, nprobe: int = DEFAULT_NPROBE,
+                    allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k titles for sparse TF-IDF query rows that are not in the catalog (e.g. free text)
+        """
+        query_rows = sparse.csr_matrix(query_rows, dtype=np.float32)
+        return self._search(tfidf_matrix, query_rows, self.project(query_rows), k, nprobe, allowed=allowed)
+
+    def _search(self, tfidf_matrix, query_rows, query_vectors, k, nprobe, exclude=None, allowed=None) -> Tuple[np.ndarray, np.ndarray]:
+        n_queries = len(query_vectors)
+        indices = np.full((n_queries, k), -1, dtype=np.int32)
+        scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        for row, cands in enumerate(self.candidates(query_vectors, nprobe)):
+            if allowed is not None:
+                cands = cands[allowed[cands]]
+            if query_rows is not None:
+                sims = np.asarray((query_rows[row] @ tfidf_matrix[cands].T).toarray(), dtype=np.float32).ravel()
+            else:
+                sims = self.vectors[cands] @ query_vectors[row]
+            self_pos = np.flatnonzero(cands == exclude[row]) if exclude is not None else []
+            top, top_scores = top_k(sims, k, exclude=int(self_pos[0]) if len(self_pos) else None)
+            indices[row, :len(top)], scores[row, :len(top)] = cands[top], top_scores
+        return indices, scores
+
+
+def build_ann_index(tfidf_matrix, n_components: int = DEFAULT_COMPONENTS, n_lists: Optional[int] = None,
+                    random_state: int = 42) -> IVFIndex:
+    """
+    Fit the SVD projection and the k-means lists over the TF-IDF matrix
+
+    n_lists defaults to ~sqrt(N), so the centroid scan and each list hold about sqrt(N) items.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import TruncatedSVD
+
+    X = sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+    n_components = max(1, min(n_components, X.shape[1] - 1, X.shape[0] - 1))
+    svd = TruncatedSVD(n_components=n_components, random_state=random_state).fit(X)
+    components = svd.components_.astype(np.float32)
+    vectors = _normalize_rows(np.asarray(X @ components.T, dtype=np.float32))
+
+    n_lists = n_lists or int(np.sqrt(X.shape[0]))
+    n_lists = max(1, min(n_lists, X.shape[0]))
+    kmeans = MiniBatchKMeans(n_clusters=n_lists, batch_size=4096, n_init=3, random_state=random_state).fit(vectors)
+    centroids = _normalize_rows(kmeans.cluster_centers_.astype(np.float32))
+
+    assign = np.argmax(vectors @ centroids.T, axis=1) # Same rule as the query-side probe
+    list_items = np.argsort(assign, kind="stable").astype(np.int32)
+    list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))]).astype(np.int64)
+    return IVFIndex(components, centroids, vectors, list_items, list_offsets)
+
+
+def recall_at_k(approx: np.ndarray, exact: np.ndarray, k: int = 10) -> float:
+    """
+    Mean share of the exact top-k found in the approximate top-k
+    """
+    approx, exact = np.asarray(approx)[:, :k], np.asarray(exact)[:, :k]
+    hits = [len(np.intersect1d(a[a >= 0], e)) for a, e in zip(approx, exact)]
+    return float(np.mean(hits) / k) if len(hits) else 0.0
+
+
+def has_ann_index(model_dir: str) -> bool:
+    """
+    True when the ANN index arrays exist in model_dir
+    """
+    return os.path.exists(os.path.join(model_dir, f"{ANN_INDEX_FILE}.list_offsets.npy"))
+
+
+def save_ann_index(model_dir: str, index: IVFIndex) -> str:
+    """
+    Save the ANN index into model_dir as raw .npy files
+    """
+    path = os.path.join(model_dir, ANN_INDEX_FILE)
+    for name in ("components", "centroids", "vectors", "list_items", "list_offsets"):
+        np.save(f"{path}.{name}.npy", np.ascontiguousarray(getattr(index, name)))
+    return path
+
+
+def load_ann_index(model_dir: str, mmap_mode: Optional[str] = "r") -> IVFIndex:
+    """
+    Load the ANN index from model_dir (memory-mapped by default)
+    """
+    path = os.path.join(model_dir, ANN_INDEX_FILE)
+    arrays = [np.load(f"{path}.{name}.npy", mmap_mode=mmap_mode)
+              for name in ("components", "centroids", "vectors", "list_items", "list_offsets")]
+    return IVFIndex(*arrays)
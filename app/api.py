@@ -0,0 +1,340 @@
+"""
+HTTP / JSON recommendation API, served next to (or without) the Streamlit UI
+
+- GET /recommend?title=...&k=... (or q=... for a free-text query), optional filters type / rating / country /
+  genre (repeatable) and year_min / year_max; POST /recommend/batch with {"queries": [{...}, ...]};
+  GET /health with the served model version and batching counters
+- Stdlib ThreadingHTTPServer (one thread per connection, HTTP/1.1 keep-alive); every request thread hands its
+  queries to one MicroBatcher, which coalesces what queued up while the previous batch ran into a single
+  sparse (queries × vocabulary) × (vocabulary × titles) product followed by one top-k selection
+- Unfiltered title queries within the stored depth are answered from the neighbour table without scoring
+- Models come from artifacts.load_recommender(): one in-memory (memory-mapped) index per process, shared
+  with the Streamlit sessions when both run in the same process, and following the CURRENT model version
+"""
+
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import json
+import queue
+import threading
+import time
+import numpy as np
+from scipy import sparse
+
+from recommender import top_k_batch
+
+DEFAULT_K = 10
+MAX_K = 100
+MAX_BATCH_QUERIES = 1000 # Per POST /recommend/batch
+
+# Micro-batching: a batch takes every query queued while the previous one ran (up to MAX_BATCH), then waits
+# up to MAX_WAIT_MS for more; 0 keeps single-client latency unchanged and still batches under load
+MAX_BATCH = 64
+MAX_WAIT_MS = 0.0
+REQUEST_TIMEOUT = 30.0
+
+# Upper bound on the dense score block (queries × titles floats) of one product
+MAX_BLOCK_CELLS = 1 << 24
+
+FILTER_PARAMS = {"type": "types", "rating": "ratings", "country": "countries", "genre": "genres"}
+
+
+class BadRequest(ValueError):
+    """
+    Invalid query; answered with status (400, or 404 for unknown titles) and a JSON error body
+    """
+
+    def __init__(self, message: str, status: int = 400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+# ───────────────────── Micro-batching ─────────────────────
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and processes them in batches on one worker thread
+
+    process(items) -> results (same order); an exception raised for the batch fails every item of it.
+    """
+
+    def __init__(self, process: Callable[[List[Any]], List[Any]], max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS, name: str = "netflix-api-batcher"):
+        self.process = process
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()] # Block until work arrives
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = self.process([item for item, _ in batch])
+            except Exception as e: # noqa: BLE001 - surfaced to every waiting request
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        return {"batches": self.batches, "queries": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0}
+
+
+# ───────────────────── Recommendation service ─────────────────────
+def _load_models():
+    from artifacts import load_recommender # Imports streamlit; only when serving
+
+    return load_recommender()
+
+
+class RecommendationService:
+    """
+    Parses queries, batches them and answers them against the served model version
+    """
+
+    def __init__(self, models_loader: Callable[[], Any] = _load_models, max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS):
+        self.models_loader = models_loader
+        self.batcher = MicroBatcher(self._answer_batch, max_batch, max_wait_ms)
+
+    @property
+    def models(self):
+        return self.models_loader() # Cached per model version; re-reads the CURRENT pointer
+
+    # Parsing
+    def parse(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalise one query ({"title" | "q", "k", filters}) into what the batch worker needs
+        """
+        models = self.models
+        try:
+            k = int(params.get("k", DEFAULT_K))
+        except (TypeError, ValueError):
+            raise BadRequest("k must be an integer")
+        if not 1 <= k <= MAX_K:
+            raise BadRequest(f"k must be between 1 and {MAX_K}")
+
+        query: Dict[str, Any] = {"k": k, "models": models}
+        title, text = params.get("title"), params.get("q")
+        if bool(title) == bool(text):
+            raise BadRequest("give exactly one of 'title' or 'q'")
+        if title:
+            title_index = models["title_index"]
+            matches = title_index.lookup(str(title))
+            if not matches:
+                suggestions = [title_index.label(i) for i in title_index.suggest(str(title), 5)]
+                raise BadRequest(f"title not found: {title}", status=404, suggestions=suggestions)
+            query["idx"] = matches[0]
+        else:
+            query["text"] = str(text)
+
+        filters = {arg: _as_list(params.get(name)) for name, arg in FILTER_PARAMS.items()}
+        for name in ("year_min", "year_max"):
+            if params.get(name) not in (None, ""):
+                try:
+                    filters[name] = int(params[name])
+                except (TypeError, ValueError):
+                    raise BadRequest(f"{name} must be an integer")
+        if any(filters.values()) or "year_min" in filters or "year_max" in filters:
+            filter_index = models["filter_index"]
+            if filter_index is None:
+                raise BadRequest("filters are not available for this model version")
+            query["allowed"] = filter_index.mask(**filters)
+        return query
+
+    # Answering
+    def recommend(self, params: Dict[str, Any], timeout: float = REQUEST_TIMEOUT) -> Dict[str, Any]:
+        return self.batcher.submit(self.parse(params)).result(timeout)
+
+    def recommend_many(self, queries: List[Dict[str, Any]], timeout: float = REQUEST_TIMEOUT) -> List[Dict[str, Any]]:
+        """
+        Answers in order; a query that fails validation gets {"error": ...} instead of failing the request
+        """
+        futures: List[Any] = []
+        for params in queries:
+            try:
+                futures.append(self.batcher.submit(self.parse(params if isinstance(params, dict) else {})))
+            except BadRequest as e:
+                futures.append(_error_body(e))
+        return [f.result(timeout) if isinstance(f, Future) else f for f in futures]
+
+    def _answer_batch(self, queries: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Answer a batch: neighbour-table lookups directly, everything else through one scored product
+        """
+        results: List[Any] = [None] * len(queries)
+        scored = []
+        for i, query in enumerate(queries):
+            neighbor_idx = query["models"]["neighbor_idx"]
+            if "idx" in query and "allowed" not in query and query["k"] <= neighbor_idx.shape[1]:
+                top = np.asarray(neighbor_idx[query["idx"], :query["k"]])
+                top_scores = np.asarray(query["models"]["neighbor_scores"][query["idx"], :query["k"]])
+                results[i] = self._format(query, top, top_scores)
+            else:
+                scored.append(i)
+
+        # Queries of one batch normally share the model version; group anyway in case CURRENT moved mid-batch
+        by_version: Dict[str, List[int]] = {}
+        for i in scored:
+            by_version.setdefault(queries[i]["models"].version, []).append(i)
+        for positions in by_version.values():
+            models = queries[positions[0]]["models"]
+            for i, answer in zip(positions, self._score(models, [queries[i] for i in positions])):
+                results[i] = answer
+        return results
+
+    def _score(self, models, queries: List[Dict[str, Any]]) -> List[Any]:
+        tfidf_matrix = models["tfidf_matrix"]
+        rows = []
+        for query in queries:
+            rows.append(tfidf_matrix[query["idx"]] if "idx" in query else models["text_encoder"](query["text"]))
+        query_rows = sparse.vstack(rows, format="csr")
+
+        answers = []
+        block = max(1, MAX_BLOCK_CELLS // max(tfidf_matrix.shape[0], 1))
+        for start in range(0, len(queries), block):
+            batch = queries[start:start + block]
+            # One product for the whole batch: titles × vocabulary times vocabulary × queries (the CSR matrix is never transposed)
+            sims = np.ascontiguousarray((tfidf_matrix @ query_rows[start:start + block].T).toarray().T, dtype=np.float32)
+            for row, query in enumerate(batch):
+                if "allowed" in query:
+                    sims[row, ~query["allowed"]] = -np.inf
+                if "idx" in query:
+                    sims[row, query["idx"]] = -np.inf
+                else:
+                    sims[row, sims[row] <= 0] = -np.inf # Free text: titles sharing no term are not results
+            k_max = max(query["k"] for query in batch)
+            indices, scores = top_k_batch(sims, k_max)
+            for row, query in enumerate(batch):
+                answers.append(self._format(query, indices[row, :query["k"]], scores[row, :query["k"]]))
+        return answers
+
+    @staticmethod
+    def _format(query: Dict[str, Any], indices: np.ndarray, scores: np.ndarray) -> Dict[str, Any]:
+        models = query["models"]
+        title_index = models["title_index"]
+        keep = (indices >= 0) & np.isfinite(scores)
+        return {
+            "query": title_index.label(query["idx"]) if "idx" in query else query["text"],
+            "model_version": models.version,
+            "results": [{"title": title_index.titles[i], "label": title_index.label(i), "score": round(float(s), 4)}
+                        for i, s in zip(indices[keep].tolist(), scores[keep].tolist())],
+        }
+
+    def health(self) -> Dict[str, Any]:
+        models = self.models
+        return {"status": "ok", "model_version": models.version, "titles": models.manifest.get("rows"),
+                **self.batcher.stats()}
+
+
+def _as_list(value) -> List[str]:
+    if value in (None, ""):
+        return []
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+def _error_body(error: BadRequest) -> Dict[str, Any]:
+    return {"error": str(error), **error.details}
+
+
+# ───────────────────── HTTP layer ─────────────────────
+class RecommendationHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the server's RecommendationService; every response is JSON
+    """
+
+    protocol_version = "HTTP/1.1" # Keep-alive, so clients can reuse connections
+    server_version = "NetflixRecommender/1.0"
+    disable_nagle_algorithm = True # Headers and body go out in separate writes; Nagle + delayed ACK would add ~40 ms
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._respond(200, self.server.service.health())
+        if url.path != "/recommend":
+            return self._respond(404, {"error": f"no route {url.path}"})
+        params = {name: values if name in FILTER_PARAMS else values[-1]
+                  for name, values in parse_qs(url.query).items()}
+        self._call(lambda: self.server.service.recommend(params))
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/recommend/batch":
+            return self._respond(404, {"error": f"no route {self.path}"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError:
+            return self._respond(400, {"error": "body must be JSON"})
+        queries = body.get("queries") if isinstance(body, dict) else None
+        if not isinstance(queries, list) or not 0 < len(queries) <= MAX_BATCH_QUERIES:
+            return self._respond(400, {"error": f"body must be {{\"queries\": [...]}} with 1 to {MAX_BATCH_QUERIES} queries"})
+        self._call(lambda: {"results": self.server.service.recommend_many(queries)})
+
+    def _call(self, answer: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self._respond(200, answer())
+        except BadRequest as e:
+            self._respond(e.status, _error_body(e))
+        except Exception as e: # noqa: BLE001 - the server must answer every request
+            self._respond(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _respond(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass # Per-request access logs would dominate the cost of a lookup
+
+
+class RecommendationServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], service: RecommendationService):
+        super().__init__(address, RecommendationHandler)
+        self.service = service
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8502, service: Optional[RecommendationService] = None,
+                **batching) -> RecommendationServer:
+    """
+    Bound (not yet serving) API server; port 0 picks a free port (see server.server_address)
+    """
+    return RecommendationServer((host, port), service or RecommendationService(**batching))
+
+
+def start_in_background(host: str = "127.0.0.1", port: int = 8502, **batching) -> RecommendationServer:
+    """
+    Serve the API from a daemon thread (e.g. next to the Streamlit server) and return the server
+    """
+    server = make_server(host, port, **batching)
+    threading.Thread(target=server.serve_forever, name="netflix-api", daemon=True).start()
+    return server
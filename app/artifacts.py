@@ -0,0 +1,293 @@
+"""
+Model artifacts for the recommender
+
+- Downloads the fitted vectorizer and data reference from Hugging Face when missing (see model_fetch.py)
+- Derives the memory-mappable arrays (sparse TF-IDF matrix, neighbour index, ANN index for large catalogs,
+  hybrid scoring feature blocks) and the title / filter indexes once, published as a registry version
+  (see registry.py)
+- Serves the version CURRENT points at through one process-wide cached resource shared by every session;
+  each component is loaded on first use, so a query mode only pays for the files it reads
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ann import ANN_INDEX_FILE, ANN_MIN_TITLES, build_ann_index, has_ann_index, load_ann_index, save_ann_index
+from data_store import read_clean
+from filters import FILTER_FIELDS, FILTER_INDEX_FILE, FilterIndex, load_filter_index, save_filter_index
+from genres import build_genre_matrix, genre_rows, load_genre_matrix
+from hybrid import HYBRID_FILE, HYBRID_COLUMNS, HybridFeatures, HybridScorer, has_hybrid_features, load_hybrid_features, save_hybrid_features
+from instrumentation import timed
+from model_fetch import fetch_models, missing_files
+from recommender import (
+    DEFAULT_TOP_K,
+    NEIGHBORS_FILE,
+    TFIDF_MATRIX_FILE,
+    TextQueryEncoder,
+    build_neighbor_index,
+    has_neighbor_index,
+    has_tfidf_matrix,
+    load_neighbor_index,
+    load_tfidf_matrix,
+    save_neighbor_index,
+    save_tfidf_matrix,
+)
+from registry import (
+    component_of,
+    current_version,
+    discard_staging,
+    link_or_copy,
+    publish_version,
+    read_manifest,
+    stage_version,
+    version_dir,
+)
+from title_index import TITLE_INDEX_FILE, TitleIndex, load_title_index, save_title_index
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODEL_DIR = os.path.join(PROJECT_ROOT, "app", "models")
+
+# ───────────────────── Hugging Face model files (URLs + SHA-256 in model_manifest.json) ─────────────────────
+MODEL_FILES = {
+    "tfidf": "tfidf_vectorizer.pkl",
+    "data_ref": "data_reference.pkl",
+}
+
+# ───────────────────── Components of a version ─────────────────────
+# Loaded key -> registry component (file name prefix) it reads
+COMPONENT_FILES = {
+    "tfidf": component_of(MODEL_FILES["tfidf"]),
+    "text_encoder": component_of(MODEL_FILES["tfidf"]),
+    "df_ref": component_of(MODEL_FILES["data_ref"]),
+    "tfidf_matrix": TFIDF_MATRIX_FILE,
+    "neighbor_idx": NEIGHBORS_FILE,
+    "neighbor_scores": NEIGHBORS_FILE,
+    "title_index": component_of(TITLE_INDEX_FILE),
+    "filter_index": component_of(FILTER_INDEX_FILE),
+    "ann_index": ANN_INDEX_FILE,
+    "hybrid": HYBRID_FILE,
+}
+DERIVED_COMPONENTS = {c for key, c in COMPONENT_FILES.items() if key not in ("tfidf", "text_encoder", "df_ref")} | {"refresh_state"}
+
+# Keys each query mode reads (the warm-up preloads the default title mode)
+QUERY_MODES = {
+    "title": ("title_index", "neighbor_idx", "filter_index", "tfidf_matrix", "hybrid"), # Default weights rank with hybrid
+    "text": ("title_index", "text_encoder", "tfidf_matrix", "filter_index", "ann_index"),
+    "filtered": ("tfidf_matrix", "ann_index"),
+    "hybrid": ("tfidf_matrix", "hybrid", "ann_index"),
+}
+
+_BUILD_LOCK = threading.Lock()
+
+
+def download_missing(model_dir: str = MODEL_DIR) -> None:
+    """
+    Fetch any missing model file from Hugging Face (streamed, verified, in parallel)
+    """
+    missing = missing_files(model_dir)
+    if missing:
+        st.info(f"📥 Downloading {', '.join(missing)}...")
+        fetch_models(model_dir)
+        st.success(f"✅ Downloaded {', '.join(missing)}")
+
+
+def build_artifacts(directory: str) -> None:
+    """
+    Derive every missing artifact in directory from the vectorizer and data reference stored there
+    """
+    title_index_path = os.path.join(directory, TITLE_INDEX_FILE)
+    filter_index_path = os.path.join(directory, FILTER_INDEX_FILE)
+
+    need_ref = not (has_tfidf_matrix(directory) and os.path.exists(title_index_path) and os.path.exists(filter_index_path)
+                    and has_hybrid_features(directory))
+    df_ref = joblib.load(os.path.join(directory, MODEL_FILES["data_ref"])) if need_ref else None
+    if not has_tfidf_matrix(directory):
+        tfidf = joblib.load(os.path.join(directory, MODEL_FILES["tfidf"]))
+        save_tfidf_matrix(directory, tfidf.transform(df_ref["combined_features"]))
+
+    tfidf_matrix = load_tfidf_matrix(directory)
+    use_ann = tfidf_matrix.shape[0] >= ANN_MIN_TITLES # Exact all-pairs search stops scaling here
+    if use_ann and not has_ann_index(directory):
+        save_ann_index(directory, build_ann_index(tfidf_matrix))
+    if not has_neighbor_index(directory):
+        if use_ann:
+            neighbors = load_ann_index(directory).search(tfidf_matrix, np.arange(tfidf_matrix.shape[0]), DEFAULT_TOP_K)
+        else:
+            neighbors = build_neighbor_index(tfidf_matrix)
+        save_neighbor_index(directory, *neighbors)
+
+    if not os.path.exists(title_index_path):
+        details = catalog_details(df_ref, ["type", "release_year"])
+        if details is None:
+            details = pd.DataFrame(index=df_ref.index, columns=["type", "release_year"])
+        save_title_index(directory, TitleIndex(df_ref["title"], details["type"], details["release_year"]))
+    need_filters, need_hybrid = not os.path.exists(filter_index_path), not has_hybrid_features(directory)
+    if need_filters or need_hybrid:
+        details = catalog_details(df_ref, list(dict.fromkeys([*FILTER_FIELDS.values(), "date_added_year", *HYBRID_COLUMNS])))
+        if details is not None: # Without per-title details the page hides the filters and scores on text only
+            genres = catalog_genres(df_ref, details) # One genre matrix for both indexes
+            if need_filters:
+                save_filter_index(directory, FilterIndex(details, genres))
+            if need_hybrid:
+                save_hybrid_features(directory, HybridFeatures.from_details(details, genres))
+
+
+def ensure_artifacts(model_dir: str = MODEL_DIR) -> str:
+    """
+    Version of the artifacts to serve, publishing a first one when the registry is empty
+
+    The downloaded files come from Hugging Face and stay in model_dir as the download cache; derived files
+    are built once in a staging directory (or taken over from an older flat model_dir) and published together.
+    """
+    version = current_version(model_dir)
+    if version is not None:
+        return version
+    with _BUILD_LOCK: # One first build per process; concurrent callers wait for it
+        version = current_version(model_dir)
+        if version is not None:
+            return version
+        download_missing(model_dir)
+        staging = stage_version(model_dir)
+        try:
+            for name in os.listdir(model_dir):
+                path = os.path.join(model_dir, name)
+                if name in MODEL_FILES.values():
+                    link_or_copy(path, os.path.join(staging, name))
+                elif component_of(name) in DERIVED_COMPONENTS and os.path.isfile(path):
+                    os.replace(path, os.path.join(staging, name)) # Flat layout from before the registry
+            build_artifacts(staging)
+            return publish_version(model_dir, staging, note="initial build")
+        except BaseException:
+            discard_staging(staging)
+            raise
+
+
+def catalog_details(df_ref: pd.DataFrame, columns: List[str], partial: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Per-title columns aligned with the data reference, or None when they are not available
+
+    Columns the reference does not carry come from the cleaned dataset: matched on show_id for references
+    with one, by position for older ones, whose rows line up with the cleaned dataset. With partial, show_ids
+    the cleaned dataset does not have come back as empty rows instead of the whole lookup failing.
+    """
+    if set(columns).issubset(df_ref.columns):
+        return df_ref[columns]
+    if "show_id" in df_ref.columns:
+        df_clean = read_clean(["show_id", *[c for c in columns if c != "show_id"]]).drop_duplicates("show_id")
+        details = df_clean.set_index(df_clean["show_id"].astype(str)).reindex(df_ref["show_id"].astype(str))
+        if details["show_id"].isna().any() and not partial:
+            return None
+        return details[columns].set_axis(df_ref.index)
+    df_clean = read_clean(columns)
+    return df_clean if len(df_clean) == len(df_ref) else None
+
+
+def catalog_genres(df_ref: pd.DataFrame, details: pd.DataFrame) -> Tuple[List[str], Any]:
+    """
+    (vocabulary, genre matrix) aligned with the data reference
+
+    When the genres come from the cleaned dataset (catalog_details), the rows are taken from its persisted
+    genre matrix (matched the same way); genres carried by the reference itself are parsed from details.
+    """
+    if "genres_str" not in df_ref.columns:
+        if "show_id" in df_ref.columns:
+            ids = read_clean(["show_id"])["show_id"].astype(str)
+            first = ~ids.duplicated().to_numpy()
+            found = pd.Index(ids[first]).get_indexer(df_ref["show_id"].astype(str))
+            rows = np.flatnonzero(first)[found] if (found >= 0).all() else None
+        else:
+            rows = np.arange(len(df_ref)) # catalog_details only matches older references by position
+        if rows is not None:
+            return genre_rows(*load_genre_matrix(), rows)
+    return build_genre_matrix(details["genres_str"])
+
+
+class RecommenderModels(Mapping):
+    """
+    The components of one model version, each loaded on first access
+
+    Keys are the recommender's components; a query only maps the files it touches (e.g. a title lookup
+    never unpickles the vectorizer). Components missing from the version load as None.
+    """
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        self.directory = directory
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self._loaded: Dict[str, Any] = {}
+        self._locks = {key: threading.Lock() for key in COMPONENT_FILES}
+
+    def _load(self, key: str) -> Any:
+        d = self.directory
+        if key == "tfidf":
+            return joblib.load(os.path.join(d, MODEL_FILES["tfidf"]))
+        if key == "text_encoder":
+            return TextQueryEncoder(self["tfidf"]) # Free-text queries; the LRU cache is shared by every session
+        if key == "df_ref":
+            return joblib.load(os.path.join(d, MODEL_FILES["data_ref"]))
+        if key == "tfidf_matrix":
+            return load_tfidf_matrix(d, mmap_mode="r")
+        if key in ("neighbor_idx", "neighbor_scores"):
+            return load_neighbor_index(d, mmap_mode="r")[key == "neighbor_scores"]
+        if key == "title_index":
+            return load_title_index(d)
+        if key == "filter_index":
+            return load_filter_index(d)
+        if key == "ann_index":
+            return load_ann_index(d, mmap_mode="r")
+        if key == "hybrid":
+            return HybridScorer(self["tfidf_matrix"], load_hybrid_features(d, mmap_mode="r"))
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in COMPONENT_FILES:
+            raise KeyError(key)
+        with self._locks[key]: # Concurrent sessions wait for one load
+            if key not in self._loaded:
+                self._loaded[key] = self._load(key) if self.available(key) else None
+        return self._loaded[key]
+
+    def __iter__(self):
+        return iter(COMPONENT_FILES)
+
+    def __len__(self) -> int:
+        return len(COMPONENT_FILES)
+
+    def available(self, key: str) -> bool:
+        """
+        True when the version ships the files behind key (checked in the manifest, nothing is loaded)
+        """
+        return COMPONENT_FILES[key] in self.manifest["components"]
+
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
+
+    def preload(self, keys) -> "RecommenderModels":
+        for key in keys:
+            self[key]
+        return self
+
+
+@st.cache_resource(show_spinner=False, max_entries=2) # The served version and the one it replaced
+def _open_version(model_dir: str, version: str) -> RecommenderModels:
+    return RecommenderModels(version_dir(model_dir, version), read_manifest(model_dir, version))
+
+
+@timed()
+def load_recommender(model_dir: str = MODEL_DIR) -> RecommenderModels:
+    """
+    Lazily loaded components of the version CURRENT points at, shared by every session of the process
+
+    The pointer is read on every call, so publishing or rolling back a version (scripts/07_model_versions.py)
+    takes effect on the next rerun without a restart. The .npy components are memory-mapped read-only,
+    so all sessions (and all server processes on the box) share one copy through the OS page cache.
+    """
+    return _open_version(model_dir, ensure_artifacts(model_dir))
@@ -0,0 +1,165 @@
+"""
+Pre-aggregated data cube behind the cross-filtered dashboard
+
+- One cell per non-empty (date_added_year, type, rating, primary_country, genre combination) with its
+  title count, built once per data version and stored as a compact .npz (small integer codes + counts)
+- Genres are multi-valued, so the cube keys on each title's genre combination and keeps a
+  combination × genre incidence matrix: a title is counted once per chart under any genre filter
+- A filter is a boolean lookup table per dimension; a slice masks the cells and sums them per chart
+  with np.bincount, so its cost follows the number of non-empty cells, which stops growing once the
+  dimension values are covered, not the number of titles
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import numpy as np
+
+# Cleaned dataset columns the cube is built from
+CUBE_COLUMNS = ["date_added_year", "type", "rating", "primary_country", "genres_str"]
+# Cube dimensions (cell code arrays), in CUBE_COLUMNS order
+DIMENSIONS = ("year", "type", "rating", "country", "genres")
+MISSING_YEAR = -1
+
+
+def _code_dtype(n_values: int) -> np.dtype:
+    return np.dtype(np.uint8 if n_values <= 1 << 8 else np.uint16 if n_values <= 1 << 16 else np.int32)
+
+
+class DataCube:
+    """
+    Title counts per non-empty combination of the dashboard dimensions
+    """
+
+    def __init__(self, labels: Dict[str, np.ndarray], codes: Dict[str, np.ndarray], counts: np.ndarray,
+                 genre_labels: np.ndarray, incidence: np.ndarray):
+        self.labels = labels # dimension -> label per code (years as ints, others as str)
+        self.codes = codes # dimension -> code per cell
+        self.counts = counts # titles per cell
+        self.genre_labels = genre_labels
+        self.incidence = incidence # genre combination × genre, 1 where the combination contains the genre
+
+    @classmethod
+    def from_frame(cls, df, genres: Optional[Tuple[List[str], object]] = None) -> "DataCube":
+        """
+        Aggregate a cleaned titles frame (CUBE_COLUMNS) into a cube
+
+        genres is the (vocabulary, genre matrix) row-aligned with df (genres.load_genre_matrix for the whole
+        cleaned dataset); the combination incidence then comes from its rows instead of parsing genres_str.
+        """
+        import pandas as pd
+        from genres import build_genre_matrix, genre_rows
+
+        years = pd.to_numeric(df["date_added_year"], errors="coerce").fillna(MISSING_YEAR).astype(np.int32)
+        columns = [years] + [df[c].astype("string").fillna("").str.strip() for c in CUBE_COLUMNS[1:]]
+        labels, title_codes = {}, []
+        for dim, values in zip(DIMENSIONS, columns):
+            codes, uniques = pd.factorize(values.to_numpy(), sort=True)
+            labels[dim] = np.asarray(uniques, dtype=np.int32 if dim == "year" else str)
+            title_codes.append(codes)
+
+        cells, counts = np.unique(np.column_stack(title_codes), axis=0, return_counts=True)
+        codes = {dim: cells[:, i].astype(_code_dtype(len(labels[dim]))) for i, dim in enumerate(DIMENSIONS)}
+
+        if genres is not None:
+            first = np.unique(title_codes[-1], return_index=True)[1] # One title per genre combination
+            vocab, incidence = genre_rows(*genres, first)
+        else:
+            vocab, incidence = build_genre_matrix(labels["genres"]) # One row per genre combination
+        return cls(labels, codes, counts.astype(np.int32), np.asarray(vocab, dtype=str), incidence.toarray())
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.counts)
+
+    def values(self, field: str) -> List[str]:
+        """
+        Filterable values of type / rating / country / genre, sorted
+        """
+        if field == "genre":
+            return self.genre_labels.tolist()
+        return [v for v in self.labels[field].tolist() if v != ""]
+
+    def year_range(self) -> tuple:
+        """
+        (min, max) date_added_year over the catalog
+        """
+        known = self.labels["year"][self.labels["year"] != MISSING_YEAR]
+        return (int(known.min()), int(known.max())) if len(known) else (MISSING_YEAR, MISSING_YEAR)
+
+    def _lookup(self, dim: str, selected: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        if not selected:
+            return None
+        return np.isin(self.labels[dim], list(selected))
+
+    def slice(self, types: Optional[Sequence[str]] = None, ratings: Optional[Sequence[str]] = None,
+              countries: Optional[Sequence[str]] = None, genres: Optional[Sequence[str]] = None,
+              year_min: Optional[int] = None, year_max: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Chart totals of the titles passing every given filter (same semantics as FilterIndex.mask)
+
+        Returns {"titles": int, "year_type": years × types, "rating_type": ratings × types,
+        "country": per country, "genre": per genre}.
+        """
+        lookups = {"type": self._lookup("type", types), "rating": self._lookup("rating", ratings),
+                   "country": self._lookup("country", countries)}
+        if genres:
+            lookups["genres"] = self.incidence[:, np.isin(self.genre_labels, list(genres))].any(axis=1)
+        if year_min is not None or year_max is not None:
+            years = self.labels["year"]
+            in_range = years != MISSING_YEAR
+            if year_min is not None:
+                in_range &= years >= year_min
+            if year_max is not None:
+                in_range &= years <= year_max
+            lookups["year"] = in_range
+
+        keep = np.ones(self.n_cells, dtype=bool)
+        for dim, ok in lookups.items():
+            if ok is not None:
+                keep &= ok[self.codes[dim]]
+        codes = {dim: self.codes[dim][keep].astype(np.int64) for dim in DIMENSIONS}
+        weights = self.counts[keep]
+
+        n = {dim: len(self.labels[dim]) for dim in DIMENSIONS}
+        def totals(dims: Sequence[str]) -> np.ndarray:
+            flat = codes[dims[0]]
+            for dim in dims[1:]:
+                flat = flat * n[dim] + codes[dim]
+            size = int(np.prod([n[d] for d in dims]))
+            return np.bincount(flat, weights=weights, minlength=size).astype(np.int64).reshape([n[d] for d in dims])
+
+        return {
+            "titles": int(weights.sum()),
+            "year_type": totals(("year", "type")),
+            "rating_type": totals(("rating", "type")),
+            "country": totals(("country",)),
+            "genre": totals(("genres",)) @ self.incidence.astype(np.int64),
+        }
+
+
+def save_cube(path: str, cube: DataCube) -> str:
+    """
+    Write the cube as one .npz (atomically, so concurrent readers never see a partial file)
+    """
+    arrays = {f"labels_{dim}": cube.labels[dim] for dim in DIMENSIONS}
+    arrays.update({f"codes_{dim}": cube.codes[dim] for dim in DIMENSIONS})
+    arrays.update(counts=cube.counts, genre_labels=cube.genre_labels, incidence=cube.incidence)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def read_cube(path: str) -> DataCube:
+    """
+    Read a cube written by save_cube
+    """
+    with np.load(path, allow_pickle=False) as f:
+        return DataCube(
+            labels={dim: f[f"labels_{dim}"] for dim in DIMENSIONS},
+            codes={dim: f[f"codes_{dim}"] for dim in DIMENSIONS},
+            counts=f["counts"],
+            genre_labels=f["genre_labels"],
+            incidence=f["incidence"],
+        )
@@ -0,0 +1,115 @@
+"""
+Columnar data store for the cleaned Netflix titles
+
+- Fixed, typed schema: categoricals for low-cardinality text, Int16 years, native datetimes
+- Writes netflix_titles_clean.parquet next to the cleaned CSV
+- Reads only the requested columns, from Parquet when present and from the CSV otherwise, whole or in chunks
+"""
+
+from typing import Iterator, Optional, Sequence
+import os
+import pandas as pd
+
+CLEAN_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "cleaned"))
+CLEAN_CSV = os.path.join(CLEAN_DIR, "netflix_titles_clean.csv")
+CLEAN_PARQUET = os.path.join(CLEAN_DIR, "netflix_titles_clean.parquet")
+
+# Column -> dtype of the cleaned dataset (date_added is parsed separately)
+SCHEMA = {
+    "title": "string",
+    "show_id": "string",
+    "type": "category",
+    "release_year": "Int16",
+    "primary_country": "category",
+    "genres_str": "category",
+    "rating": "category",
+    "date_added": "datetime64[ns]",
+    "date_added_year": "Int16",
+    "date_added_month": "Int8",
+    "director_primary": "string",
+    "cast_primary": "string",
+    "metadata": "string",
+}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the columns of a cleaned frame to SCHEMA (columns outside SCHEMA are left untouched)
+    """
+    df = df.copy()
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith("datetime"):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype.startswith("Int"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def write_clean_parquet(df: pd.DataFrame, path: str = CLEAN_PARQUET) -> str:
+    """
+    Write the cleaned frame as Parquet with the fixed schema
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    apply_schema(df).to_parquet(path, index=False)
+    return path
+
+
+def read_clean(columns: Optional[Sequence[str]] = None, cleaned_folder: str = CLEAN_DIR) -> pd.DataFrame:
+    """
+    Read the cleaned dataset with the typed schema, loading only the requested columns
+
+    Parquet is used when it exists; otherwise the CSV is parsed with the same dtypes,
+    so callers always get the same column types.
+    """
+    columns = list(columns) if columns is not None else None
+    csv_path = os.path.join(cleaned_folder, os.path.basename(CLEAN_CSV))
+    parquet_path = os.path.join(cleaned_folder, os.path.basename(CLEAN_PARQUET))
+
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path, columns=columns)
+
+    dtypes = {c: t for c, t in SCHEMA.items() if not t.startswith(("datetime", "Int")) and (columns is None or c in columns)}
+    df = pd.read_csv(csv_path, usecols=columns, dtype=dtypes)
+    if columns is not None:
+        df = df[columns] # usecols keeps file order; match the Parquet column order
+    return apply_schema(df)
+
+
+def iter_clean(columns: Sequence[str], chunksize: int = 50_000, path: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the cleaned dataset (or a cleaned CSV / Parquet file at path) in typed chunks of at most chunksize rows
+
+    Only the requested columns are read, and only one chunk is in memory at a time.
+    """
+    columns = list(columns)
+    if path is None:
+        path = CLEAN_PARQUET if os.path.exists(CLEAN_PARQUET) else CLEAN_CSV
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield apply_schema(batch.to_pandas())
+        return
+    dtypes = {c: t for c, t in SCHEMA.items() if not t.startswith(("datetime", "Int")) and c in columns}
+    for chunk in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize):
+        yield apply_schema(chunk[columns])
+
+
+def arrow_schema(columns: Sequence[str]):
+    """
+    pyarrow schema matching SCHEMA, so Parquet files written chunk by chunk read back with the same dtypes
+    """
+    import pyarrow as pa
+
+    arrow_types = {
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "Int16": pa.int16(),
+        "Int8": pa.int8(),
+        "datetime64[ns]": pa.timestamp("ns"),
+    }
+    return pa.schema([(col, arrow_types[SCHEMA[col]]) for col in columns])
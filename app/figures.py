@@ -0,0 +1,244 @@
+"""
+Precomputed Plotly figures for the Dashboards page
+
+- Builds the four dashboard figures once per data version (hash of the source files)
+- Keeps the figure JSON in memory with st.cache_data and on disk, so a new process starts warm
+- Every chart is built from a slice of the data cube (cube.py), so the cross-filtered figure sets
+  never rescan the titles; each filter selection's figures are cached as well
+- Pages only turn ready-made JSON back into figures
+"""
+
+from typing import Any, Dict, Sequence, Tuple
+import hashlib
+import json
+import os
+import numpy as np
+import streamlit as st
+
+from cube import CUBE_COLUMNS, MISSING_YEAR, DataCube, read_cube, save_cube
+from data_store import CLEAN_DIR, CLEAN_PARQUET, read_clean
+from instrumentation import stage, timed
+from theme import THEME
+
+# Bump when the figure code below changes, so cached payloads from older code are not reused
+FIGURES_VERSION = "2"
+
+# Figure payloads and the data cube, persisted next to the data they were built from
+FIGURE_CACHE_DIR = "figure_cache"
+
+_file_hashes: Dict[tuple, str] = {}
+
+
+def file_hash(path: str) -> str:
+    """
+    SHA-256 of a file's content, memoised per (path, size, mtime) so unchanged files are hashed once per process
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def source_files(cleaned_folder: str = CLEAN_DIR) -> Sequence[str]:
+    """
+    Files the dashboard figures are built from
+    """
+    clean = os.path.join(cleaned_folder, os.path.basename(CLEAN_PARQUET))
+    if not os.path.exists(clean):
+        clean = os.path.join(cleaned_folder, "netflix_titles_clean.csv")
+    return [clean]
+
+
+def data_version(cleaned_folder: str = CLEAN_DIR) -> str:
+    """
+    Short hash identifying the current source data + figure code
+    """
+    digest = hashlib.sha256(FIGURES_VERSION.encode())
+    for path in source_files(cleaned_folder):
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def register_theme() -> None:
+    """
+    Register the dark Netflix Plotly template and make it the default
+    """
+    import plotly.io as pio
+
+    pio.templates["netflix_dark"] = pio.templates["plotly_dark"]
+    pio.templates["netflix_dark"].layout.update(
+        paper_bgcolor=THEME["background"],
+        plot_bgcolor=THEME["background_alt"],
+        font=dict(family="Aptos, sans-serif", color=THEME["text_primary"]),
+        colorway=[THEME["highlight"], THEME["accent1"], THEME["secondary"], THEME["primary"]],
+    )
+    pio.templates.default = "netflix_dark"
+
+
+def figures_from_slice(cube: DataCube, totals: Dict[str, np.ndarray]) -> Dict[str, str]:
+    """
+    Build the four dashboard figures from one cube slice and return them as JSON strings
+    """
+    import pandas as pd # Only needed when a figure set is not cached yet
+    import plotly.express as px
+
+    register_theme()
+    labels = cube.labels
+    type_colors = {"Movie": THEME["highlight"], "TV Show": THEME["accent1"], "Tv Show": THEME["accent1"]}
+
+    def long_form(rows: np.ndarray, row_name: str, grid: np.ndarray) -> pd.DataFrame:
+        frame = pd.DataFrame(grid, index=pd.Index(rows, name=row_name), columns=pd.Index(labels["type"], name="type"))
+        frame = frame.stack().reset_index(name="count")
+        return frame[(frame["count"] > 0) & (frame["type"] != "")]
+
+    # Plotly 1 – Titles by Year and Type (titles without a date added are left out)
+    year_type = long_form(labels["year"], "date_added_year", totals["year_type"])
+    fig_year_type = px.bar(
+        year_type[year_type["date_added_year"] != MISSING_YEAR],
+        x="date_added_year", y="count", color="type",
+        barmode="group",
+        color_discrete_map=type_colors,
+        labels={"date_added_year": "Year", "count": "Number of Titles"},
+    )
+
+    # Plotly 2 – Titles by Rating and Type (runtime values containing 'min' removed)
+    rating_counts = long_form(labels["rating"], "rating", totals["rating_type"])
+    rating_counts = rating_counts[
+        (rating_counts["rating"] != "") & ~rating_counts["rating"].str.contains("min", case=False)
+    ].sort_values("count", ascending=False)
+    fig_ratings = px.bar(
+        rating_counts,
+        x="count", y="rating", color="type",
+        orientation="h",
+        barmode="stack",
+        color_discrete_map=type_colors,
+        labels={"count": "Number of Titles", "rating": "Rating"},
+    )
+
+    # Plotly 3 – Top 10 Countries (missing / 'Unknown' dropped)
+    country_counts = pd.DataFrame({"country": labels["country"], "title_count": totals["country"]})
+    country_counts = country_counts[
+        ~country_counts["country"].isin(["", "Unknown"]) & (country_counts["title_count"] > 0)
+    ].sort_values("title_count", ascending=False, kind="stable")
+    fig_country = px.bar(
+        country_counts.head(10),
+        x="title_count", y="country",
+        orientation="h",
+        color="title_count",
+        color_continuous_scale=[THEME["accent2"], THEME["accent1"], THEME["highlight"]],
+        labels={"country": "Country", "title_count": "Number of Titles"},
+    )
+
+    # Plotly 4 – Top 15 Genres (a title counts once for each of its genres)
+    genre_counts = pd.DataFrame({"genre": cube.genre_labels, "title_count": totals["genre"]})
+    genre_counts = genre_counts[genre_counts["title_count"] > 0]
+    fig_genre = px.bar(
+        genre_counts.sort_values("title_count", ascending=False, kind="stable").head(15),
+        x="title_count", y="genre",
+        orientation="h",
+        color="title_count",
+        color_continuous_scale=[THEME["accent2"], THEME["accent1"], THEME["highlight"]],
+        labels={"genre": "Genre", "title_count": "Number of Titles"},
+    )
+
+    return {
+        "year_type": fig_year_type.to_json(),
+        "ratings": fig_ratings.to_json(),
+        "country": fig_country.to_json(),
+        "genre": fig_genre.to_json(),
+    }
+
+
+@timed()
+def build_figures(cleaned_folder: str = CLEAN_DIR) -> Dict[str, str]:
+    """
+    Build the unfiltered dashboard figures
+    """
+    cube = load_cube(cleaned_folder)
+    return figures_from_slice(cube, cube.slice())
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _cube_for_version(version: str, cleaned_folder: str) -> DataCube:
+    """
+    Data cube for one data version, shared read-only by every session: disk cache first, otherwise built and persisted
+    """
+    path = os.path.join(cleaned_folder, FIGURE_CACHE_DIR, f"cube-{version}.npz")
+    if os.path.exists(path):
+        return read_cube(path)
+    from genres import load_genre_matrix
+
+    # The one pass over the titles; genre combinations read their rows of the persisted genre matrix
+    cube = DataCube.from_frame(read_clean(CUBE_COLUMNS, cleaned_folder), load_genre_matrix(cleaned_folder))
+    save_cube(path, cube)
+    return cube
+
+
+@timed()
+def load_cube(cleaned_folder: str = CLEAN_DIR) -> DataCube:
+    """
+    Data cube for the current data (dimension values for the filter widgets, slices for the charts)
+    """
+    return _cube_for_version(data_version(cleaned_folder), cleaned_folder)
+
+
+@st.cache_data(max_entries=4)
+def _figures_for_version(version: str, cleaned_folder: str) -> Dict[str, str]:
+    """
+    Figure JSON for one data version: disk cache first, otherwise built and persisted
+    """
+    cache_dir = os.path.join(cleaned_folder, FIGURE_CACHE_DIR)
+    path = os.path.join(cache_dir, f"{version}.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    figures = build_figures(cleaned_folder)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(figures, f)
+    os.replace(tmp, path) # Other processes never read a half-written cache file
+    return figures
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _filtered_figures(version: str, cleaned_folder: str, filters: Tuple[Tuple[str, Any], ...]) -> Dict[str, str]:
+    """
+    Figure JSON for one filter selection: a slice of the cube, never a pass over the titles
+    """
+    cube = _cube_for_version(version, cleaned_folder)
+    return figures_from_slice(cube, cube.slice(**dict(filters)))
+
+
+def active_filters(**filters) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Hashable, order-independent form of the set filters (empty selections and None dropped)
+    """
+    active = []
+    for name, value in sorted(filters.items()):
+        if value is None or (isinstance(value, (list, tuple, set)) and not value):
+            continue
+        active.append((name, tuple(sorted(value)) if isinstance(value, (list, tuple, set)) else value))
+    return tuple(active)
+
+
+@timed()
+def load_figures(cleaned_folder: str = CLEAN_DIR, **filters) -> Dict[str, str]:
+    """
+    Figure JSON for the current data, keyed by a hash of the source files
+
+    filters are DataCube.slice() arguments (types, ratings, countries, genres, year_min, year_max);
+    without any, the precomputed unfiltered figures are returned.
+    """
+    with stage("data_version"):
+        version = data_version(cleaned_folder)
+    active = active_filters(**filters)
+    if not active:
+        return _figures_for_version(version, cleaned_folder)
+    return _filtered_figures(version, cleaned_folder, active)
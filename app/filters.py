@@ -0,0 +1,127 @@
+"""
+Bitmap indexes for filtered recommendations
+
+- One packed bitset per value of type, rating, primary_country and genre (columns of the genre matrix)
+- date_added_year kept as a compact int16 array for range filters
+- Filters combine with bitwise OR (within a field) and AND (across fields) into one boolean mask,
+  which the recommender applies before top-k selection
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import os
+import joblib
+import numpy as np
+import pandas as pd
+
+from genres import build_genre_matrix
+
+# Artifact file name inside app/models
+FILTER_INDEX_FILE = "filter_index.pkl"
+
+# Field name -> cleaned dataset column
+FILTER_FIELDS = {
+    "type": "type",
+    "rating": "rating",
+    "country": "primary_country",
+    "genre": "genres_str",
+}
+MISSING_YEAR = -1
+
+
+class FilterIndex:
+    """
+    Packed bitsets over catalog rows (row order = data reference order)
+
+    genres is the (vocabulary, genre matrix) row-aligned with details, parsed from genres_str when not given.
+    """
+
+    def __init__(self, details: pd.DataFrame, genres: Optional[Tuple[List[str], object]] = None):
+        details = details.reset_index(drop=True)
+        self.n_rows = len(details)
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        for field, column in FILTER_FIELDS.items():
+            if field == "genre":
+                genres = genres if genres is not None else build_genre_matrix(details[column])
+                self.bitmaps[field] = self._from_matrix(*genres) # One bitmap per genre column
+                continue
+            values = details[column].astype("string").fillna("")
+            self.bitmaps[field] = self._build(values.index.to_numpy(), values.to_numpy(dtype=object))
+        years = pd.to_numeric(details["date_added_year"], errors="coerce")
+        self.years = years.fillna(MISSING_YEAR).astype(np.int16).to_numpy()
+
+    def _build(self, rows: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+        codes, uniques = pd.factorize(values)
+        bitmaps = {}
+        for code, value in enumerate(uniques):
+            if value == "":
+                continue
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[rows[codes == code]] = True
+            bitmaps[str(value)] = np.packbits(mask)
+        return bitmaps
+
+    def _from_matrix(self, vocab: List[str], matrix) -> Dict[str, np.ndarray]:
+        columns = matrix.tocsc()
+        bitmaps = {}
+        for j, genre in enumerate(vocab):
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[columns.indices[columns.indptr[j]:columns.indptr[j + 1]]] = True
+            bitmaps[genre] = np.packbits(mask)
+        return bitmaps
+
+    def values(self, field: str) -> List[str]:
+        """
+        Filterable values of a field, sorted
+        """
+        return sorted(self.bitmaps[field])
+
+    def year_range(self) -> tuple:
+        """
+        (min, max) date_added_year over the catalog
+        """
+        known = self.years[self.years != MISSING_YEAR]
+        return (int(known.min()), int(known.max())) if len(known) else (MISSING_YEAR, MISSING_YEAR)
+
+    def _any_of(self, field: str, selected: Iterable[str]) -> np.ndarray:
+        empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        bitmaps = [self.bitmaps[field].get(value, empty) for value in selected]
+        return np.bitwise_or.reduce(bitmaps) if bitmaps else empty
+
+    def mask(self, types: Optional[Sequence[str]] = None, ratings: Optional[Sequence[str]] = None,
+             countries: Optional[Sequence[str]] = None, genres: Optional[Sequence[str]] = None,
+             year_min: Optional[int] = None, year_max: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the rows passing every given filter, or None when no filter is set
+
+        Values of one field are OR-ed ('Drama' or 'Comedies'), fields are AND-ed.
+        """
+        packed = None
+        for field, selected in (("type", types), ("rating", ratings), ("country", countries), ("genre", genres)):
+            if selected:
+                bits = self._any_of(field, selected)
+                packed = bits if packed is None else packed & bits
+        result = None if packed is None else np.unpackbits(packed, count=self.n_rows).view(bool)
+        if year_min is not None or year_max is not None:
+            in_range = self.years != MISSING_YEAR
+            if year_min is not None:
+                in_range &= self.years >= year_min
+            if year_max is not None:
+                in_range &= self.years <= year_max
+            result = in_range if result is None else result & in_range
+        return result
+
+
+def save_filter_index(model_dir: str, index: FilterIndex) -> str:
+    """
+    Save the filter index into model_dir
+    """
+    path = os.path.join(model_dir, FILTER_INDEX_FILE)
+    joblib.dump(index, path)
+    return path
+
+
+def load_filter_index(model_dir: str) -> FilterIndex:
+    """
+    Load the filter index from model_dir
+    """
+    return joblib.load(os.path.join(model_dir, FILTER_INDEX_FILE))
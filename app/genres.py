@@ -0,0 +1,129 @@
+"""
+Sparse multi-hot genre matrix (titles × genres) built from the pipe-joined genres_str column
+
+- Each distinct genre combination is parsed once; title rows are gathered from those parsed rows,
+  so no per-title string splitting and no exploded frame
+- Written by scripts/02_clean.py next to the cleaned dataset (genre_matrix.npz: vocabulary + CSR arrays,
+  rows in cleaned-dataset order) and derived again from genres_str when missing or older than the data
+- Consumers over the cleaned titles take its rows (genre_rows) instead of splitting genres_str again
+- Genre counts and genre-Jaccard similarity are sparse products over the matrix
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from data_store import CLEAN_DIR, CLEAN_CSV, CLEAN_PARQUET, read_clean
+
+GENRE_SEPARATOR = "|"
+GENRE_MATRIX_FILE = "genre_matrix.npz"
+
+
+class GenreMatrixBuilder:
+    """
+    Accumulates genre rows chunk by chunk (the vocabulary grows as new genres appear)
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._blocks: List[sp.csr_matrix] = []
+
+    def add(self, genres: Sequence[str]) -> None:
+        """
+        Append one row per value of genres ('A|B|C' strings; missing / empty values give empty rows)
+        """
+        codes, combos = pd.factorize(pd.Series(genres, dtype="string").fillna("").to_numpy(dtype=object))
+        indptr, indices = [0], []
+        for combo in combos:
+            tokens = {g.strip() for g in str(combo).split(GENRE_SEPARATOR)} - {""}
+            indices.extend(sorted(self._ids.setdefault(g, len(self._ids)) for g in tokens))
+            indptr.append(len(indices))
+        per_combo = sp.csr_matrix((np.ones(len(indices), dtype=np.uint8), indices, indptr),
+                                  shape=(len(combos), len(self._ids)))
+        self._blocks.append(per_combo[codes])
+
+    def finish(self) -> Tuple[List[str], sp.csr_matrix]:
+        """
+        (vocabulary sorted alphabetically, CSR uint8 matrix with one row per added value)
+        """
+        vocab = sorted(self._ids)
+        n_genres = len(vocab)
+        blocks = [sp.csr_matrix((b.data, b.indices, b.indptr), shape=(b.shape[0], n_genres)) for b in self._blocks]
+        matrix = sp.vstack(blocks, format="csr") if blocks else sp.csr_matrix((0, n_genres), dtype=np.uint8)
+        new_column = np.empty(n_genres, dtype=np.int32)
+        new_column[[self._ids[g] for g in vocab]] = np.arange(n_genres, dtype=np.int32)
+        matrix.indices = new_column[matrix.indices]
+        matrix.sort_indices()
+        return vocab, matrix
+
+
+def build_genre_matrix(genres: Sequence[str]) -> Tuple[List[str], sp.csr_matrix]:
+    """
+    (vocabulary, titles × genres multi-hot CSR matrix) for a genres_str column
+    """
+    builder = GenreMatrixBuilder()
+    builder.add(genres)
+    return builder.finish()
+
+
+# ───────────────────── Products over the matrix ─────────────────────
+def genre_counts(matrix: sp.csr_matrix) -> np.ndarray:
+    """
+    Titles per genre
+    """
+    return np.asarray(matrix.sum(axis=0, dtype=np.int64)).ravel()
+
+
+def genre_rows(vocab: Sequence[str], matrix: sp.csr_matrix, rows: np.ndarray) -> Tuple[List[str], sp.csr_matrix]:
+    """
+    (vocabulary, matrix) of the given rows only; genres none of them carries are dropped
+    """
+    subset = matrix[rows]
+    used = genre_counts(subset) > 0
+    return [g for g, keep in zip(vocab, used) if keep], subset[:, used]
+
+
+def genre_jaccard(matrix: sp.csr_matrix, idx: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Jaccard similarity of title idx's genre set with every title (or with rows), float32
+
+    Titles without genres score 0.
+    """
+    candidates = matrix if rows is None else matrix[rows]
+    query = matrix[idx].astype(np.int32)
+    shared = np.asarray((candidates @ query.T).todense()).ravel()
+    sizes = np.diff(candidates.indptr)
+    union = sizes + query.nnz - shared
+    return np.divide(shared, union, out=np.zeros(len(shared), dtype=np.float32), where=union > 0).astype(np.float32)
+
+
+# ───────────────────── Persistence ─────────────────────
+def save_genre_matrix(vocab: Sequence[str], matrix: sp.csr_matrix, cleaned_folder: str = CLEAN_DIR) -> str:
+    """
+    Write the vocabulary and the CSR arrays as one .npz next to the cleaned dataset (atomically)
+    """
+    path = os.path.join(cleaned_folder, GENRE_MATRIX_FILE)
+    tmp = f"{path}.tmp.npz"
+    np.savez_compressed(tmp, vocab=np.asarray(vocab, dtype=str), data=matrix.data, indices=matrix.indices,
+                        indptr=matrix.indptr, shape=np.asarray(matrix.shape))
+    os.replace(tmp, path)
+    return path
+
+
+def load_genre_matrix(cleaned_folder: str = CLEAN_DIR) -> Tuple[List[str], sp.csr_matrix]:
+    """
+    (vocabulary, matrix) aligned with the cleaned dataset rows, derived and saved first when missing or stale
+    """
+    path = os.path.join(cleaned_folder, GENRE_MATRIX_FILE)
+    sources = [os.path.join(cleaned_folder, os.path.basename(f)) for f in (CLEAN_PARQUET, CLEAN_CSV)]
+    data_mtime = max((os.path.getmtime(p) for p in sources if os.path.exists(p)), default=0.0)
+    if os.path.exists(path) and os.path.getmtime(path) >= data_mtime:
+        with np.load(path, allow_pickle=False) as f:
+            matrix = sp.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+            return f["vocab"].tolist(), matrix
+
+    vocab, matrix = build_genre_matrix(read_clean(["genres_str"], cleaned_folder)["genres_str"])
+    save_genre_matrix(vocab, matrix, cleaned_folder)
+    return vocab, matrix
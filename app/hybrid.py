@@ -0,0 +1,168 @@
+"""
+Hybrid multi-signal scoring for the recommender
+
+- One feature block per signal, row-aligned with the data reference and stored as memory-mappable .npy files:
+  text (the existing TF-IDF matrix), genre (multi-hot matrix, Jaccard), people (director / lead cast one-hots,
+  cosine), country (primary country codes, exact match) and recency (release-year freshness, query-independent)
+- A query computes each weighted signal over the candidate rows (whole catalog or a given candidate set)
+  and combines them with one weights × signals product; no N × N structure, so weights can change per query
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from genres import build_genre_matrix, genre_jaccard
+from recommender import load_csr, save_csr, top_k
+
+# Artifact name prefix inside app/models
+HYBRID_FILE = "hybrid"
+
+# Cleaned dataset columns the feature blocks are built from
+HYBRID_COLUMNS = ["genres_str", "director_primary", "cast_primary", "primary_country", "release_year"]
+
+SIGNALS = ("text", "genre", "people", "country", "recency")
+DEFAULT_WEIGHTS = {"text": 0.6, "genre": 0.2, "people": 0.1, "country": 0.05, "recency": 0.05}
+TEXT_ONLY = {"text": 1.0}
+
+# Release years this far behind the newest title halve the recency signal
+RECENCY_HALF_LIFE = 5.0
+UNKNOWN = -1
+
+
+class HybridFeatures:
+    """
+    Per-signal feature blocks (rows = data reference order)
+    """
+
+    def __init__(self, genre: sparse.csr_matrix, people: sparse.csr_matrix, country: np.ndarray, recency: np.ndarray):
+        self.genre = genre # titles × genres, 1 where the title has the genre
+        self.people = people # titles × names, L2-normalised rows (director and lead cast in separate columns)
+        self.country = country # int32 code per title, UNKNOWN when missing
+        self.recency = recency # float32 in (0, 1], 1 for the newest release year
+
+    @classmethod
+    def from_details(cls, details: pd.DataFrame, genres: Optional[Tuple[List[str], sparse.csr_matrix]] = None) -> "HybridFeatures":
+        """
+        Build every block from per-title details (HYBRID_COLUMNS)
+
+        genres is the (vocabulary, genre matrix) row-aligned with details, parsed from genres_str when not given.
+        """
+        details = details.reset_index(drop=True)
+        _, genre = genres if genres is not None else build_genre_matrix(details["genres_str"])
+
+        columns, offset = [], 0
+        for column in ("director_primary", "cast_primary"):
+            names = details[column].astype("string").str.strip().replace({"": pd.NA, "Unknown": pd.NA})
+            codes, uniques = pd.factorize(names) # NA -> -1
+            columns.append(np.where(codes >= 0, codes + offset, -1))
+            offset += len(uniques)
+        codes = np.column_stack(columns)
+        rows = np.repeat(np.arange(len(details)), codes.shape[1])
+        known = codes.ravel() >= 0
+        people = sparse.csr_matrix((np.ones(known.sum(), dtype=np.float32), (rows[known], codes.ravel()[known])),
+                                   shape=(len(details), offset))
+        norms = np.sqrt(np.diff(people.indptr)).astype(np.float32)
+        people.data /= np.repeat(np.maximum(norms, 1), np.diff(people.indptr))
+
+        country = details["primary_country"].astype("string").replace({"": pd.NA, "Unknown": pd.NA})
+        country = pd.factorize(country)[0].astype(np.int32) # NA -> -1 == UNKNOWN
+
+        years = pd.to_numeric(details["release_year"], errors="coerce").to_numpy(dtype=np.float64)
+        newest = np.nanmax(years) if np.isfinite(years).any() else 0.0
+        recency = np.where(np.isfinite(years), 0.5 ** ((newest - years) / RECENCY_HALF_LIFE), 0.0).astype(np.float32)
+        return cls(sparse.csr_matrix(genre, dtype=np.float32), people, country, recency)
+
+
+class HybridScorer:
+    """
+    Weighted sum of per-signal similarities between one title and a set of candidate titles
+    """
+
+    def __init__(self, tfidf_matrix, features: HybridFeatures):
+        self.tfidf_matrix = tfidf_matrix
+        self.features = features
+
+    def _signal(self, name: str, idx: int, rows: Optional[np.ndarray]) -> np.ndarray:
+        f = self.features
+        pick = (lambda block: block) if rows is None else (lambda block: block[rows])
+        if name == "text":
+            return np.asarray((pick(self.tfidf_matrix) @ self.tfidf_matrix[idx].T).toarray(), dtype=np.float32).ravel()
+        if name == "genre":
+            return genre_jaccard(f.genre, idx, rows)
+        if name == "people":
+            return np.asarray((pick(f.people) @ f.people[idx].T).toarray(), dtype=np.float32).ravel()
+        if name == "country":
+            return ((pick(f.country) == f.country[idx]) & (f.country[idx] != UNKNOWN)).astype(np.float32)
+        if name == "recency":
+            return np.asarray(pick(f.recency), dtype=np.float32)
+        raise KeyError(f"Unknown signal {name!r}; expected one of {SIGNALS}")
+
+    def signals(self, idx: int, rows: Optional[np.ndarray] = None,
+                names: Sequence[str] = SIGNALS) -> Dict[str, np.ndarray]:
+        """
+        {signal: float32 similarity of title idx with every row (or with rows)}, each in [0, 1]
+        """
+        return {name: self._signal(name, idx, rows) for name in names}
+
+    def scores(self, idx: int, weights: Dict[str, float], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Combined score of title idx against every row (or rows): weights · signals, signals with zero weight skipped
+        """
+        active = [name for name in SIGNALS if weights.get(name, 0.0) > 0]
+        n = self.tfidf_matrix.shape[0] if rows is None else len(rows)
+        if not active:
+            return np.zeros(n, dtype=np.float32)
+        stacked = np.vstack([self._signal(name, idx, rows) for name in active]) # (signals, candidates)
+        return np.asarray([weights[name] for name in active], dtype=np.float32) @ stacked
+
+    def similar(self, idx: int, k: int = 10, weights: Optional[Dict[str, float]] = None,
+                allowed: Optional[np.ndarray] = None, candidates: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k titles for title idx under the given weights, optionally within a filter mask / candidate set
+
+        candidates (e.g. ANN or neighbour-table results) bounds the work on large catalogs; by default
+        every title is scored.
+        """
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        if candidates is None:
+            return top_k(self.scores(idx, weights), k, exclude=idx, allowed=allowed)
+        candidates = np.asarray(candidates, dtype=np.int64)
+        candidates = candidates[(candidates >= 0) & (candidates != idx)]
+        local, scores = top_k(self.scores(idx, weights, candidates), k,
+                              allowed=None if allowed is None else allowed[candidates])
+        return candidates[local].astype(np.int32), scores
+
+
+def has_hybrid_features(model_dir: str) -> bool:
+    """
+    True when the hybrid feature arrays exist in model_dir
+    """
+    return os.path.exists(os.path.join(model_dir, f"{HYBRID_FILE}.recency.npy"))
+
+
+def save_hybrid_features(model_dir: str, features: HybridFeatures) -> str:
+    """
+    Save the feature blocks into model_dir as raw .npy files (recency last: its presence marks a complete set)
+    """
+    path = os.path.join(model_dir, HYBRID_FILE)
+    save_csr(f"{path}.genre", features.genre)
+    save_csr(f"{path}.people", features.people)
+    np.save(f"{path}.country.npy", np.ascontiguousarray(features.country, dtype=np.int32))
+    np.save(f"{path}.recency.npy", np.ascontiguousarray(features.recency, dtype=np.float32))
+    return path
+
+
+def load_hybrid_features(model_dir: str, mmap_mode: Optional[str] = "r") -> HybridFeatures:
+    """
+    Load the feature blocks from model_dir (memory-mapped by default)
+    """
+    path = os.path.join(model_dir, HYBRID_FILE)
+    return HybridFeatures(
+        genre=load_csr(f"{path}.genre", mmap_mode),
+        people=load_csr(f"{path}.people", mmap_mode),
+        country=np.load(f"{path}.country.npy", mmap_mode=mmap_mode),
+        recency=np.load(f"{path}.recency.npy", mmap_mode=mmap_mode),
+    )
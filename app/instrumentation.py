@@ -0,0 +1,157 @@
+"""
+Lightweight timing instrumentation for the Streamlit pages
+
+- stage("name") context manager and @timed decorator record wall time and RSS delta per stage
+- start_run() / finish_run() bracket one page rerun; finish_run() shows the stages in a sidebar
+  panel and writes them as one JSON log record
+- @timed_fragment (under @st.fragment) gives a fragment that reruns on its own a run of its own; during a
+  full page rerun its stages go to the page's run
+- Enabled with NETFLIX_DEBUG_TIMINGS=1 or ?debug=1 in the URL; when disabled, stage() returns a
+  shared no-op context manager, so instrumented code pays one attribute lookup
+"""
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+# Set to 1 to time every rerun for every session
+DEBUG_ENV = "NETFLIX_DEBUG_TIMINGS"
+# Optional JSON-lines file receiving one record per timed rerun (otherwise the 'netflix.timings' logger)
+LOG_PATH_ENV = "NETFLIX_TIMINGS_LOG"
+
+logger = logging.getLogger("netflix.timings")
+
+_NO_OP = nullcontext()
+_local = threading.local() # Streamlit runs each session's script in its own thread
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb() -> Optional[float]:
+    """
+    Current resident set size of the process in MB (Linux /proc), or None where unavailable
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def enabled() -> bool:
+    """
+    True when timings are on for this rerun (environment variable or ?debug=1)
+    """
+    if os.environ.get(DEBUG_ENV, "") in ("1", "true", "yes"):
+        return True
+    try:
+        return st.query_params.get("debug") in ("1", "true")
+    except Exception: # No Streamlit session (scripts, notebooks)
+        return False
+
+
+def start_run(page: str) -> None:
+    """
+    Begin recording stages for one rerun of page (no-op when timings are off)
+    """
+    _local.run = {"page": page, "start": time.perf_counter(), "rss_start_mb": rss_mb(), "stages": [], "depth": 0} if enabled() else None
+
+
+@contextmanager
+def _measure(run: Dict[str, Any], name: str):
+    record = {"stage": name, "depth": run["depth"]}
+    run["stages"].append(record) # Appended first, so nested stages list under their parent
+    run["depth"] += 1
+    rss_before, start = rss_mb(), time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = (time.perf_counter() - start) * 1000
+        rss_after = rss_mb()
+        record["rss_delta_mb"] = None if rss_before is None or rss_after is None else rss_after - rss_before
+        run["depth"] -= 1
+
+
+def stage(name: str):
+    """
+    Context manager timing one stage of the current rerun
+    """
+    run = getattr(_local, "run", None)
+    return _NO_OP if run is None else _measure(run, name)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorator timing every call of a loader / helper as a stage (put it above st.cache_* to see cache hits)
+    """
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_fragment(page: str) -> Callable:
+    """
+    Decorator (put it under @st.fragment) recording a fragment-only rerun as its own run of page
+
+    finish_run() has already closed the page's run by then, so the fragment's stages would go unrecorded;
+    its panel is drawn inside the fragment, which cannot write to the sidebar.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "run", None) is not None or not enabled(): # Full page rerun, or timings off
+                return func(*args, **kwargs)
+            start_run(page)
+            result = func(*args, **kwargs)
+            finish_run(sidebar=False)
+            return result
+        return wrapper
+    return decorator
+
+
+def finish_run(sidebar: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    End the rerun: write the JSON log record and show the panel (in the sidebar, or where the caller is); returns the record
+    """
+    run = getattr(_local, "run", None)
+    _local.run = None
+    if run is None:
+        return None
+
+    rss_end = rss_mb()
+    record = {
+        "ts": time.time(),
+        "page": run["page"],
+        "total_ms": (time.perf_counter() - run["start"]) * 1000,
+        "rss_mb": rss_end,
+        "rss_delta_mb": None if rss_end is None or run["rss_start_mb"] is None else rss_end - run["rss_start_mb"],
+        "stages": run["stages"],
+    }
+    line = json.dumps(record)
+    log_path = os.environ.get(LOG_PATH_ENV)
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    else:
+        logger.info(line)
+
+    with (st.sidebar if sidebar else st).expander("⏱️ Timings", expanded=True):
+        st.caption(f"{record['page']}: {record['total_ms']:.0f} ms" + (f", RSS {rss_end:.0f} MB" if rss_end else ""))
+        st.dataframe(
+            [{"stage": "  " * s["depth"] + s["stage"], "ms": round(s["ms"], 1),
+              "Δ MB": None if s["rss_delta_mb"] is None else round(s["rss_delta_mb"], 1)} for s in record["stages"]],
+            use_container_width=True, hide_index=True,
+        )
+    return record
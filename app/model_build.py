@@ -0,0 +1,173 @@
+"""
+Full build of the recommender artifacts from the cleaned dataset (scripted, memory-bounded version of the
+04_recommender.ipynb fit)
+
+- The cleaned CSV / Parquet is read in chunks, so only one chunk's text is in memory at a time
+- "tfidf": the notebook's TfidfVectorizer, fitted in two streaming passes: term totals first (the same
+  max_features vocabulary TfidfVectorizer would pick), then float32 counts per chunk against that vocabulary,
+  weighted in place; no per-token lists for the whole corpus and no float64 matrix
+- "hashing": HashingTfidfVectorizer (recommender.py); each chunk is counted once, the IDF weights come from the
+  summed document frequencies, and no vocabulary is built or stored
+- The data reference keeps show_id, title, a text hash and the per-title details per row (model_refresh.REFERENCE_COLUMNS)
+- Published as a new registry version with a fresh drift baseline (refresh_state.json) for the new fit
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from artifacts import MODEL_DIR, MODEL_FILES, build_artifacts
+from data_store import apply_schema, iter_clean
+from filters import FilterIndex, save_filter_index
+from genres import build_genre_matrix, load_genre_matrix
+from hybrid import HybridFeatures, save_hybrid_features
+from model_refresh import (
+    DETAIL_COLUMNS,
+    KEY,
+    REFERENCE_COLUMNS,
+    REFRESH_STATE_FILE,
+    TEXT_COLUMNS,
+    combined_features,
+    initial_state,
+    text_hashes,
+)
+from recommender import HASHING_FEATURES, HashingTfidfVectorizer, save_tfidf_matrix
+from registry import discard_staging, publish_version, stage_version
+from title_index import TitleIndex, save_title_index
+
+BUILD_METHODS = ("tfidf", "hashing")
+DEFAULT_CHUNKSIZE = 50_000
+MAX_FEATURES = 5000 # Vocabulary size of the TfidfVectorizer fit, as in 04_recommender.ipynb
+STOP_WORDS = "english"
+
+
+def catalog_texts(chunks: Iterator[pd.DataFrame], sink: List[pd.DataFrame]) -> Iterator[np.ndarray]:
+    """
+    Vectorizer input of each chunk; the chunk's reference columns (show_id, title, text hash) are appended to sink
+    """
+    for chunk in chunks:
+        texts = combined_features(chunk).to_numpy()
+        sink.append(chunk[[KEY, "title"]].assign(text_hash=text_hashes(texts)))
+        yield texts
+
+
+def select_vocabulary(chunks: Iterator[np.ndarray], max_features: int = MAX_FEATURES) -> Tuple[Dict[str, int], int]:
+    """
+    (vocabulary, analyzed tokens) from term totals counted chunk by chunk
+
+    Same choice as TfidfVectorizer(max_features=...): the most frequent terms over the corpus, ties resolved
+    by the same sort over the alphabetically ordered terms, indexed alphabetically.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    analyze = CountVectorizer(stop_words=STOP_WORDS).build_analyzer()
+    totals: Counter = Counter()
+    for chunk in chunks:
+        for text in chunk:
+            totals.update(analyze(text))
+    terms = np.array(sorted(totals), dtype=object)
+    if max_features is not None and len(terms) > max_features:
+        frequencies = np.fromiter((totals[term] for term in terms), dtype=np.int64, count=len(terms))
+        terms = np.sort(terms[(-frequencies).argsort()[:max_features]])
+    return {term: i for i, term in enumerate(terms)}, sum(totals.values())
+
+
+def read_details(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Per-title detail columns of every chunk, as one typed frame
+    """
+    return apply_schema(pd.concat([chunk[DETAIL_COLUMNS] for chunk in chunks], ignore_index=True))
+
+
+def fit_tfidf(source: Optional[str], chunksize: int, reference: List[pd.DataFrame], max_features: int = MAX_FEATURES):
+    """
+    (vectorizer, float32 matrix, details, tokens, out-of-vocabulary tokens) in two passes over the cleaned data
+    """
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+
+    vocabulary, tokens = select_vocabulary(catalog_texts(iter_clean([KEY, "title", *TEXT_COLUMNS], chunksize, source), reference),
+                                           max_features)
+    counter = CountVectorizer(stop_words=STOP_WORDS, vocabulary=vocabulary, dtype=np.float32)
+    parts, details = [], []
+    for chunk in iter_clean(list(dict.fromkeys([*TEXT_COLUMNS, *DETAIL_COLUMNS])), chunksize, source):
+        parts.append(counter.transform(combined_features(chunk)))
+        details.append(chunk[DETAIL_COLUMNS])
+    counts = sparse.vstack(parts, format="csr")
+    del parts
+    oov = tokens - int(counts.data.sum())
+    weights = TfidfTransformer().fit(counts)
+    vectorizer = TfidfVectorizer(stop_words=STOP_WORDS, max_features=max_features, vocabulary=vocabulary, dtype=np.float32)
+    vectorizer.idf_ = weights.idf_
+    return vectorizer, weights.transform(counts, copy=False), read_details(details), tokens, oov
+
+
+def fit_hashing(source: Optional[str], chunksize: int, reference: List[pd.DataFrame], n_features: int = HASHING_FEATURES):
+    """
+    (vectorizer, float32 matrix, details, tokens, 0) from hashed counts per chunk, weighted in place once the IDF is known
+    """
+    vectorizer = HashingTfidfVectorizer(n_features, stop_words=STOP_WORDS)
+    texts = catalog_texts(iter_clean([KEY, "title", *TEXT_COLUMNS], chunksize, source), reference)
+    counts = sparse.vstack([vectorizer.count(chunk) for chunk in texts], format="csr")
+    tokens = int(counts.data.sum())
+    details = read_details(iter_clean(DETAIL_COLUMNS, chunksize, source))
+    return vectorizer.fit_idf(), vectorizer.weight(counts), details, tokens, 0 # Every hashed column of the corpus has a weight
+
+
+def build_models(model_dir: str = MODEL_DIR, method: str = "tfidf", source: Optional[str] = None,
+                 chunksize: int = DEFAULT_CHUNKSIZE, max_features: int = MAX_FEATURES,
+                 n_features: int = HASHING_FEATURES, activate: bool = True) -> Dict:
+    """
+    Fit a new vectorizer on the cleaned dataset (or the cleaned CSV / Parquet at source) and publish every artifact
+
+    Returns a report with the catalog size, matrix shape / non-zeros, the published version and the stage timings.
+    """
+    if method not in BUILD_METHODS:
+        raise ValueError(f"method must be one of {BUILD_METHODS}, got {method!r}")
+    timings, start = {}, time.perf_counter()
+    def lap(name):
+        nonlocal start
+        timings[name] = time.perf_counter() - start
+        start = time.perf_counter()
+
+    reference: List[pd.DataFrame] = []
+    if method == "hashing":
+        vectorizer, matrix, details, tokens, oov = fit_hashing(source, chunksize, reference, n_features)
+    else:
+        vectorizer, matrix, details, tokens, oov = fit_tfidf(source, chunksize, reference, max_features)
+    reference = apply_schema(pd.concat(reference, ignore_index=True)).astype({"text_hash": np.uint64})
+    if reference[KEY].duplicated().any():
+        raise ValueError(f"{KEY} must be unique; the refresh matches titles by it")
+    report = {"method": method, "titles": len(reference), "columns": matrix.shape[1], "nnz": int(matrix.nnz),
+              "vocabulary": len(vectorizer.vocabulary_)}
+    lap("fit")
+
+    staging = stage_version(model_dir, keep=[])
+    try:
+        joblib.dump(vectorizer, os.path.join(staging, MODEL_FILES["tfidf"]))
+        joblib.dump(pd.concat([reference, details], axis=1)[REFERENCE_COLUMNS], os.path.join(staging, MODEL_FILES["data_ref"]))
+        save_tfidf_matrix(staging, matrix)
+        del matrix
+        save_title_index(staging, TitleIndex(reference["title"], details["type"], details["release_year"]))
+        # The cleaned dataset's persisted genre matrix is row-aligned with the chunks read from it
+        genres = load_genre_matrix() if source is None else build_genre_matrix(details["genres_str"])
+        save_filter_index(staging, FilterIndex(details, genres))
+        save_hybrid_features(staging, HybridFeatures.from_details(details, genres))
+        with open(os.path.join(staging, REFRESH_STATE_FILE), "w") as f:
+            json.dump(initial_state(vectorizer, len(reference), tokens, oov), f, indent=2)
+        lap("save")
+        build_artifacts(staging) # Neighbour lists (and the ANN index for large catalogs) from the saved matrix
+        lap("neighbours")
+        size = f"{max_features} terms" if method == "tfidf" else f"{n_features} hashed columns"
+        report["version"] = publish_version(model_dir, staging, note=f"build: {method}, {size}", make_current=activate)
+    except BaseException:
+        discard_staging(staging)
+        raise
+    lap("publish")
+    report["timings"] = timings
+    return report
@@ -0,0 +1,131 @@
+"""
+Model fetcher for the recommender artifacts hosted on Hugging Face
+
+- Streams every download in chunks into a .part file that is renamed into place only when complete
+- Resumes interrupted downloads with an HTTP Range request
+- Verifies each file against the SHA-256 pinned in model_manifest.json
+- Fetches the files in parallel; usable from the app and from scripts/01_fetch_models.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+import requests
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_manifest.json")
+
+# Overrides the manifest base_url (a mirror, or a local HTTP server in tests)
+BASE_URL_ENV = "NETFLIX_MODEL_BASE_URL"
+CHUNK_SIZE = 1 << 20
+TIMEOUT = (10, 60) # seconds: connect, read between chunks
+
+
+class ChecksumError(Exception):
+    """
+    A downloaded file does not match the SHA-256 pinned in the manifest
+    """
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    """
+    Read the manifest: {"base_url": ..., "files": {name: {"sha256": hex or null}}}
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def sha256_file(path: str) -> str:
+    """
+    Hex SHA-256 of a file, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def download(url: str, dest: str, sha256: Optional[str] = None, timeout=TIMEOUT) -> str:
+    """
+    Stream url into dest, resuming a previous .part file; dest only appears once complete and verified
+
+    A .part the server reports as already complete (HTTP 416) is kept only when it matches sha256;
+    otherwise (or with no hash pinned) it is discarded and the file fetched again from the start.
+    """
+    part = f"{dest}.part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        leftover = response.status_code == 416 # Nothing past the .part: it should already hold the whole file
+        if not leftover:
+            response.raise_for_status()
+            mode = "ab" if response.status_code == 206 else "wb" # Server ignored Range: start over
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+
+    verified = bool(sha256) and sha256_file(part) == sha256.lower()
+    if leftover and not verified:
+        os.remove(part) # A leftover .part is only trusted when it matches a pinned hash: fetch it again in full
+        return download(url, dest, sha256, timeout)
+    if sha256 and not verified:
+        os.remove(part) # A corrupt partial must not be resumed
+        raise ChecksumError(f"SHA-256 mismatch for {os.path.basename(dest)}")
+    os.replace(part, dest)
+    return dest
+
+
+def missing_files(model_dir: str, manifest: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Manifest files not yet present in model_dir
+    """
+    manifest = manifest or load_manifest()
+    return [name for name in manifest["files"] if not os.path.exists(os.path.join(model_dir, name))]
+
+
+def fetch_models(model_dir: str, manifest: Optional[Dict[str, Any]] = None, base_url: Optional[str] = None,
+                 workers: int = 4, verify_existing: bool = False) -> List[str]:
+    """
+    Download every missing manifest file into model_dir in parallel; returns the names downloaded
+
+    With verify_existing, files already present are checked too and re-downloaded on mismatch.
+    """
+    manifest = manifest or load_manifest()
+    base_url = (base_url or os.environ.get(BASE_URL_ENV) or manifest["base_url"]).rstrip("/")
+    os.makedirs(model_dir, exist_ok=True)
+
+    todo = []
+    for name, entry in manifest["files"].items():
+        path = os.path.join(model_dir, name)
+        expected = entry.get("sha256")
+        if os.path.exists(path):
+            if not (verify_existing and expected and sha256_file(path) != expected.lower()):
+                continue
+            os.remove(path)
+        todo.append((name, expected))
+
+    if not todo:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+        futures = [pool.submit(download, f"{base_url}/{name}", os.path.join(model_dir, name), expected) for name, expected in todo]
+        for future in futures:
+            future.result() # Re-raise the first failure
+    return [name for name, _ in todo]
+
+
+def pin_manifest(model_dir: str, path: str = MANIFEST_PATH) -> Dict[str, Any]:
+    """
+    Record the SHA-256 of the files in model_dir into the manifest
+    """
+    manifest = load_manifest(path)
+    for name, entry in manifest["files"].items():
+        entry["sha256"] = sha256_file(os.path.join(model_dir, name))
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return manifest
@@ -0,0 +1,414 @@
+"""
+Incremental refresh of the recommender artifacts (no vectorizer refit, no all-pairs recompute)
+
+- Added / changed titles (keyed by show_id) are transformed with the frozen vectorizer; changed rows are
+  replaced in the stored sparse matrix, new rows appended and removed rows dropped
+- Only the affected neighbour lists are recomputed: new / changed titles and titles whose list pointed at a
+  changed or removed title. Every other list just merges in the touched titles that beat its k-th score
+- The title / filter / hybrid indexes are rebuilt from the refreshed per-title details (vectorised, seconds),
+  and new rows are assigned to their closest ANN list when an ANN index exists
+- The data reference keeps show_id, title, the per-title details and a hash of the vectorizer input per row,
+  not the text itself
+- The result is published as a new registry version (child of the current one) and served from the next rerun
+- A drift report compares the catalog with the one the vectorizer was fitted on (churn, out-of-vocabulary
+  token rate, IDF shift) and tells when a full refit is due; the running totals live in refresh_state.json
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime as dt
+import hashlib
+import json
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ann import has_ann_index, load_ann_index, save_ann_index
+from artifacts import MODEL_DIR, MODEL_FILES, catalog_details, ensure_artifacts
+from data_store import apply_schema
+from filters import FILTER_FIELDS, FilterIndex, save_filter_index
+from genres import build_genre_matrix
+from hybrid import HYBRID_COLUMNS, HybridFeatures, save_hybrid_features
+from recommender import (
+    BLOCK_SIZE,
+    build_neighbor_index,
+    load_neighbor_index,
+    load_tfidf_matrix,
+    save_neighbor_index,
+    save_tfidf_matrix,
+    similar_titles_batch,
+    top_k_batch,
+)
+from registry import component_of, discard_staging, publish_version, stage_version, version_dir
+from title_index import TitleIndex, save_title_index
+
+KEY = "show_id"
+REFRESH_STATE_FILE = "refresh_state.json"
+
+# Cleaned dataset columns the refresh needs: the vectorizer input and every per-title detail the indexes use
+TEXT_COLUMNS = ["metadata", "genres_str"]
+DETAIL_COLUMNS = list(dict.fromkeys(["type", "release_year", *FILTER_FIELDS.values(), "date_added_year", *HYBRID_COLUMNS]))
+CATALOG_COLUMNS = list(dict.fromkeys([KEY, "title", *TEXT_COLUMNS, *DETAIL_COLUMNS]))
+
+# Data reference stored with a version: one row per TF-IDF row. The text itself is kept only as a hash, enough to
+# tell which upserted titles changed; the details are kept so the next refresh can rebuild the indexes from them
+REFERENCE_COLUMNS = [KEY, "title", "text_hash", *DETAIL_COLUMNS]
+
+# Drift since the last full fit above which the frozen vocabulary / IDF weights are considered stale
+DRIFT_THRESHOLDS = {
+    "churn": 0.20, # Share of the fitted catalog added, changed or removed since
+    "oov_increase": 0.05, # Rise of the out-of-vocabulary token rate of refreshed rows over the fitted catalog
+    "idf_shift": 0.05, # Mean relative change of the IDF weights, weighted by term usage
+}
+
+# Upper bound on the dense score block (rows × N floats) when lists are recomputed
+MAX_BLOCK_CELLS = 1 << 24
+
+
+# ───────────────────── Rows ─────────────────────
+def combined_features(df: pd.DataFrame) -> pd.Series:
+    """
+    Vectorizer input of each title, exactly as 04_recommender.ipynb built it (metadata + genres, lower case)
+    """
+    metadata = df["metadata"].astype("string").fillna("").str.lower()
+    genres = df["genres_str"].astype("string").fillna("").str.lower()
+    return (metadata + " " + genres).astype(object)
+
+
+def text_hashes(texts: Iterable[str]) -> np.ndarray:
+    """
+    64-bit hash of each vectorizer input (stable across runs and pandas versions)
+    """
+    return pd.util.hash_pandas_object(pd.Series(list(texts), dtype=object), index=False).to_numpy(np.uint64)
+
+
+def reference_hashes(df_ref: pd.DataFrame) -> np.ndarray:
+    """
+    Text hash of each reference row; older references still carry the full combined_features text
+    """
+    if "text_hash" in df_ref.columns:
+        return df_ref["text_hash"].to_numpy(np.uint64)
+    return text_hashes(df_ref["combined_features"])
+
+
+def reference_frame(df_ref: pd.DataFrame, catalog: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Data reference with a show_id per row
+
+    Older references only carry title + combined_features (no show_id); their show_ids come from the cleaned dataset
+    when it still lines up, otherwise from the catalog rows with the same title and text (unmatched rows
+    get ids no catalog row has, so they are treated as removed and their current version as added).
+    """
+    if KEY in df_ref.columns:
+        return df_ref.reset_index(drop=True)
+    details = catalog_details(df_ref, [KEY, "title"])
+    df_ref = df_ref.reset_index(drop=True)
+    if details is not None and (details["title"].astype(str).to_numpy() == df_ref["title"].astype(str).to_numpy()).all():
+        return df_ref.assign(**{KEY: details[KEY].astype(str).to_numpy()})
+
+    ids = pd.Series([f"unmatched-{i}" for i in range(len(df_ref))], dtype=object)
+    if catalog is not None:
+        # Pair duplicate (title, text) rows in order
+        catalog_keys = catalog.assign(combined_features=combined_features(catalog))[["title", "combined_features", KEY]]
+        catalog_keys = catalog_keys.assign(nth=catalog_keys.groupby(["title", "combined_features"]).cumcount())
+        ref_keys = df_ref[["title", "combined_features"]].assign(nth=lambda d: d.groupby(["title", "combined_features"]).cumcount())
+        matched = ref_keys.merge(catalog_keys, how="left", on=["title", "combined_features", "nth"])[KEY]
+        ids = matched.astype(object).where(matched.notna(), ids)
+    return df_ref.assign(**{KEY: ids.astype(str).to_numpy()})
+
+
+def diff_catalog(df_ref: pd.DataFrame, catalog: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    (catalog rows to upsert, removed show_ids) between the data reference and the current catalog
+
+    Every catalog row is upserted so details that are not part of the text (e.g. ratings) stay current;
+    rows whose text did not change cost no vector or neighbour work.
+    """
+    removed = sorted(set(df_ref[KEY].astype(str)) - set(catalog[KEY].astype(str)))
+    return catalog, removed
+
+
+# ───────────────────── Neighbour lists ─────────────────────
+def _rows_per_block(n_rows: int) -> int:
+    return max(1, min(BLOCK_SIZE, MAX_BLOCK_CELLS // max(n_rows, 1)))
+
+
+def patch_neighbor_lists(tfidf_matrix, indices: np.ndarray, scores: np.ndarray, touched: np.ndarray,
+                         rebuild: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bring the (N, k) neighbour lists up to date after the rows in touched were added or changed
+
+    Rows flagged in rebuild (touched rows, lists that lost a neighbour) are recomputed from scratch.
+    For every other row the new top-k is contained in its old list plus the touched rows, so only the
+    touched columns are scored (N × |touched|) and merged in.
+    """
+    X = sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+    indices, scores = indices.copy(), scores.copy()
+    k = indices.shape[1]
+    touched = np.unique(np.asarray(touched, dtype=np.int64))
+    block_size = _rows_per_block(len(touched))
+
+    if len(touched):
+        touched_T = X[touched].T.tocsr()
+        patch = np.flatnonzero(~rebuild)
+        for start in range(0, len(patch), block_size):
+            rows = patch[start:start + block_size]
+            sims = (X[rows] @ touched_T).toarray()
+            better = np.flatnonzero((sims > scores[rows, -1:]).any(axis=1)) # Only lists a touched title enters
+            if not len(better):
+                continue
+            rows, sims = rows[better], sims[better]
+            candidates = np.hstack([indices[rows], np.broadcast_to(touched, (len(rows), len(touched)))])
+            local, top_scores = top_k_batch(np.hstack([scores[rows], sims]), k)
+            indices[rows] = np.take_along_axis(candidates, local.astype(np.int64), axis=1)
+            scores[rows] = top_scores
+
+    stale = np.flatnonzero(rebuild)
+    if len(stale):
+        indices[stale], scores[stale] = similar_titles_batch(X, stale, k, _rows_per_block(X.shape[0]))
+    return indices, scores
+
+
+def _update_ann_index(index, tfidf_matrix, source: np.ndarray, n_old: int, touched: np.ndarray):
+    """
+    ANN index over the refreshed rows: unchanged rows keep their list, touched rows go to their closest list
+
+    The SVD projection and centroids stay frozen, like the vectorizer.
+    """
+    assign = np.empty(n_old, dtype=np.int64)
+    assign[index.list_items] = np.repeat(np.arange(index.n_lists), np.diff(index.list_offsets))
+    kept = source < n_old
+    vectors = np.zeros((len(source), index.vectors.shape[1]), dtype=np.float32)
+    new_assign = np.zeros(len(source), dtype=np.int64)
+    vectors[kept], new_assign[kept] = index.vectors[source[kept]], assign[source[kept]]
+    if len(touched):
+        vectors[touched] = index.project(tfidf_matrix[touched])
+        new_assign[touched] = np.argmax(vectors[touched] @ index.centroids.T, axis=1)
+    index.vectors = vectors
+    index.list_items = np.argsort(new_assign, kind="stable").astype(np.int32)
+    index.list_offsets = np.concatenate([[0], np.cumsum(np.bincount(new_assign, minlength=index.n_lists))]).astype(np.int64)
+    return index
+
+
+# ───────────────────── Drift ─────────────────────
+def vectorizer_fingerprint(tfidf) -> str:
+    """
+    Short hash of the fitted IDF weights; a new fit starts a new drift baseline
+    """
+    return hashlib.sha1(np.asarray(tfidf.idf_, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+
+def token_counts(tfidf, texts: Iterable[str]) -> Tuple[int, int]:
+    """
+    (tokens, out-of-vocabulary tokens) of texts under the vectorizer's analyzer (stop words already dropped)
+    """
+    analyze, vocab = tfidf.build_analyzer(), tfidf.vocabulary_
+    tokens = oov = 0
+    for text in texts:
+        words = analyze(text)
+        tokens += len(words)
+        oov += sum(word not in vocab for word in words)
+    return tokens, oov
+
+
+def idf_shift(tfidf, tfidf_matrix) -> float:
+    """
+    Mean relative change between the fitted IDF weights and the ones the current catalog implies
+
+    Document frequencies come from the stored matrix (non-zeros per column), weighted by how often each
+    term is used, so rare terms do not dominate.
+    """
+    n = tfidf_matrix.shape[0]
+    df = np.bincount(np.asarray(tfidf_matrix.indices), minlength=len(tfidf.idf_)).astype(np.float64)
+    idf_now = np.log((1 + n) / (1 + df)) + 1 # smooth_idf, as fitted
+    weights = df / max(df.sum(), 1.0)
+    return float(np.sum(weights * np.abs(idf_now - tfidf.idf_) / tfidf.idf_))
+
+
+def load_refresh_state(directory: str, tfidf, df_ref: pd.DataFrame) -> Dict:
+    """
+    Running totals since the last full fit; a missing state or a refitted vectorizer starts from the current catalog
+    """
+    path = os.path.join(directory, REFRESH_STATE_FILE)
+    fingerprint = vectorizer_fingerprint(tfidf)
+    if os.path.exists(path):
+        with open(path) as f:
+            state = json.load(f)
+        if state.get("vectorizer") == fingerprint:
+            return state
+    if "combined_features" in df_ref.columns:
+        texts = df_ref["combined_features"]
+    else: # Reference without the text: it comes from the cleaned dataset, for the titles it still has
+        details = catalog_details(df_ref, TEXT_COLUMNS, partial=True)
+        details = details.dropna(how="all") if details is not None else details
+        if details is None or details.empty:
+            raise ValueError(f"No text for the drift baseline: {REFRESH_STATE_FILE} is missing or stale and the "
+                             f"cleaned dataset does not match the data reference; rebuild with scripts/08_build_models.py")
+        texts = combined_features(details)
+    return initial_state(tfidf, len(df_ref), *token_counts(tfidf, texts))
+
+
+def initial_state(tfidf, rows: int, tokens: int, oov_tokens: int) -> Dict:
+    """
+    State of a freshly fitted vectorizer: no refreshes yet, the fit corpus (titles, analyzed / out-of-vocabulary
+    tokens) as the drift baseline
+    """
+    return {"vectorizer": vectorizer_fingerprint(tfidf), "fit_rows": rows, "fit_tokens": tokens, "fit_oov_tokens": oov_tokens,
+            "added": 0, "changed": 0, "removed": 0, "tokens": 0, "oov_tokens": 0, "refreshes": []}
+
+
+def drift_report(state: Dict, tfidf, tfidf_matrix) -> Dict:
+    """
+    Drift metrics since the last full fit, and whether they call for a refit
+    """
+    fit_oov = state["fit_oov_tokens"] / max(state["fit_tokens"], 1)
+    new_oov = state["oov_tokens"] / state["tokens"] if state["tokens"] else fit_oov
+    metrics = {
+        "churn": (state["added"] + state["changed"] + state["removed"]) / max(state["fit_rows"], 1),
+        "oov_increase": new_oov - fit_oov,
+        "idf_shift": idf_shift(tfidf, tfidf_matrix),
+    }
+    reasons = [f"{name} {value:.3f} > {DRIFT_THRESHOLDS[name]:.3f}" for name, value in metrics.items()
+               if value > DRIFT_THRESHOLDS[name]]
+    return {**metrics, "fit_oov_rate": fit_oov, "oov_rate": new_oov, "needs_refit": bool(reasons), "reasons": reasons}
+
+
+# ───────────────────── Refresh ─────────────────────
+def refresh_models(upserts: pd.DataFrame, removed_ids: Iterable[str] = (), model_dir: str = MODEL_DIR,
+                   dry_run: bool = False, verify: bool = False) -> Dict:
+    """
+    Apply added / changed / removed titles to the stored artifacts without refitting the vectorizer
+
+    upserts holds cleaned rows (CATALOG_COLUMNS) keyed by show_id. Returns a report with the row counts,
+    the stage timings and the drift metrics; with dry_run nothing is written. verify compares the patched
+    neighbour scores with a full all-pairs rebuild (ties may order differently, so scores are compared).
+    """
+    timings, start = {}, time.perf_counter()
+    def lap(name):
+        nonlocal start
+        timings[name] = time.perf_counter() - start
+        start = time.perf_counter()
+
+    source_dir = version_dir(model_dir, ensure_artifacts(model_dir))
+    tfidf = joblib.load(os.path.join(source_dir, MODEL_FILES["tfidf"]))
+    df_ref = reference_frame(joblib.load(os.path.join(source_dir, MODEL_FILES["data_ref"])), upserts)
+    tfidf_matrix = load_tfidf_matrix(source_dir, mmap_mode="r")
+    indices, scores = load_neighbor_index(source_dir, mmap_mode="r")
+    state = load_refresh_state(source_dir, tfidf, df_ref)
+    n_old = len(df_ref)
+    lap("load")
+
+    # Which reference rows survive, which upserts change text, which are new
+    upserts = upserts.drop_duplicates(KEY, keep="last").reset_index(drop=True)
+    upserts = upserts.assign(**{KEY: upserts[KEY].astype(str), "combined_features": combined_features(upserts)})
+    upserts["text_hash"] = text_hashes(upserts["combined_features"])
+    position = pd.Series(np.arange(n_old), index=df_ref[KEY].astype(str))
+    removed = position.reindex(pd.Index([str(i) for i in removed_ids], dtype=object).difference(upserts[KEY])).dropna()
+    removed = removed.to_numpy(dtype=np.int64)
+    old_pos = position.reindex(upserts[KEY]).to_numpy() # NaN for new titles
+    is_new = np.isnan(old_pos)
+    old_hash = reference_hashes(df_ref)
+    changed_text = ~is_new
+    changed_text[~is_new] = old_hash[old_pos[~is_new].astype(np.int64)] != upserts.loc[~is_new, "text_hash"].to_numpy()
+
+    keep = np.ones(n_old, dtype=bool)
+    keep[removed] = False
+    new_position = np.cumsum(keep) - 1 # Old row -> refreshed row (valid where keep)
+    source = np.concatenate([np.flatnonzero(keep), n_old + np.flatnonzero(is_new)]) # Refreshed row -> stacked row
+    target = np.where(is_new, len(np.flatnonzero(keep)) + np.cumsum(is_new) - 1,
+                      new_position[np.where(is_new, 0, old_pos).astype(np.int64)])
+    touched = np.sort(target[changed_text | is_new]).astype(np.int64)
+
+    # Reference frame: kept rows in place, upserted values over them, new rows at the end. Details of kept rows
+    # come from the served reference, or for references from before it stored them, the cleaned dataset
+    reference = df_ref.loc[keep, [KEY, "title"]].reset_index(drop=True).assign(text_hash=old_hash[keep])
+    reference = reference.reindex(columns=REFERENCE_COLUMNS)
+    details = catalog_details(df_ref, DETAIL_COLUMNS, partial=True)
+    if details is not None:
+        reference[DETAIL_COLUMNS] = details.reset_index(drop=True).loc[keep].reset_index(drop=True).astype(object)
+    reference = reference.astype(object).reindex(range(len(source))) # Object until apply_schema: NaN rows would turn hashes into floats
+    columns = [c for c in REFERENCE_COLUMNS if c in upserts.columns]
+    reference.loc[target, columns] = upserts[columns].astype(object).to_numpy()
+    reference = apply_schema(reference).astype({"text_hash": np.uint64})
+    missing = reference[DETAIL_COLUMNS].isna().all(axis=1).to_numpy()
+    if missing.any() and not missing.all(): # The indexes would silently leave these titles out of every filter
+        raise ValueError(f"{int(missing.sum())} of {len(reference)} titles have no details (e.g. "
+                         f"{', '.join(reference.loc[missing, KEY].astype(str).head(3))}): upsert them with their "
+                         f"cleaned columns or rebuild with scripts/08_build_models.py")
+    lap("diff")
+
+    report = {"titles": len(source), "added": int(is_new.sum()), "changed": int((changed_text & ~is_new).sum()),
+              "removed": len(removed), "details_only": int((~changed_text & ~is_new).sum())}
+    fresh = np.flatnonzero(changed_text | is_new)
+    fresh = fresh[np.argsort(target[fresh])]
+    tokens, oov = token_counts(tfidf, upserts["combined_features"].to_numpy()[fresh])
+    state = {**state, "added": state["added"] + report["added"], "changed": state["changed"] + report["changed"],
+             "removed": state["removed"] + report["removed"], "tokens": state["tokens"] + tokens,
+             "oov_tokens": state["oov_tokens"] + oov}
+
+    # Sparse matrix: frozen-vocabulary rows for touched titles, stacked after the old rows and gathered into place
+    fresh_rows = (sparse.csr_matrix(tfidf.transform(upserts["combined_features"].to_numpy()[fresh]), dtype=np.float32)
+                  if len(fresh) else sparse.csr_matrix((0, tfidf_matrix.shape[1]), dtype=np.float32))
+    stacked = sparse.vstack([sparse.csr_matrix(tfidf_matrix), fresh_rows], format="csr")
+    rows = source.copy()
+    rows[target[fresh]] = n_old + np.arange(len(fresh)) # Touched titles read their fresh row
+    new_matrix = stacked[rows]
+    lap("transform")
+
+    # Neighbour lists: remap kept rows, flag lists that held a changed / removed title
+    old_indices = np.asarray(indices)
+    mapping = np.where(keep, new_position, -2)
+    changed_old = np.zeros(n_old, dtype=bool)
+    changed_old[old_pos[changed_text & ~is_new].astype(np.int64)] = True
+    valid = old_indices >= 0
+    lost = (valid & (~keep[np.where(valid, old_indices, 0)] | changed_old[np.where(valid, old_indices, 0)])).any(axis=1)
+    new_indices = np.full((len(source), old_indices.shape[1]), -1, dtype=np.int32)
+    new_scores = np.full(new_indices.shape, -np.inf, dtype=np.float32)
+    kept_rows = np.flatnonzero(keep)
+    new_indices[:len(kept_rows)] = np.where(valid[kept_rows], mapping[np.where(valid, old_indices, 0)[kept_rows]], -1)
+    new_scores[:len(kept_rows)] = np.asarray(scores)[kept_rows]
+    rebuild = np.zeros(len(source), dtype=bool)
+    rebuild[:len(kept_rows)] = lost[kept_rows]
+    rebuild[touched] = True
+    new_indices, new_scores = patch_neighbor_lists(new_matrix, new_indices, new_scores, touched, rebuild)
+    report["lists_rebuilt"], report["lists_checked"] = int(rebuild.sum()), int((~rebuild).sum())
+    lap("neighbours")
+
+    if verify:
+        _, exact_scores = build_neighbor_index(new_matrix, new_indices.shape[1])
+        report["verified"] = float(np.isclose(new_scores, exact_scores, atol=1e-6).mean())
+
+    report["drift"] = drift_report(state, tfidf, new_matrix)
+    if dry_run:
+        report["timings"] = timings
+        return report
+
+    # Everything but the frozen vectorizer is written into a staging directory, then published as a new version
+    staging = stage_version(model_dir, keep=[component_of(MODEL_FILES["tfidf"])])
+    try:
+        save_tfidf_matrix(staging, new_matrix)
+        save_neighbor_index(staging, new_indices, new_scores)
+        if has_ann_index(source_dir):
+            save_ann_index(staging, _update_ann_index(load_ann_index(source_dir, mmap_mode=None), new_matrix,
+                                                      np.where(rows < n_old, rows, n_old), n_old, touched))
+        details = None if missing.all() else reference[DETAIL_COLUMNS]
+        save_title_index(staging, TitleIndex(reference["title"], *([details["type"], details["release_year"]] if details is not None else [])))
+        if details is not None:
+            genres = build_genre_matrix(details["genres_str"]) # Upserted rows are not in the persisted genre matrix yet
+            save_filter_index(staging, FilterIndex(details, genres))
+            save_hybrid_features(staging, HybridFeatures.from_details(details, genres))
+        joblib.dump(reference[REFERENCE_COLUMNS], os.path.join(staging, MODEL_FILES["data_ref"]))
+        state["refreshes"] = (state["refreshes"] + [{"at": dt.datetime.now().isoformat(timespec="seconds"),
+                                                      **{k: report[k] for k in ("added", "changed", "removed")}}])[-30:]
+        with open(os.path.join(staging, REFRESH_STATE_FILE), "w") as f:
+            json.dump(state, f, indent=2)
+        note = f"refresh: +{report['added']} ~{report['changed']} -{report['removed']}"
+        report["version"] = publish_version(model_dir, staging, note=note)
+    except BaseException:
+        discard_staging(staging)
+        raise
+    lap("save")
+    report["timings"] = timings
+    return report
@@ -8,11 +8,15 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Now import your own modules
-from utils import apply_theme
-from theme import THEME
+from theme import THEME, apply_theme
+from instrumentation import finish_run, start_run
+from warmup import start_background_warmup
 
 import streamlit as st
 
+start_run("Home") # Per-stage timings when debugging (?debug=1)
+start_background_warmup() # Shared data / model caches, filled once per process in the background
+
 # Apply theme
 apply_theme()
 
@@ -108,4 +112,6 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("</div>", unsafe_allow_html=True)
+
+finish_run()
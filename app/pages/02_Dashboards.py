@@ -8,14 +8,19 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Now import your own modules
-from utils import apply_theme
-from theme import THEME
+from theme import THEME, apply_theme
+from cube import MISSING_YEAR
+from figures import load_cube, load_figures
+from powerbi import load_pbix_bytes, start_prefetch
+from instrumentation import finish_run, stage, start_run, timed_fragment
+from warmup import start_background_warmup
 
 import streamlit as st
 from streamlit.components.v1 import html
-import plotly.express as px
 import plotly.io as pio
-import pandas as pd
+
+start_run("Dashboards") # Per-stage timings when debugging (?debug=1)
+start_background_warmup() # Shared data / model caches, filled once per process in the background
 
 # Apply theme
 apply_theme()
@@ -51,8 +56,7 @@ st.markdown("---")
 # ───────────────────── Power BI Dashboard (Download Link) ─────────────────────
 st.header("📈 Power BI Dashboard (Download)")
 
-# Direct download from GitHub (raw file)
-pbix_url = "https://github.com/sarahputhran/netflix-analysis-project/raw/main/docs/powerbi/Netflix_Titles_PowerBI.pbix.pbix"
+start_prefetch() # Optional background refresh from GitHub; never blocks the page
 
 st.markdown("""
 The Power BI dashboard was created using:
@@ -62,157 +66,108 @@ The Power BI dashboard was created using:
 You can download it directly below 👇
 """)
 
-# Streamlit download button from URL
-try:
-    import requests
-    response = requests.get(pbix_url)
-    if response.status_code == 200:
+# The file is read (once per process) only after the user asks for it
+if st.session_state.get("pbix_requested") or st.button("📦 Prepare Power BI Dashboard (.pbix)"):
+    st.session_state["pbix_requested"] = True
+    try:
         st.download_button(
             label="📥 Download Power BI Dashboard (.pbix)",
-            data=response.content,
+            data=load_pbix_bytes(),
             file_name="Netflix_Titles_PowerBI.pbix",
             mime="application/octet-stream",
         )
-    else:
-        st.warning("⚠️ Unable to fetch Power BI file from GitHub.")
-except Exception as e:
-    st.error(f"❌ Error fetching Power BI file: {e}")
+    except OSError as e:
+        st.error(f"❌ Power BI file unavailable: {e}")
 
-# ───────────────────── Load data from absolute paths ─────────────────────
+# ───────────────────── Cross-filtered figures ─────────────────────
+# Charts come from slices of a data cube built once per data version (hash of the source files);
+# a filter change reruns only this fragment and sums cube cells instead of regrouping the titles
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data/cleaned"))
-path_clean = os.path.join(BASE_DIR, "netflix_titles_clean.csv")
-path_year_type = os.path.join(BASE_DIR, "agg_by_year_type.csv")
-path_genre = os.path.join(BASE_DIR, "agg_by_genre.csv")
-path_country = os.path.join(BASE_DIR, "agg_by_country.csv")
-
-df_clean = pd.read_csv(path_clean)
-agg_by_year_type = pd.read_csv(path_year_type)
-agg_by_genre = pd.read_csv(path_genre)
-agg_by_country = pd.read_csv(path_country)
-
-# ───────────────────── Register Plotly theme ─────────────────────
-pio.templates["netflix_dark"] = pio.templates["plotly_dark"]
-pio.templates["netflix_dark"].layout.update(
-    paper_bgcolor=THEME["background"],
-    plot_bgcolor=THEME["background_alt"],
-    font=dict(family="Aptos, sans-serif", color=THEME["text_primary"]),
-    colorway=[THEME["highlight"], THEME["accent1"], THEME["secondary"], THEME["primary"]],
-)
-pio.templates.default = "netflix_dark"
-
-# ───────────────────── Plotly 1 – Titles by Year and Type ─────────────────────
-st.subheader("📅 Number of Titles by Year and Type")
-fig_year_type = px.bar(
-    agg_by_year_type,
-    x="date_added_year", y="count", color="type",
-    barmode="group",
-    color_discrete_map={"Movie": THEME["highlight"], "TV Show": THEME["accent1"]},
-    labels={"date_added_year": "Year", "count": "Number of Titles"},
-)
-st.plotly_chart(fig_year_type, use_container_width=True)
-
-# ───────────────────── Insights: Yearly Trends ─────────────────────
-st.markdown("### Insights: Titles Added by Year")
-st.markdown("""
-- Netflix’s content grew exponentially from **2015 to 2020**, peaking in **2019**.  
-- After 2020, the number of new titles slightly declined, possibly due to **pandemic-related slowdowns**.  
-- **Movies** consistently outnumber **TV Shows**, though shows are expanding more steadily each year.
-""")
-
-# ───────────────────── Plotly 2 – Titles by Rating and Type ─────────────────────
-st.subheader("⭐ Number of Titles by Rating and Type")
-
-# Remove runtime values (anything containing 'min')
-rating_counts = (
-    df_clean[~df_clean["rating"].str.contains("min", case=False, na=False)]
-    .groupby(["rating", "type"])
-    .size()
-    .reset_index(name="count")
-    .sort_values("count", ascending=False)
-)
-
-fig_ratings = px.bar(
-    rating_counts,
-    x="count", y="rating", color="type",
-    orientation="h",
-    barmode="stack",
-    color_discrete_map={"Movie": THEME["highlight"], "TV Show": THEME["accent1"]},
-    labels={"count": "Number of Titles", "rating": "Rating"},
-)
-st.plotly_chart(fig_ratings, use_container_width=True)
-
-# ───────────────────── Insights: Rating Distribution ─────────────────────
-st.markdown("### Insights: Ratings and Audience Target")
-st.markdown("""
-- Most content is rated **TV-MA** or **TV-14**, aimed primarily at **adult and teen audiences**.  
-- Very few titles fall under children’s or family ratings like **TV-Y** and **PG**.
-""")
-
-# ───────────────────── Plotly 3 – Top 10 Countries ─────────────────────
-st.subheader("🌍 Top 10 Countries by Number of Titles")
-
-# Drop missing or 'Unknown' countries
-country_counts = (
-    df_clean["primary_country"]
-    .dropna()
-    .replace("Unknown", pd.NA)
-    .dropna()
-    .value_counts()
-    .reset_index()
-)
-
-# Rename columns properly
-country_counts.columns = ["country", "title_count"]
-
-# Take top 10 countries
-top_countries = country_counts.head(10)
-
-fig_country = px.bar(
-    top_countries,
-    x="title_count", y="country",
-    orientation="h",
-    color="title_count",
-    color_continuous_scale=[THEME["accent2"], THEME["accent1"], THEME["highlight"]],
-    labels={"country": "Country", "title_count": "Number of Titles"},
-)
-st.plotly_chart(fig_country, use_container_width=True)
-
-# ───────────────────── Insights: Country Contributions ─────────────────────
-st.markdown("### Insights: Content by Country")
-st.markdown("""
-- The **United States** leads Netflix’s production catalog by a large margin.  
-- **India** and the **United Kingdom** follow, showing Netflix’s investment in **regional storytelling**.  
-- The inclusion of countries like **Japan** and **South Korea** reflects the growing **Asian content influence**.
-""")
-
-# ───────────────────── Plotly 4 – Top 15 Genres ─────────────────────
-st.subheader("🎭 Top 15 Genres on Netflix")
-
-# Safely rename columns based on what actually exists
-if "count.1" in agg_by_genre.columns:
-    agg_by_genre = agg_by_genre.rename(columns={"count": "genre", "count.1": "title_count"})
-elif "count_1" in agg_by_genre.columns:
-    agg_by_genre = agg_by_genre.rename(columns={"count": "genre", "count_1": "title_count"})
-else:
-    st.error("⚠️ Neither 'count.1' nor 'count_1' found in agg_by_genre — check CSV structure.")
-
-# Take top 15 genres
-top_genres = agg_by_genre.sort_values("title_count", ascending=False).head(15)
-
-fig_genre = px.bar(
-    top_genres,
-    x="title_count", y="genre",
-    orientation="h",
-    color="title_count",
-    color_continuous_scale=[THEME["accent2"], THEME["accent1"], THEME["highlight"]],
-    labels={"genre": "Genre", "title_count": "Number of Titles"},
-)
-st.plotly_chart(fig_genre, use_container_width=True)
-
-# ───────────────────── Insights: Genre Popularity ─────────────────────
-st.markdown("### Insights: Top Genres on Netflix")
-st.markdown("""
-- **Dramas**, **International Movies**, and **Comedies** dominate Netflix’s catalog.  
-- These genres make up nearly **half of all available titles**, aligning with global audience preferences.  
-- The mix of international and emotional storytelling genres highlights Netflix’s **broad audience strategy**.
-""")
\ No newline at end of file
+try:
+    cube = load_cube(BASE_DIR)
+except Exception as e:
+    st.error(f"⚠️ Unable to build dashboard charts: {e}")
+    st.stop()
+
+
+@st.fragment
+@timed_fragment("Dashboards: charts")
+def plotly_dashboard():
+    st.header("📉 Plotly Visualizations")
+    with st.expander("🔎 Filters (apply to every chart below)", expanded=True):
+        col1, col2 = st.columns(2)
+        types = col1.multiselect("Type", cube.values("type"))
+        ratings = col2.multiselect("Rating", cube.values("rating"))
+        countries = col1.multiselect("Country", cube.values("country"))
+        genres = col2.multiselect("Genre", cube.values("genre"))
+        first_year, last_year = cube.year_range()
+        if first_year < last_year:
+            years = st.slider("Added to Netflix", first_year, last_year, (first_year, last_year))
+        else: # One year (or none known): nothing to pick, and st.slider needs min < max
+            years = (first_year, last_year)
+            if first_year != MISSING_YEAR:
+                st.caption(f"Added to Netflix: {first_year}")
+    year_filter = years != (first_year, last_year) # Full range = no year filter (keeps titles without a date)
+    filters = dict(types=types, ratings=ratings, countries=countries, genres=genres,
+                   year_min=years[0] if year_filter else None, year_max=years[1] if year_filter else None)
+
+    with stage("cube slice"):
+        figures = load_figures(BASE_DIR, **filters)
+        titles = cube.slice(**filters)["titles"]
+    st.caption(f"{titles:,} titles match the selected filters")
+
+    # ───────────────────── Plotly 1 – Titles by Year and Type ─────────────────────
+    st.subheader("📅 Number of Titles by Year and Type")
+    with stage("chart: year_type"):
+        st.plotly_chart(pio.from_json(figures["year_type"]), use_container_width=True)
+
+    # ───────────────────── Insights: Yearly Trends ─────────────────────
+    st.markdown("### Insights: Titles Added by Year")
+    st.markdown("""
+    - Netflix’s content grew exponentially from **2015 to 2020**, peaking in **2019**.  
+    - After 2020, the number of new titles slightly declined, possibly due to **pandemic-related slowdowns**.  
+    - **Movies** consistently outnumber **TV Shows**, though shows are expanding more steadily each year.
+    """)
+
+    # ───────────────────── Plotly 2 – Titles by Rating and Type ─────────────────────
+    st.subheader("⭐ Number of Titles by Rating and Type")
+    with stage("chart: ratings"):
+        st.plotly_chart(pio.from_json(figures["ratings"]), use_container_width=True)
+
+    # ───────────────────── Insights: Rating Distribution ─────────────────────
+    st.markdown("### Insights: Ratings and Audience Target")
+    st.markdown("""
+    - Most content is rated **TV-MA** or **TV-14**, aimed primarily at **adult and teen audiences**.  
+    - Very few titles fall under children’s or family ratings like **TV-Y** and **PG**.
+    """)
+
+    # ───────────────────── Plotly 3 – Top 10 Countries ─────────────────────
+    st.subheader("🌍 Top 10 Countries by Number of Titles")
+    with stage("chart: country"):
+        st.plotly_chart(pio.from_json(figures["country"]), use_container_width=True)
+
+    # ───────────────────── Insights: Country Contributions ─────────────────────
+    st.markdown("### Insights: Content by Country")
+    st.markdown("""
+    - The **United States** leads Netflix’s production catalog by a large margin.  
+    - **India** and the **United Kingdom** follow, showing Netflix’s investment in **regional storytelling**.  
+    - The inclusion of countries like **Japan** and **South Korea** reflects the growing **Asian content influence**.
+    """)
+
+    # ───────────────────── Plotly 4 – Top 15 Genres ─────────────────────
+    st.subheader("🎭 Top 15 Genres on Netflix")
+    with stage("chart: genre"):
+        st.plotly_chart(pio.from_json(figures["genre"]), use_container_width=True)
+
+    # ───────────────────── Insights: Genre Popularity ─────────────────────
+    st.markdown("### Insights: Top Genres on Netflix")
+    st.markdown("""
+    - **Dramas**, **International Movies**, and **Comedies** dominate Netflix’s catalog.  
+    - These genres make up nearly **half of all available titles**, aligning with global audience preferences.  
+    - The mix of international and emotional storytelling genres highlights Netflix’s **broad audience strategy**.
+    """)
+
+
+plotly_dashboard()
+
+finish_run()
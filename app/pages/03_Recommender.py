@@ -1,10 +1,7 @@
 import os
 import sys
 import streamlit as st
-import joblib
-import pandas as pd
-import requests
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 
 # ───────────────────── Fix paths ─────────────────────
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,8 +10,17 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Import app theme utilities
-from utils import apply_theme
-from theme import THEME
+from theme import THEME, apply_theme
+from artifacts import load_recommender
+from ann import ANN_MIN_TITLES
+from filters import MISSING_YEAR
+from hybrid import DEFAULT_WEIGHTS, SIGNALS, TEXT_ONLY
+from recommender import similar_titles, similar_titles_batch, similar_to_text
+from instrumentation import finish_run, stage, start_run
+from warmup import start_background_warmup
+
+start_run("Recommender") # Per-stage timings when debugging (?debug=1)
+warmup = start_background_warmup() # Shared data / model caches, filled once per process in the background
 
 # Apply theme
 apply_theme()
@@ -22,67 +28,155 @@ apply_theme()
 st.title("🎥 Netflix Recommendation System")
 st.write("Find similar Movies and TV Shows using content-based filtering.")
 
-# ───────────────────── Hugging Face Model URLs ─────────────────────
-MODEL_URLS = {
-    "tfidf": "https://huggingface.co/sarahputhran/Netflix_Project_Models/resolve/main/tfidf_vectorizer.pkl",
-    "cosine": "https://huggingface.co/sarahputhran/Netflix_Project_Models/resolve/main/cosine_similarity.pkl",
-    "data_ref": "https://huggingface.co/sarahputhran/Netflix_Project_Models/resolve/main/data_reference.pkl",
-}
-
-# ───────────────────── Helper: Download model if missing ─────────────────────
-def download_if_missing(url, local_path):
-    """Downloads a file from Hugging Face if it doesn't exist locally."""
-    if not os.path.exists(local_path):
-        st.info(f"📥 Downloading {os.path.basename(local_path)}...")
-        response = requests.get(url)
-        response.raise_for_status()
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-        with open(local_path, "wb") as f:
-            f.write(response.content)
-        st.success(f"✅ Downloaded {os.path.basename(local_path)}")
-
-# ───────────────────── Download models if needed ─────────────────────
-model_dir = os.path.join(project_root, "app", "models")
-os.makedirs(model_dir, exist_ok=True)
-
-download_if_missing(MODEL_URLS["tfidf"], os.path.join(model_dir, "tfidf_vectorizer.pkl"))
-download_if_missing(MODEL_URLS["cosine"], os.path.join(model_dir, "cosine_similarity.pkl"))
-download_if_missing(MODEL_URLS["data_ref"], os.path.join(model_dir, "data_reference.pkl"))
-
 # ───────────────────── Load models ─────────────────────
+# Downloaded / derived once, then shared by every session through st.cache_resource
+notice = st.empty()
+if not warmup.is_ready("recommender models"):
+    notice.info("⏳ The recommender index is still loading on this server; results appear as soon as it is ready.")
 try:
-    tfidf = joblib.load(os.path.join(model_dir, "tfidf_vectorizer.pkl"))
-    cosine_sim = joblib.load(os.path.join(model_dir, "cosine_similarity.pkl"))
-    df_ref = joblib.load(os.path.join(model_dir, "data_reference.pkl"))
+    models = load_recommender() # Waits for the warm-up's in-flight load instead of starting a second one
 except Exception as e:
+    notice.empty()
     st.error(f"❌ Error loading model files: {e}")
     st.stop()
+notice.empty()
+
+# Components load on first use (see artifacts.RecommenderModels): a title lookup never touches the vectorizer
+title_index = models["title_index"]
+filter_index = models["filter_index"] # None when per-title details are unavailable
+
+# Candidates re-ranked by the hybrid scorer when the catalog is large enough for approximate search
+HYBRID_CANDIDATES = 500
 
-df_ref["title_lower"] = df_ref["title"].str.lower()
+def use_ann(allowed):
+    """Approximate search only pays off over a large candidate set; small filtered sets are scanned exactly."""
+    # ann_index: only built once the catalog is large enough to need approximate search
+    return models.available("ann_index") and (allowed is None or allowed.sum() >= ANN_MIN_TITLES)
+
+def resolve_title(title):
+    """Row position of a title (first row when several titles share the name), or None."""
+    matches = title_index.lookup(title)
+    return matches[0] if matches else None
 
 # Recommender Function
-def recommend(title):
-    title = title.lower().strip()
-    if title not in df_ref["title_lower"].values:
+# allowed: boolean filter mask from filter_index.mask(), applied before top-k selection
+# weights: per-signal weights for the hybrid scorer; text-only weights use the TF-IDF paths below
+def recommend(title, k=10, allowed=None, weights=TEXT_ONLY):
+    idx = title if isinstance(title, (int, np.integer)) else resolve_title(title)
+    if idx is None:
         return None
 
-    idx = df_ref.index[df_ref["title_lower"] == title][0] # Get index of the title
-    sim_scores = list(enumerate(cosine_sim[idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:11]
-    recommendations = df_ref.iloc[[i[0] for i in sim_scores]]["title"].values
+    if models.available("hybrid") and weights != TEXT_ONLY:
+        candidates = None # Small catalogs: every title is scored
+        if use_ann(allowed):
+            candidates = models["ann_index"].search(models["tfidf_matrix"], [idx], HYBRID_CANDIDATES, allowed=allowed)[0][0]
+        top, _ = models["hybrid"].similar(idx, k, weights, allowed=allowed, candidates=candidates)
+    elif allowed is None and k <= models["neighbor_idx"].shape[1]:
+        top = models["neighbor_idx"][idx, :k] # Precomputed neighbours, already sorted
+    elif use_ann(allowed):
+        top = models["ann_index"].search(models["tfidf_matrix"], [idx], k, allowed=allowed)[0][0] # Large catalogs: scan only the closest IVF lists
+        top = top[top >= 0]
+    else:
+        top, _ = similar_titles(models["tfidf_matrix"], idx, k, allowed=allowed) # argpartition over the on-demand (masked) scores
+    recommendations = [title_index.titles[i] for i in top]
     return recommendations
 
+# Batched variant: many query titles at once -> (Q, k) matrices of indices and scores
+def recommend_many(titles, k=10, allowed=None):
+    positions = np.array([resolve_title(t) for t in titles], dtype=object)
+    found = np.array([p is not None for p in positions], dtype=bool) # False for unknown titles
+    positions = positions[found].astype(np.int64)
+    if allowed is None and k <= models["neighbor_idx"].shape[1]:
+        indices, scores = models["neighbor_idx"][positions, :k], models["neighbor_scores"][positions, :k]
+    elif use_ann(allowed):
+        indices, scores = models["ann_index"].search(models["tfidf_matrix"], positions, k, allowed=allowed) # Padded with -1 / -inf when short
+    else:
+        indices, scores = similar_titles_batch(models["tfidf_matrix"], positions, k, allowed=allowed)
+    return found, indices, scores
+
+# Free-text query: vectorizer transform (LRU-cached) + one sparse matrix x vector product, never N x N
+def recommend_text(text, k=10, allowed=None):
+    query_row = models["text_encoder"](text)
+    if query_row.nnz == 0:
+        return None # No word of the query is in the vocabulary
+    if use_ann(allowed):
+        indices, scores = models["ann_index"].search_rows(models["tfidf_matrix"], query_row, k, allowed=allowed)
+        keep = (indices[0] >= 0) & (scores[0] > 0)
+        return indices[0][keep], scores[0][keep]
+    return similar_to_text(models["tfidf_matrix"], query_row, k, allowed=allowed)
+
 # Streamlit UI
-title_input = st.text_input("Enter a show or movie name:", placeholder="e.g. Breaking Bad")
+mode = st.radio("Search by:", ["Title", "Description"], horizontal=True)
 
-if st.button("Get Recommendations"):
-    if not title_input:
-        st.warning("Please enter a title first.")
-    else:
-        recs = recommend(title_input)
-        if recs is None:
+# Optional filters, combined into one mask over the catalog (bitmap AND / OR, no per-title loop)
+allowed = None
+if filter_index is not None:
+    with st.expander("🔎 Filters"):
+        col1, col2 = st.columns(2)
+        types = col1.multiselect("Type", filter_index.values("type"))
+        ratings = col2.multiselect("Rating", filter_index.values("rating"))
+        countries = col1.multiselect("Country", filter_index.values("country"))
+        genres = col2.multiselect("Genre", filter_index.values("genre"))
+        first_year, last_year = filter_index.year_range()
+        if first_year < last_year:
+            years = st.slider("Added to Netflix", first_year, last_year, (first_year, last_year))
+        else: # One year (or none known): nothing to pick, and st.slider needs min < max
+            years = (first_year, last_year)
+            if first_year != MISSING_YEAR:
+                st.caption(f"Added to Netflix: {first_year}")
+    year_filter = years != (first_year, last_year) # Full range = no year filter (keeps titles without a date)
+    with stage("filter mask"):
+        allowed = filter_index.mask(types, ratings, countries, genres,
+                                    years[0] if year_filter else None, years[1] if year_filter else None)
+
+# Ranking weights per signal (title search); applied at query time, nothing is rebuilt when they change
+weights = TEXT_ONLY
+if models.available("hybrid") and mode == "Title":
+    with st.expander("⚖️ Ranking weights"):
+        cols = st.columns(len(SIGNALS))
+        weights = {name: col.slider(name.capitalize(), 0.0, 1.0, DEFAULT_WEIGHTS[name], 0.05)
+                   for col, name in zip(cols, SIGNALS)}
+    if not any(weights.values()):
+        weights = TEXT_ONLY
+    elif all(w == 0 for name, w in weights.items() if name != "text"):
+        weights = TEXT_ONLY # Text alone ranks the same at any weight: use the precomputed neighbours
+
+if mode == "Description":
+    text_query = st.text_input("Describe what you want to watch:", placeholder="e.g. korean crime thriller")
+    if st.button("Get Recommendations"):
+        with stage("recommend_text"):
+            result = recommend_text(text_query, allowed=allowed) if text_query.strip() else None
+        if not text_query.strip():
+            st.warning("Please describe what you are looking for first.")
+        elif result is None or len(result[0]) == 0:
+            st.error("No titles match that description and the selected filters.")
+        else:
+            st.success(f"Top {len(result[0])} Recommendations for ‘{text_query}’:")
+            for i, (idx, score) in enumerate(zip(*result), 1):
+                st.write(f"{i}. {title_index.label(idx)} — {score:.2f}")
+else:
+    title_input = st.text_input("Enter a show or movie name:", placeholder="e.g. Breaking Bad")
+
+    # Suggestions: exact matches (several if the name is shared), otherwise prefix / fuzzy matches
+    choice = None
+    if title_input:
+        candidates = title_index.lookup(title_input) or title_index.suggest(title_input)
+        if candidates:
+            choice = st.selectbox("Matching titles:", candidates, format_func=title_index.label)
+
+    if st.button("Get Recommendations"):
+        if not title_input:
+            st.warning("Please enter a title first.")
+        elif choice is None:
             st.error("Title not found in the dataset.")
         else:
-            st.success(f"Top 10 Recommendations for ‘{title_input.title()}’:")
-            for i, show in enumerate(recs, 1):
-                st.write(f"{i}. {show}")
\ No newline at end of file
+            with stage("recommend"):
+                recs = recommend(choice, allowed=allowed, weights=weights)
+            if len(recs) == 0:
+                st.warning("No titles match the selected filters.")
+            else:
+                st.success(f"Top {len(recs)} Recommendations for ‘{title_index.label(choice)}’:")
+                for i, show in enumerate(recs, 1):
+                    st.write(f"{i}. {show}")
+
+finish_run()
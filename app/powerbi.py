@@ -0,0 +1,107 @@
+"""
+Power BI dashboard file served from the repository
+
+- The .pbix already ships in docs/powerbi, so the download button reads it from disk
+- The bytes are read once per process, and only after the user asks for the download
+- An optional background prefetch refreshes a copy from GitHub (timeout + ETag), never blocking a render
+"""
+
+from typing import Optional
+import os
+import threading
+import requests
+import streamlit as st
+
+from instrumentation import timed
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PBIX_PATH = os.path.join(PROJECT_ROOT, "docs", "powerbi", "Netflix_Titles_PowerBI.pbix.pbix")
+PBIX_URL = "https://github.com/sarahputhran/netflix-analysis-project/raw/main/docs/powerbi/Netflix_Titles_PowerBI.pbix.pbix"
+
+# Set NETFLIX_PBIX_PREFETCH=1 to refresh the file from GitHub in the background
+PREFETCH_ENV = "NETFLIX_PBIX_PREFETCH"
+PREFETCH_TIMEOUT = 10 # seconds (connect + read)
+
+
+def remote_copy_path(local_path: str = PBIX_PATH) -> str:
+    """
+    Where the prefetched remote copy is kept (next to the local file)
+    """
+    return f"{local_path}.remote"
+
+
+def pbix_path(local_path: str = PBIX_PATH) -> Optional[str]:
+    """
+    Path of the file to serve: the prefetched copy when there is one, otherwise the repository file
+    """
+    for path in (remote_copy_path(local_path), local_path):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=1) # Only the current file version: a replaced one is never read again
+def _read_bytes(path: str, mtime_ns: int) -> bytes:
+    """
+    File content, cached once per process for the current file version (mtime is part of the key)
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@timed()
+def load_pbix_bytes(local_path: str = PBIX_PATH) -> bytes:
+    """
+    Bytes of the Power BI dashboard file
+    """
+    path = pbix_path(local_path)
+    if path is None:
+        raise FileNotFoundError(f"Power BI file not found at {local_path}")
+    return _read_bytes(path, os.stat(path).st_mtime_ns)
+
+
+def fetch_remote(url: str = PBIX_URL, local_path: str = PBIX_PATH, timeout: float = PREFETCH_TIMEOUT) -> bool:
+    """
+    Download the remote file if its ETag changed since the last fetch; returns True when a new copy was saved
+    """
+    target = remote_copy_path(local_path)
+    etag_path = f"{target}.etag"
+    headers = {}
+    if os.path.exists(target) and os.path.exists(etag_path):
+        with open(etag_path, encoding="utf-8") as f:
+            headers["If-None-Match"] = f.read().strip()
+
+    with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304: # Unchanged since the last fetch
+            return False
+        response.raise_for_status()
+        tmp = f"{target}.tmp"
+        with open(tmp, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+        os.replace(tmp, target) # Readers never see a partial file
+        etag = response.headers.get("ETag")
+
+    if etag:
+        with open(etag_path, "w", encoding="utf-8") as f:
+            f.write(etag)
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def start_prefetch(url: str = PBIX_URL, local_path: str = PBIX_PATH) -> Optional[threading.Thread]:
+    """
+    Start the background prefetch once per process, if enabled through NETFLIX_PBIX_PREFETCH
+    """
+    if os.environ.get(PREFETCH_ENV, "") not in ("1", "true", "yes"):
+        return None
+
+    def run() -> None:
+        try:
+            fetch_remote(url, local_path)
+        except (requests.RequestException, OSError):
+            pass # The repository copy keeps being served
+
+    thread = threading.Thread(target=run, name="pbix-prefetch", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,315 @@
+"""
+Recommender engine for the Netflix Analysis app
+
+- Builds a compact top-k neighbour index from the sparse TF-IDF matrix
+- Answers similarity queries on demand with a sparse row x matrix product
+- Answers free-text queries through the fitted vectorizer (hot query vectors kept in an LRU cache)
+- HashingTfidfVectorizer: vocabulary-free TF-IDF for corpora counted chunk by chunk (scripts/08_build_models.py)
+- Saves / loads the TF-IDF matrix and neighbour index as memory-mappable .npy files
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import os
+import numpy as np
+from scipy import sparse
+
+# Number of neighbours stored per title in the prebuilt index
+DEFAULT_TOP_K = 50
+
+# Rows per block when building the index (bounds the dense block to block_size x N)
+BLOCK_SIZE = 1024
+
+# Artifact name prefixes inside app/models (each is stored as raw .npy files that can be memory-mapped)
+TFIDF_MATRIX_FILE = "tfidf_matrix"
+NEIGHBORS_FILE = "neighbors"
+
+# Columns of the hashing vectorizer (collisions stay rare for vocabularies well below this)
+HASHING_FEATURES = 1 << 18
+
+
+def top_k_batch(sims: np.ndarray, k: int, exclude: Optional[np.ndarray] = None,
+                allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores of every row in O(N) per row, sorted descending
+
+    exclude holds one column per row (usually the query title itself) that is never returned.
+    allowed is a boolean mask over the columns (see filters.py); other columns score -inf,
+    so when fewer than k columns pass, the tail of a row holds -inf scores.
+    Returns (indices, scores) as int32 / float32 arrays of shape (Q, k).
+    """
+    sims = np.array(sims, dtype=np.float32, ndmin=2) # Own copy, so excluded cells can be masked
+    n_candidates = sims.shape[1]
+    if allowed is not None:
+        sims[:, ~allowed] = -np.inf # Filter before selection, not after
+    if exclude is not None:
+        sims[np.arange(sims.shape[0]), np.asarray(exclude)] = -np.inf
+        n_candidates -= 1
+    k = max(min(k, n_candidates), 0)
+    if k == 0:
+        return np.empty((sims.shape[0], 0), dtype=np.int32), np.empty((sims.shape[0], 0), dtype=np.float32)
+
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k] # Unordered top-k per row
+    top_scores = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable") # Sort only the k survivors
+    return np.take_along_axis(top, order, axis=1).astype(np.int32), np.take_along_axis(top_scores, order, axis=1)
+
+
+def top_k(sims: np.ndarray, k: int, exclude: Optional[int] = None,
+          allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Single-row variant of top_k_batch; filtered-out (-inf) results are dropped, so fewer than k may be returned
+    """
+    indices, scores = top_k_batch(sims, k, None if exclude is None else [exclude], allowed)
+    keep = scores[0] > -np.inf
+    return indices[0][keep], scores[0][keep]
+
+
+def query_scores(tfidf_matrix, idx) -> np.ndarray:
+    """
+    Cosine similarity of one title (or a list of titles) against the whole catalog, computed on demand
+
+    TF-IDF rows are L2-normalised, so the dot product is the cosine similarity.
+    """
+    scores = np.asarray((tfidf_matrix[idx] @ tfidf_matrix.T).toarray(), dtype=np.float32)
+    return scores.ravel() if np.ndim(idx) == 0 else scores
+
+
+def similar_titles(tfidf_matrix, idx: int, k: int = 10, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    On-demand top-k neighbours of one title straight from the sparse TF-IDF matrix, optionally within a filter mask
+    """
+    return top_k(query_scores(tfidf_matrix, idx), k, exclude=idx, allowed=allowed)
+
+
+def similar_titles_batch(tfidf_matrix, idxs, k: int = 10, block_size: int = BLOCK_SIZE,
+                         allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    On-demand top-k neighbours of many titles at once, optionally within a filter mask
+
+    Queries are scored block by block (dense block_size x N, never N x N).
+    Returns (indices, scores) of shape (Q, k); with a filter, short rows are padded with -1 / -inf.
+    """
+    X = sparse.csr_matrix(tfidf_matrix, dtype=np.float32)
+    XT = X.T.tocsr()
+    idxs = np.asarray(idxs, dtype=np.int64)
+    k = max(min(k, X.shape[0] - 1), 0)
+    indices = np.empty((len(idxs), k), dtype=np.int32)
+    scores = np.empty((len(idxs), k), dtype=np.float32)
+    for start in range(0, len(idxs), block_size):
+        block = idxs[start:start + block_size]
+        sims = (X[block] @ XT).toarray()
+        indices[start:start + len(block)], scores[start:start + len(block)] = top_k_batch(sims, k, block, allowed)
+    indices[scores == -np.inf] = -1
+    return indices, scores
+
+
+class TextQueryEncoder:
+    """
+    Turns free text into a TF-IDF row with the fitted vectorizer, keeping hot queries in an LRU cache
+    """
+
+    def __init__(self, vectorizer, cache_size: int = 1024):
+        self.vectorizer = vectorizer
+        self._encode = lru_cache(maxsize=cache_size)(self._transform)
+
+    def _transform(self, text: str) -> sparse.csr_matrix:
+        return sparse.csr_matrix(self.vectorizer.transform([text]), dtype=np.float32)
+
+    def __call__(self, text: str) -> sparse.csr_matrix:
+        """
+        (1, V) sparse query row; cached rows are shared, so callers must not modify them
+        """
+        return self._encode(" ".join(str(text).lower().split())) # Case and spacing do not change the vector
+
+    def cache_info(self):
+        return self._encode.cache_info()
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF over hashed term columns: nothing to fit but the document frequencies, so a corpus can be counted
+    chunk by chunk and no vocabulary is held in memory or stored
+
+    Weights match TfidfVectorizer (term counts × smoothed IDF, L2-normalised rows); terms whose hashes collide
+    share a column. Fitting is count() per chunk, then fit_idf() once. vocabulary_ supports `term in` / len()
+    over the columns that occurred in the fit corpus.
+    """
+
+    def __init__(self, n_features: int = HASHING_FEATURES, stop_words: Optional[str] = "english",
+                 ngram_range: Tuple[int, int] = (1, 1), sublinear_tf: bool = False, norm: Optional[str] = "l2"):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.n_features = n_features
+        self.stop_words = stop_words
+        self.ngram_range = ngram_range
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.hasher = HashingVectorizer(n_features=n_features, stop_words=stop_words, ngram_range=ngram_range,
+                                        alternate_sign=False, norm=None, dtype=np.float32)
+        self.document_frequency_ = np.zeros(n_features, dtype=np.int64)
+        self.n_documents_ = 0
+        self.idf_ = None
+        self.seen_ = None
+
+    def get_params(self) -> Dict:
+        return {"n_features": self.n_features, "stop_words": self.stop_words, "ngram_range": self.ngram_range,
+                "sublinear_tf": self.sublinear_tf, "norm": self.norm, "max_features": None}
+
+    def build_analyzer(self):
+        return self.hasher.build_analyzer()
+
+    def count(self, texts) -> sparse.csr_matrix:
+        """
+        (len(texts), n_features) float32 term counts, added to the document frequencies the IDF is fitted from
+        """
+        counts = sparse.csr_matrix(self.hasher.transform(texts), dtype=np.float32)
+        self.document_frequency_ += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents_ += counts.shape[0]
+        return counts
+
+    def fit_idf(self) -> "HashingTfidfVectorizer":
+        """
+        Fix the IDF weights from every chunk passed to count(); only float32 weights and a seen-column bitmap are kept
+        """
+        n, df = self.n_documents_, self.document_frequency_
+        self.idf_ = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32) # smooth_idf, as TfidfVectorizer
+        self.seen_ = np.packbits(df > 0)
+        self.document_frequency_ = None # n_features int64s; not needed to transform
+        return self
+
+    def weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Turn term counts into TF-IDF rows in place
+        """
+        from sklearn.preprocessing import normalize
+
+        if self.sublinear_tf:
+            np.log(counts.data, out=counts.data)
+            counts.data += 1
+        counts.data *= self.idf_[counts.indices]
+        return normalize(counts, norm=self.norm, copy=False) if self.norm else counts
+
+    def transform(self, texts) -> sparse.csr_matrix:
+        counts = sparse.csr_matrix(self.hasher.transform(texts), dtype=np.float32)
+        return self.weight(counts)
+
+    @property
+    def vocabulary_(self) -> "_HashedVocabulary":
+        return _HashedVocabulary(np.unpackbits(self.seen_, count=self.n_features).astype(bool))
+
+
+class _HashedVocabulary:
+    """
+    Membership test over hashed columns (same index as HashingVectorizer without alternate signs)
+    """
+
+    def __init__(self, seen: np.ndarray):
+        self.seen = seen
+
+    def __contains__(self, term: str) -> bool:
+        from sklearn.utils import murmurhash3_32
+
+        return bool(self.seen[abs(murmurhash3_32(term, seed=0)) % len(self.seen)])
+
+    def __len__(self) -> int:
+        return int(self.seen.sum())
+
+
+def text_scores(tfidf_matrix, query_row) -> np.ndarray:
+    """
+    Cosine similarity of a (1, V) query row against the whole catalog, as one sparse matrix x vector product
+    """
+    return np.asarray((tfidf_matrix @ query_row.T).toarray(), dtype=np.float32).ravel()
+
+
+def similar_to_text(tfidf_matrix, query_row, k: int = 10, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k titles for a free-text query row; titles sharing no term with the query are never returned
+    """
+    scores = text_scores(tfidf_matrix, query_row)
+    indices, top_scores = top_k(scores, k, allowed=allowed)
+    keep = top_scores > 0
+    return indices[keep], top_scores[keep]
+
+
+def build_neighbor_index(tfidf_matrix, k: int = DEFAULT_TOP_K, block_size: int = BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the top-k most similar titles for every title
+
+    Returns (indices, scores) as int32 / float32 arrays of shape (N, k).
+    """
+    return similar_titles_batch(tfidf_matrix, np.arange(tfidf_matrix.shape[0]), k, block_size)
+
+
+def save_csr(path_prefix: str, matrix) -> None:
+    """
+    Save a CSR matrix as raw .npy arrays (data / indices / indptr / shape) that can be memory-mapped
+    """
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    matrix.sort_indices() # Loaded copies are read-only, so they must already be canonical
+    np.save(f"{path_prefix}.data.npy", matrix.data)
+    np.save(f"{path_prefix}.indices.npy", matrix.indices.astype(np.int32))
+    np.save(f"{path_prefix}.indptr.npy", matrix.indptr.astype(np.int64))
+    np.save(f"{path_prefix}.shape.npy", np.asarray(matrix.shape, dtype=np.int64))
+
+
+def load_csr(path_prefix: str, mmap_mode: Optional[str] = "r") -> sparse.csr_matrix:
+    """
+    Load a CSR matrix saved by save_csr; with mmap_mode='r' the arrays stay in the OS page cache
+    """
+    data = np.load(f"{path_prefix}.data.npy", mmap_mode=mmap_mode)
+    indices = np.load(f"{path_prefix}.indices.npy", mmap_mode=mmap_mode)
+    indptr = np.load(f"{path_prefix}.indptr.npy", mmap_mode=mmap_mode)
+    shape = tuple(int(n) for n in np.load(f"{path_prefix}.shape.npy"))
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+    matrix.has_sorted_indices = True # Saved sorted; skips a write into read-only memory
+    return matrix
+
+
+def has_tfidf_matrix(model_dir: str) -> bool:
+    """
+    True when the memory-mappable TF-IDF arrays exist in model_dir
+    """
+    return os.path.exists(os.path.join(model_dir, f"{TFIDF_MATRIX_FILE}.shape.npy"))
+
+
+def save_tfidf_matrix(model_dir: str, tfidf_matrix) -> str:
+    """
+    Save the sparse TF-IDF matrix (float32 CSR) into model_dir
+    """
+    path = os.path.join(model_dir, TFIDF_MATRIX_FILE)
+    save_csr(path, tfidf_matrix)
+    return path
+
+
+def load_tfidf_matrix(model_dir: str, mmap_mode: Optional[str] = "r") -> sparse.csr_matrix:
+    """
+    Load the sparse TF-IDF matrix from model_dir (memory-mapped by default)
+    """
+    return load_csr(os.path.join(model_dir, TFIDF_MATRIX_FILE), mmap_mode)
+
+
+def has_neighbor_index(model_dir: str) -> bool:
+    """
+    True when the neighbour index arrays exist in model_dir
+    """
+    return os.path.exists(os.path.join(model_dir, f"{NEIGHBORS_FILE}.scores.npy"))
+
+
+def save_neighbor_index(model_dir: str, indices: np.ndarray, scores: np.ndarray) -> str:
+    """
+    Save the neighbour index (int32 indices, float32 scores) into model_dir as raw .npy files
+    """
+    path = os.path.join(model_dir, NEIGHBORS_FILE)
+    np.save(f"{path}.indices.npy", np.ascontiguousarray(indices, dtype=np.int32))
+    np.save(f"{path}.scores.npy", np.ascontiguousarray(scores, dtype=np.float32))
+    return path
+
+
+def load_neighbor_index(model_dir: str, mmap_mode: Optional[str] = "r") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load the neighbour index from model_dir (memory-mapped by default)
+    """
+    path = os.path.join(model_dir, NEIGHBORS_FILE)
+    return np.load(f"{path}.indices.npy", mmap_mode=mmap_mode), np.load(f"{path}.scores.npy", mmap_mode=mmap_mode)
@@ -0,0 +1,263 @@
+"""
+Versioned, content-addressed registry of the recommender artifacts
+
+- Every published artifact set lives in its own directory, models/versions/<id>/, and is never modified
+  afterwards; <id> is derived from the SHA-256 of its files, so identical content gets the same version
+- Each version carries a manifest.json: per component (files sharing a name prefix, e.g. tfidf_matrix.*.npy)
+  the file hashes and sizes, the row count and the schema (array dtypes / shapes, reference columns,
+  vectorizer vocabulary), plus the parent version it was derived from
+- models/CURRENT names the served version and is swapped atomically (os.replace), so rolling forward or
+  back is one pointer write; processes that already memory-mapped the previous version keep reading it
+- New versions are assembled in a staging directory: unchanged components are hard-linked from the
+  current version, rewritten ones are written fresh, then the directory is renamed into place
+"""
+
+from typing import Dict, Iterable, List, Optional
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+VERSION_MANIFEST = "manifest.json"
+STAGING_PREFIX = ".staging-"
+
+
+class RegistryError(Exception):
+    pass
+
+
+def component_of(file_name: str) -> str:
+    """
+    Component a file belongs to: the name up to the first dot (tfidf_matrix.data.npy -> tfidf_matrix)
+    """
+    return file_name.split(".", 1)[0]
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ───────────────────── Versions and the current pointer ─────────────────────
+def versions_root(model_dir: str) -> str:
+    return os.path.join(model_dir, VERSIONS_DIR)
+
+
+def version_dir(model_dir: str, version: str) -> str:
+    return os.path.join(versions_root(model_dir), version)
+
+
+def current_version(model_dir: str) -> Optional[str]:
+    """
+    Version named by the CURRENT pointer, or None before the first publish
+    """
+    try:
+        with open(os.path.join(model_dir, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version if version and os.path.isdir(version_dir(model_dir, version)) else None
+
+
+def current_dir(model_dir: str) -> str:
+    """
+    Directory of the served version; model_dir itself for a flat (pre-registry) layout
+    """
+    version = current_version(model_dir)
+    return version_dir(model_dir, version) if version else model_dir
+
+
+def activate(model_dir: str, version: str) -> None:
+    """
+    Point CURRENT at version (atomic: readers see the old or the new id, never a partial file)
+    """
+    if not os.path.exists(os.path.join(version_dir(model_dir, version), VERSION_MANIFEST)):
+        raise RegistryError(f"Unknown model version {version!r}")
+    tmp = os.path.join(model_dir, f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(model_dir, CURRENT_FILE))
+
+
+def read_manifest(model_dir: str, version: str) -> Dict:
+    with open(os.path.join(version_dir(model_dir, version), VERSION_MANIFEST)) as f:
+        return json.load(f)
+
+
+def list_versions(model_dir: str) -> List[Dict]:
+    """
+    Manifests of every published version, oldest first
+    """
+    root = versions_root(model_dir)
+    if not os.path.isdir(root):
+        return []
+    manifests = [read_manifest(model_dir, v) for v in os.listdir(root)
+                 if os.path.exists(os.path.join(root, v, VERSION_MANIFEST))]
+    return sorted(manifests, key=lambda m: m["created"])
+
+
+# ───────────────────── Manifest ─────────────────────
+def _file_schema(path: str) -> Dict:
+    if path.endswith(".npy"):
+        array = np.load(path, mmap_mode="r") # Header only
+        return {"dtype": str(array.dtype), "shape": list(array.shape)}
+    return {}
+
+
+def _component_details(directory: str, component: str, files: List[str]) -> Dict:
+    """
+    Row count and schema of one component, read from array headers or the small pickles
+    """
+    schema = {name: _file_schema(os.path.join(directory, name)) for name in files if name.endswith(".npy")}
+    rows = None
+    if component == "tfidf_matrix":
+        rows = int(np.load(os.path.join(directory, "tfidf_matrix.shape.npy"))[0])
+    elif component in ("hybrid", "neighbors", "ann"):
+        first = {"hybrid": "hybrid.recency.npy", "neighbors": "neighbors.indices.npy", "ann": "ann.vectors.npy"}[component]
+        rows = schema[first]["shape"][0] if first in schema else None
+    elif component == "data_reference":
+        import joblib
+
+        df_ref = joblib.load(os.path.join(directory, files[0]))
+        rows = len(df_ref)
+        schema = {"columns": {c: str(t) for c, t in df_ref.dtypes.items()}}
+    elif component == "tfidf_vectorizer":
+        import joblib
+
+        tfidf = joblib.load(os.path.join(directory, files[0]))
+        params = tfidf.get_params()
+        schema = {"class": type(tfidf).__name__, "vocabulary": len(tfidf.vocabulary_),
+                  **{k: params[k] for k in ("max_features", "n_features", "stop_words", "ngram_range", "sublinear_tf", "norm")
+                     if k in params}}
+    return {"rows": rows, "schema": schema}
+
+
+def build_manifest(directory: str, parent: Optional[str] = None, note: str = "") -> Dict:
+    """
+    Manifest of the artifacts in directory; fails when components disagree on the number of rows
+    """
+    files = sorted(f for f in os.listdir(directory) if f != VERSION_MANIFEST and not f.startswith("."))
+    grouped: Dict[str, List[str]] = {}
+    for name in files:
+        grouped.setdefault(component_of(name), []).append(name)
+
+    components = {}
+    for component, names in grouped.items():
+        hashes = {name: {"sha256": sha256_file(os.path.join(directory, name)),
+                         "bytes": os.path.getsize(os.path.join(directory, name))} for name in names}
+        components[component] = {"files": hashes, **_component_details(directory, component, names)}
+
+    rows = {c: d["rows"] for c, d in components.items() if d["rows"] is not None}
+    if len(set(rows.values())) > 1:
+        raise RegistryError(f"Artifacts disagree on the number of titles: {rows}")
+    content = "\n".join(f"{name}:{components[component_of(name)]['files'][name]['sha256']}" for name in files)
+    return {
+        "version": hashlib.sha256(content.encode()).hexdigest()[:12],
+        "created": dt.datetime.now().isoformat(timespec="milliseconds"),
+        "parent": parent,
+        "note": note,
+        "rows": next(iter(rows.values()), None),
+        "components": components,
+    }
+
+
+def verify_version(model_dir: str, version: str) -> List[str]:
+    """
+    Files of a version whose size or hash no longer matches its manifest (empty when intact)
+    """
+    directory = version_dir(model_dir, version)
+    problems = []
+    for component in read_manifest(model_dir, version)["components"].values():
+        for name, expected in component["files"].items():
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                problems.append(f"{name}: missing")
+            elif os.path.getsize(path) != expected["bytes"] or sha256_file(path) != expected["sha256"]:
+                problems.append(f"{name}: content changed")
+    return problems
+
+
+# ───────────────────── Staging and publishing ─────────────────────
+def link_or_copy(src: str, dst: str) -> None:
+    """
+    Hard-link src to dst (no copy, same inode), copying when links are not possible
+    """
+    try:
+        os.link(src, dst)
+    except OSError: # Cross-device or no hard-link support
+        shutil.copy2(src, dst)
+
+
+def stage_version(model_dir: str, keep: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()) -> str:
+    """
+    Fresh staging directory holding the current version's components (all, or only keep), minus exclude
+
+    Files are hard links, so writers must only create files for components that were not staged:
+    writing through a link would modify the published version.
+    """
+    staging = os.path.join(model_dir, f"{STAGING_PREFIX}{uuid.uuid4().hex[:8]}")
+    os.makedirs(staging)
+    version = current_version(model_dir)
+    if version is None:
+        return staging
+    keep = None if keep is None else set(keep)
+    exclude = set(exclude)
+    source = version_dir(model_dir, version)
+    for name in os.listdir(source):
+        component = component_of(name)
+        if name == VERSION_MANIFEST or component in exclude or (keep is not None and component not in keep):
+            continue
+        link_or_copy(os.path.join(source, name), os.path.join(staging, name))
+    return staging
+
+
+def publish_version(model_dir: str, staging: str, note: str = "", make_current: bool = True) -> str:
+    """
+    Turn a staging directory into an immutable version (and serve it unless make_current is False)
+
+    The parent is the version current at publish time. Publishing content that already exists
+    reuses that version.
+    """
+    manifest = build_manifest(staging, parent=current_version(model_dir), note=note)
+    version = manifest["version"]
+    target = version_dir(model_dir, version)
+    if os.path.isdir(target):
+        shutil.rmtree(staging)
+    else:
+        with open(os.path.join(staging, VERSION_MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.makedirs(versions_root(model_dir), exist_ok=True)
+        try:
+            os.replace(staging, target)
+        except OSError: # Published concurrently with the same content
+            if not os.path.isdir(target):
+                raise
+            shutil.rmtree(staging)
+    if make_current:
+        activate(model_dir, version)
+    return version
+
+
+def discard_staging(staging: str) -> None:
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def remove_versions(model_dir: str, keep: int = 3) -> List[str]:
+    """
+    Delete all but the keep most recent versions (the current one is always kept); returns the deleted ids
+    """
+    current = current_version(model_dir)
+    manifests = list_versions(model_dir)
+    recent = {m["version"] for m in manifests[-keep:]} if keep > 0 else set()
+    removed = [m["version"] for m in manifests if m["version"] not in recent and m["version"] != current]
+    for version in removed:
+        shutil.rmtree(version_dir(model_dir, version))
+    return removed
@@ -1,3 +1,15 @@
+"""
+Global theme for the Netflix Analysis app
+
+- Dark blue palette with Netflix red highlights
+- apply_theme() injects the CSS on every page
+- Imports nothing heavy, so landing pages can use it without pulling in pandas / plotly
+"""
+
+import streamlit as st
+
+from instrumentation import timed
+
 THEME = {
     "primary": "#318E9F",        # Teal blue
     "secondary": "#3FA6AB",      # Muted aqua
@@ -9,4 +21,71 @@ THEME = {
     "background_alt": "#132936", # Slightly lighter navy for sections
     "text_primary": "#FFFFFF",   # White text
     "text_secondary": "#B8C7D1"  # Muted gray-blue text
-}
\ No newline at end of file
+}
+
+
+# Apply global theme and font styling
+@timed()
+def apply_theme():
+    """
+    Apply global dark Netflix theme and Aptos font across all pages
+    """
+    st.markdown(
+        f"""
+        <style>
+            @import url('https://fonts.cdnfonts.com/css/aptos');
+
+            html, body, [class*="css"] {{
+                font-family: 'Aptos', sans-serif !important;
+                background-color: {THEME['background']} !important;
+                color: {THEME['text_primary']};
+            }}
+
+            .stApp {{
+                background-color: {THEME['background']} !important;
+            }}
+
+            .block-container {{
+                background-color: {THEME['background']} !important;
+                padding-top: 2rem;
+                padding-bottom: 2rem;
+            }}
+
+            h1, h2, h3, h4, h5, h6 {{
+                color: {THEME['text_primary']};
+                font-weight: 600;
+            }}
+
+            p, li, span {{
+                color: {THEME['text_secondary']};
+                font-weight: 400;
+            }}
+
+            hr {{
+                border: 1px solid {THEME['accent1']};
+            }}
+
+            .stAlert {{
+                background-color: {THEME['background_alt']}AA !important;
+                color: {THEME['text_primary']};
+                border-radius: 6px;
+            }}
+
+            .stButton>button {{
+                background-color: {THEME['highlight']};
+                color: {THEME['text_primary']};
+                border-radius: 8px;
+                border: none;
+                padding: 0.6em 1.2em;
+                transition: 0.3s ease;
+                font-weight: 500;
+            }}
+
+            .stButton>button:hover {{
+                background-color: {THEME['highlight_dark']};
+                transform: scale(1.03);
+            }}
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
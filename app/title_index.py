@@ -0,0 +1,159 @@
+"""
+Title lookup index for the recommender
+
+- Exact lookups through a dict keyed by the normalised title (duplicates keep every row)
+- Prefix (autocomplete) lookups through a sorted key list and binary search
+- Fuzzy (typo-tolerant) lookups through a character trigram inverted index
+"""
+
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, List, Optional, Sequence
+import os
+import re
+import unicodedata
+import joblib
+import numpy as np
+
+# Artifact file name inside app/models (stored next to data_reference.pkl)
+TITLE_INDEX_FILE = "title_index.pkl"
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalise a title for matching: accents, case, punctuation and repeated spaces are ignored
+    """
+    title = unicodedata.normalize("NFKD", str(title))
+    title = "".join(ch for ch in title if not unicodedata.combining(ch))
+    title = _NON_WORD.sub(" ", title.casefold())
+    return _SPACES.sub(" ", title).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    """
+    Character trigrams of a normalised title, padded so short titles still produce grams
+    """
+    padded = f"  {text} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def _or_none(value):
+    """
+    Map missing values (None, NaN, pd.NA) to None and numpy scalars to plain Python values
+    """
+    try:
+        if value is None or value != value:
+            return None
+    except TypeError: # pd.NA refuses to be used as a bool
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class TitleIndex:
+    """
+    Prebuilt title lookup structure, built once with the other model files
+    """
+
+    def __init__(self, titles: Sequence[str], types: Optional[Sequence] = None, years: Optional[Sequence] = None):
+        self.titles = [str(t) for t in titles]
+        self.types = [_or_none(v) for v in types] if types is not None else [None] * len(self.titles)
+        self.years = [_or_none(v) for v in years] if years is not None else [None] * len(self.titles)
+
+        # Exact: normalised title -> every row position carrying it
+        self.exact: Dict[str, List[int]] = {}
+        for pos, title in enumerate(self.titles):
+            self.exact.setdefault(normalize_title(title), []).append(pos)
+
+        # Prefix: sorted unique keys for binary search
+        self.keys = sorted(self.exact)
+
+        # Fuzzy: trigram -> int32 array of key ids
+        postings: Dict[str, List[int]] = {}
+        self.key_gram_counts = np.empty(len(self.keys), dtype=np.int32)
+        for key_id, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.key_gram_counts[key_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(key_id)
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def lookup(self, title: str) -> List[int]:
+        """
+        Row positions whose title matches exactly after normalisation (empty list if none)
+        """
+        return self.exact.get(normalize_title(title), [])
+
+    def label(self, pos: int) -> str:
+        """
+        Display label that tells duplicate titles apart, e.g. 'Title (Movie, 2019)'
+        """
+        details = [str(v) for v in (self.types[pos], self.years[pos]) if v is not None]
+        return f"{self.titles[pos]} ({', '.join(details)})" if details else self.titles[pos]
+
+    def prefix(self, text: str, limit: int = 10) -> List[int]:
+        """
+        Row positions whose normalised title starts with text, in alphabetical order
+        """
+        text = normalize_title(text)
+        if not text:
+            return []
+        results: List[int] = []
+        for key in islice(self.keys, bisect_left(self.keys, text), None): # Walk forward from the first candidate only
+            if not key.startswith(text) or len(results) >= limit:
+                break
+            results.extend(self.exact[key])
+        return results[:limit]
+
+    def fuzzy(self, text: str, limit: int = 10, min_score: float = 0.3) -> List[int]:
+        """
+        Row positions of the closest titles by trigram Dice similarity, best first
+        """
+        query_grams = trigrams(normalize_title(text))
+        grams = [g for g in query_grams if g in self.postings]
+        if not grams:
+            return []
+        hits = np.bincount(np.concatenate([self.postings[g] for g in grams]), minlength=len(self.keys))
+        candidates = np.flatnonzero(hits)
+        scores = 2.0 * hits[candidates] / (self.key_gram_counts[candidates] + len(query_grams))
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")[:limit]
+
+        results: List[int] = []
+        for key_id in candidates[order]:
+            results.extend(self.exact[self.keys[key_id]])
+        return results[:limit]
+
+    def suggest(self, text: str, limit: int = 10) -> List[int]:
+        """
+        Autocomplete suggestions: exact matches, then prefix matches, then fuzzy matches
+        """
+        results: List[int] = []
+        for pos in self.lookup(text) + self.prefix(text, limit):
+            if pos not in results:
+                results.append(pos)
+        if len(results) < limit: # Fuzzy matching only when exact + prefix leave room
+            results += [pos for pos in self.fuzzy(text, limit) if pos not in results]
+        return results[:limit]
+
+
+def save_title_index(model_dir: str, index: TitleIndex) -> str:
+    """
+    Save the title index into model_dir
+    """
+    path = os.path.join(model_dir, TITLE_INDEX_FILE)
+    joblib.dump(index, path)
+    return path
+
+
+def load_title_index(model_dir: str) -> TitleIndex:
+    """
+    Load the title index from model_dir
+    """
+    return joblib.load(os.path.join(model_dir, TITLE_INDEX_FILE))
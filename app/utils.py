@@ -1,119 +1,44 @@
 """
 Utility module for the Netflix Analysis app
 
-- Applies global dark blue theme with Netflix red highlights
 - Handles data loading with Streamlit caching
+- Re-exports the global theme (see theme.py, kept free of heavy imports)
 """
 
-from typing import Tuple
+from typing import Optional, Sequence, Tuple
 import os
 import pandas as pd
 import streamlit as st
 
-# Define dark blue + Netflix red theme
-THEME = {
-    "primary": "#318E9F",
-    "secondary": "#3FA6AB",
-    "accent1": "#58C5FE",
-    "accent2": "#19475F",
-    "highlight": "#FF4B4B",
-    "highlight_dark": "#D93C3C",
-    "background": "#0A1923",
-    "background_alt": "#132936",
-    "text_primary": "#FFFFFF",
-    "text_secondary": "#B8C7D1"
-}
-
-
-# Apply global theme and font styling
-def apply_theme():
-    """
-    Apply global dark Netflix theme and Aptos font across all pages
-    """
-    st.markdown(
-        f"""
-        <style>
-            @import url('https://fonts.cdnfonts.com/css/aptos');
-
-            html, body, [class*="css"] {{
-                font-family: 'Aptos', sans-serif !important;
-                background-color: {THEME['background']} !important;
-                color: {THEME['text_primary']};
-            }}
-
-            .stApp {{
-                background-color: {THEME['background']} !important;
-            }}
-
-            .block-container {{
-                background-color: {THEME['background']} !important;
-                padding-top: 2rem;
-                padding-bottom: 2rem;
-            }}
-
-            h1, h2, h3, h4, h5, h6 {{
-                color: {THEME['text_primary']};
-                font-weight: 600;
-            }}
-
-            p, li, span {{
-                color: {THEME['text_secondary']};
-                font-weight: 400;
-            }}
-
-            hr {{
-                border: 1px solid {THEME['accent1']};
-            }}
-
-            .stAlert {{
-                background-color: {THEME['background_alt']}AA !important;
-                color: {THEME['text_primary']};
-                border-radius: 6px;
-            }}
-
-            .stButton>button {{
-                background-color: {THEME['highlight']};
-                color: {THEME['text_primary']};
-                border-radius: 8px;
-                border: none;
-                padding: 0.6em 1.2em;
-                transition: 0.3s ease;
-                font-weight: 500;
-            }}
-
-            .stButton>button:hover {{
-                background-color: {THEME['highlight_dark']};
-                transform: scale(1.03);
-            }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+from data_store import CLEAN_DIR, read_clean
+from instrumentation import timed
+from theme import THEME, apply_theme # Re-exported: the theme lives in the import-light theme module
 
 
 # Load main cleaned dataset
+@timed()
 @st.cache_data(ttl=60 * 60 * 24)
-def load_master_data(path: str = r"C:\Users\Admin\OneDrive\Desktop\Netflix Project\netflix-analysis-project\data\cleaned\netflix_titles_clean.csv") -> pd.DataFrame:
+def load_master_data(columns: Optional[Sequence[str]] = None, cleaned_folder: str = CLEAN_DIR) -> pd.DataFrame:
     """
-    Load main cleaned Netflix titles CSV
+    Load main cleaned Netflix titles dataset (typed columns, Parquet when available)
     """
-    df = pd.read_csv(path)
-    if "date_added_year" not in df.columns:
+    df = read_clean(columns, cleaned_folder)
+    if "date_added_year" not in df.columns and (columns is None or "date_added_year" in columns):
         if "date_added" in df.columns:
-            df["date_added"] = pd.to_datetime(df["date_added"], errors="coerce")
-            df["date_added_year"] = df["date_added"].dt.year
+            df["date_added_year"] = df["date_added"].dt.year.astype("Int16")
         else:
             df["date_added_year"] = pd.NA
     return df
 
 
 # Load helper aggregated datasets
+@timed()
 @st.cache_data(ttl=60 * 60 * 24)
-def load_helper_tables(cleaned_folder: str = r"C:\Users\Admin\OneDrive\Desktop\Netflix Project\netflix-analysis-project\data\cleaned") -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def load_helper_tables(cleaned_folder: str = CLEAN_DIR, columns: Optional[Sequence[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load cleaned Netflix data and all helper CSVs
     """
-    df_clean = pd.read_csv(os.path.join(cleaned_folder, "netflix_titles_clean.csv"))
+    df_clean = read_clean(columns, cleaned_folder)
     agg_by_year_type = pd.read_csv(os.path.join(cleaned_folder, "agg_by_year_type.csv"))
     agg_by_genre = pd.read_csv(os.path.join(cleaned_folder, "agg_by_genre.csv"))
     agg_by_country = pd.read_csv(os.path.join(cleaned_folder, "agg_by_country.csv"))
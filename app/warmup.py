@@ -0,0 +1,134 @@
+"""
+Process-wide warm-up of the app's data and model caches
+
+- Each step imports its heavy modules lazily and calls a page's cached loader once, so the shared
+  st.cache_data / st.cache_resource entries are filled before the first visit
+- start_background_warmup() runs the steps once per server process in a daemon thread; every page
+  calls it (a no-op after the first time) and scripts/serve.py calls it as soon as the server is up
+- warmup_status() lets pages query readiness per step without blocking
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+PENDING, RUNNING, READY, FAILED = "pending", "running", "ready", "failed"
+THREAD_NAME = "netflix-warmup"
+
+
+def _warm_figures() -> None:
+    from figures import load_cube, load_figures
+
+    load_cube()
+    load_figures()
+
+
+def _warm_recommender() -> None:
+    from artifacts import QUERY_MODES, load_recommender
+
+    load_recommender().preload(QUERY_MODES["title"]) # The default search mode; others load on first use
+
+
+# (label, step) in run order: the dashboard figures first, the recommender index (slowest) last.
+# Only what the pages read: the cube / figures and the recommender, not the full master frame
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("dashboard data", _warm_figures),
+    ("recommender models", _warm_recommender),
+]
+
+
+class WarmupStatus:
+    """
+    Thread-safe readiness of each warm-up step (pending / running / ready / failed)
+    """
+
+    def __init__(self, labels: List[str]):
+        self._lock = threading.Lock()
+        self._steps = {label: {"state": PENDING, "seconds": None, "error": None} for label in labels}
+        self._done = {label: threading.Event() for label in labels}
+        self.started_at = time.time()
+
+    def _update(self, label: str, **fields) -> None:
+        with self._lock:
+            self._steps[label].update(fields)
+        if fields.get("state") in (READY, FAILED):
+            self._done[label].set()
+
+    def state(self, label: str) -> str:
+        with self._lock:
+            return self._steps[label]["state"]
+
+    def is_ready(self, label: Optional[str] = None) -> bool:
+        """
+        True once label (or every step when None) has finished, successfully or not
+        """
+        labels = self._done if label is None else [label]
+        return all(self._done[l].is_set() for l in labels)
+
+    def wait(self, label: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until label (or every step) has finished or timeout expires; returns is_ready()
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for l in (self._done if label is None else [label]):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._done[l].wait(remaining):
+                return False
+        return True
+
+    def errors(self) -> Dict[str, str]:
+        with self._lock:
+            return {label: s["error"] for label, s in self._steps.items() if s["state"] == FAILED}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Copy of {label: {"state", "seconds", "error"}} for display
+        """
+        with self._lock:
+            return {label: dict(s) for label, s in self._steps.items()}
+
+
+def _run_steps(status: WarmupStatus) -> None:
+    # A failing step does not stop the others; its page reports the error when opened
+    for label, step in WARMUP_STEPS:
+        status._update(label, state=RUNNING)
+        start = time.perf_counter()
+        try:
+            step()
+            status._update(label, state=READY, seconds=time.perf_counter() - start)
+        except Exception as e:
+            status._update(label, state=FAILED, seconds=time.perf_counter() - start, error=str(e))
+
+
+class _SkipWarmupThread(logging.Filter):
+    # The loaders' st.* calls have no session to render to in the warm-up thread; Streamlit logs
+    # "missing ScriptRunContext" for each of them, which is expected here
+    def filter(self, record: logging.LogRecord) -> bool:
+        return threading.current_thread().name != THREAD_NAME
+
+
+_status: Optional[WarmupStatus] = None
+_status_lock = threading.Lock()
+
+
+def start_background_warmup() -> WarmupStatus:
+    """
+    Start the warm-up thread once per process (later calls return the running status)
+
+    The Streamlit runtime must exist, so the caches being filled are the ones the sessions read.
+    """
+    global _status
+    with _status_lock:
+        if _status is None:
+            _status = WarmupStatus([label for label, _ in WARMUP_STEPS])
+            logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_SkipWarmupThread())
+            threading.Thread(target=_run_steps, args=(_status,), name=THREAD_NAME, daemon=True).start()
+        return _status
+
+
+def warmup_status() -> Optional[WarmupStatus]:
+    """
+    Status of this process's warm-up, or None if it has not been started
+    """
+    return _status
@@ -0,0 +1,159 @@
+"""
+Load test for the recommendation HTTP / JSON API: throughput and tail latency under concurrent clients
+
+- Starts scripts/api_server.py in a separate process per batching setting (or targets --url), so the
+  client threads do not share the server's interpreter
+- Each concurrency level runs N keep-alive client threads for --duration seconds against a query mix:
+  neighbour-table lookups, deep (k > stored neighbours) title queries, filtered title queries, free text
+- Per setting and level: QPS, p50 / p95 / p99 latency, errors and the server's mean micro-batch size
+- Default settings compare micro-batching (as shipped, and with a 2 ms collection window) against one query
+  per product (--max-batch 1 --max-wait-ms 0)
+
+Usage (from the project root, after scripts/01_fetch_models.py):
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --concurrency 1 16 64 --duration 10 --mix 0.25 0.25 0.25 0.25
+    python benchmarks/bench_api.py --url http://127.0.0.1:8502 --concurrency 32
+"""
+
+import argparse
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "app"))
+
+TEXT_QUERIES = ["korean crime thriller", "space adventure for kids", "romantic comedy in paris", "true crime documentary",
+                "stand-up comedy special", "anime fantasy", "british period drama", "zombie apocalypse", "cooking competition"]
+# Settings compared by default: name -> scripts/api_server.py arguments
+SETTINGS = {"batched": [], "wait-2ms": ["--max-wait-ms", "2"], "unbatched": ["--max-batch", "1", "--max-wait-ms", "0"]}
+
+
+def workload(titles, n, mix, seed=0):
+    """n GET paths drawn from the mix shares (lookup, deep, filtered, text)"""
+    rng = np.random.default_rng(seed)
+    kinds = rng.choice(4, size=n, p=np.asarray(mix) / np.sum(mix))
+    paths = []
+    for kind in kinds:
+        title = str(rng.choice(titles))
+        params = [{"title": title, "k": 10},
+                  {"title": title, "k": 100},
+                  {"title": title, "k": 10, "type": str(rng.choice(["Movie", "Tv Show"])), "year_min": 2018},
+                  {"q": str(rng.choice(TEXT_QUERIES)), "k": 10}][kind]
+        paths.append("/recommend?" + urlencode(params))
+    return paths
+
+
+def get_json(host, port, path, timeout=30):
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request("GET", path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def run_level(host, port, paths, concurrency, duration):
+    """Closed-loop clients (one keep-alive connection each) for duration seconds -> latencies (ms), errors"""
+    latencies, errors, lock = [], [0], threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        mine, failed, i = [], 0, offset
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", paths[i % len(paths)])
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            mine.append((time.perf_counter() - start) * 1000)
+            i += concurrency
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.asarray(latencies), errors[0]
+
+
+def start_server(port, extra_args):
+    """scripts/api_server.py in a child process; returns it once /health answers"""
+    process = subprocess.Popen([sys.executable, str(PROJECT_ROOT / "scripts" / "api_server.py"), "--port", str(port), *extra_args],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            get_json("127.0.0.1", port, "/health", timeout=1)
+            return process
+        except (OSError, http.client.HTTPException, ValueError):
+            if process.poll() is not None:
+                raise SystemExit("ERROR: API server exited during start-up (run scripts/01_fetch_models.py first?)")
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit("ERROR: API server did not answer /health within 120s")
+
+
+def bench(host, port, paths, levels, duration, label):
+    for concurrency in levels:
+        run_level(host, port, paths, concurrency, min(1.0, duration)) # Warm connections and caches
+        before = get_json(host, port, "/health")
+        latencies, errors = run_level(host, port, paths, concurrency, duration)
+        after = get_json(host, port, "/health")
+        batches = after["batches"] - before["batches"]
+        batch_size = (after["queries"] - before["queries"]) / batches if batches else 0.0
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        print(f"{label:<10} {concurrency:>5}  {len(latencies) / duration:>9,.0f}  {p50:>8.2f}  {p95:>8.2f}  {p99:>8.2f}  "
+              f"{errors:>6}  {batch_size:>10.1f}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the recommendation API (QPS and tail latency).")
+    parser.add_argument("--url", help="Existing server to test, e.g. http://127.0.0.1:8502 (default: start one per setting).")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the servers started here.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64], help="Concurrent clients per level.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per level.")
+    parser.add_argument("--mix", type=float, nargs=4, default=[0.4, 0.2, 0.2, 0.2], metavar=("LOOKUP", "DEEP", "FILTERED", "TEXT"),
+                        help="Query mix shares.")
+    parser.add_argument("--queries", type=int, default=5000, help="Distinct request paths cycled through.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from artifacts import load_recommender
+
+    titles = load_recommender()["title_index"].titles
+    paths = workload(titles, args.queries, args.mix, args.seed)
+    print(f"{'setting':<10} {'conc':>5}  {'QPS':>9}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'errors':>6}  {'batch size':>10}")
+    if args.url:
+        url = urlsplit(args.url)
+        bench(url.hostname, url.port or 80, paths, args.concurrency, args.duration, "external")
+        return
+    for label, extra_args in SETTINGS.items():
+        process = start_server(args.port, extra_args)
+        try:
+            bench("127.0.0.1", args.port, paths, args.concurrency, args.duration, label)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
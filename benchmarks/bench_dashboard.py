@@ -0,0 +1,105 @@
+"""
+Dashboard cross-filter benchmark: cube slices vs regrouping the titles
+
+- Catalogs: the cleaned dataset resampled to 1x-100x its size
+- Per scale: cube build time, non-empty cells, .npz size, p50 / p99 latency of one filter interaction
+  served by DataCube.slice() and, for comparison, by filtering + grouping the title frame with pandas
+- Filter selections are random combinations of year range, type, rating, country and genre
+
+Usage (from the project root):
+    python benchmarks/bench_dashboard.py
+    python benchmarks/bench_dashboard.py --scales 1 10 100 --interactions 500
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "app"))
+from cube import CUBE_COLUMNS, DataCube, save_cube
+from data_store import read_clean
+from genres import GENRE_SEPARATOR, load_genre_matrix
+
+
+def percentiles_ms(fn, args_list):
+    """p50 / p99 latency of fn over args_list, in milliseconds"""
+    times = []
+    for kwargs in args_list:
+        start = time.perf_counter()
+        fn(**kwargs)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 99))
+
+
+def random_filters(cube, n, seed=0):
+    """n filter selections, each field set with probability 1/2"""
+    rng = np.random.default_rng(seed)
+    first, last = cube.year_range()
+    selections = []
+    for _ in range(n):
+        selection = {}
+        for name, field, size in (("types", "type", 1), ("ratings", "rating", 2), ("countries", "country", 3), ("genres", "genre", 2)):
+            if rng.random() < 0.5:
+                selection[name] = list(rng.choice(cube.values(field), size, replace=False))
+        if rng.random() < 0.5:
+            selection["year_min"] = int(rng.integers(first, last + 1))
+            selection["year_max"] = int(rng.integers(selection["year_min"], last + 1))
+        selections.append(selection)
+    return selections
+
+
+def pandas_slice(df, genre_lists, types=None, ratings=None, countries=None, genres=None, year_min=None, year_max=None):
+    """The same chart totals computed from the title frame (what each interaction would cost without the cube)"""
+    keep = np.ones(len(df), dtype=bool)
+    for column, selected in (("type", types), ("rating", ratings), ("primary_country", countries)):
+        if selected:
+            keep &= df[column].isin(selected).to_numpy()
+    if genres:
+        keep &= genre_lists.apply(lambda g: not set(g).isdisjoint(genres)).to_numpy()
+    if year_min is not None:
+        keep &= (df["date_added_year"] >= year_min).fillna(False).to_numpy()
+    if year_max is not None:
+        keep &= (df["date_added_year"] <= year_max).fillna(False).to_numpy()
+    sub = df[keep]
+    return (sub.groupby(["date_added_year", "type"], observed=True).size(),
+            sub.groupby(["rating", "type"], observed=True).size(),
+            sub["primary_country"].value_counts(),
+            genre_lists[keep].explode().value_counts())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard filter interactions over scaled catalogs.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100], help="Catalog sizes relative to the cleaned dataset.")
+    parser.add_argument("--interactions", type=int, default=200, help="Random filter selections per scale.")
+    parser.add_argument("--pandas-limit", type=int, default=50, help="Selections timed on the pandas path (it is slow at large scales).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    base = read_clean(CUBE_COLUMNS)
+    vocab, genre_matrix = load_genre_matrix()
+    for scale in args.scales:
+        n = int(len(base) * scale)
+        df = base.sample(n, replace=scale != 1, random_state=args.seed)
+        rows, df = df.index.to_numpy(), df.reset_index(drop=True)
+
+        start = time.perf_counter()
+        cube = DataCube.from_frame(df, (vocab, genre_matrix[rows])) # As figures.py: rows of the persisted genre matrix
+        build_s = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as tmp:
+            size_kb = Path(save_cube(str(Path(tmp) / "cube.npz"), cube)).stat().st_size / 1024
+
+        selections = random_filters(cube, args.interactions, args.seed)
+        cube_p50, cube_p99 = percentiles_ms(cube.slice, selections)
+        genre_lists = df["genres_str"].astype("string").fillna("").str.split(GENRE_SEPARATOR)
+        pandas_p50, pandas_p99 = percentiles_ms(lambda **kw: pandas_slice(df, genre_lists, **kw), selections[:args.pandas_limit])
+        print(f"{scale:>5g}x {n:>9,} titles  cube build {build_s:5.2f}s  {cube.n_cells:>7,} cells  {size_kb:7.1f} KB  "
+              f"slice p50/p99 {cube_p50:6.2f}/{cube_p99:6.2f} ms  pandas p50/p99 {pandas_p50:8.1f}/{pandas_p99:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Recommender benchmark and regression suite
+
+- Catalogs: the cleaned dataset (1x) and synthetic catalogs scaled up by resampling its metadata text
+- Per scale: TF-IDF fit time (same settings as notebooks/04_recommender), index build time, artifact
+  size + load time, p50 / p99 query latency, batch throughput, recall / genre precision, peak RSS
+- Every scale runs in a fresh process, so peak RSS belongs to that scale only
+- Results are written as JSON; --baseline compares against an earlier run and exits with 1 on a regression
+
+Usage (from the project root):
+    python benchmarks/bench_recommender.py                                   # scales 1 2 5 10
+    python benchmarks/bench_recommender.py --scales 1 10 100 --queries 500
+    python benchmarks/bench_recommender.py --output benchmarks/results/baseline.json
+    python benchmarks/bench_recommender.py --baseline benchmarks/results/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "app"))
+from ann import ANN_MIN_TITLES, build_ann_index, recall_at_k
+from data_store import read_clean
+from genres import genre_jaccard, load_genre_matrix
+from recommender import (
+    DEFAULT_TOP_K,
+    TextQueryEncoder,
+    build_neighbor_index,
+    load_neighbor_index,
+    load_tfidf_matrix,
+    save_neighbor_index,
+    save_tfidf_matrix,
+    similar_titles,
+    similar_titles_batch,
+    similar_to_text,
+)
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+K = 10
+
+# Metric -> True when higher is better (only these are checked against a baseline)
+TRACKED_METRICS = {
+    "tfidf_fit_s": False,
+    "index_build_s": False,
+    "artifact_load_s": False,
+    "table_p50_ms": False,
+    "table_p99_ms": False,
+    "on_demand_p50_ms": False,
+    "on_demand_p99_ms": False,
+    "text_p50_ms": False,
+    "text_p99_ms": False,
+    "batch_titles_per_s": True,
+    "peak_rss_mb": False,
+    "recall_at_10": True,
+    "genre_precision_at_10": True,
+}
+# Absolute changes below these are timer noise, never reported as regressions
+NOISE_FLOOR = {"_ms": 0.5, "_s": 0.1}
+TEXT_QUERIES = ["korean crime thriller", "stand-up comedy special", "romantic comedy in new york",
+                "documentary about nature and wildlife", "anime action adventure", "british period drama"]
+
+
+# ───────────────────── Catalogs ─────────────────────
+def load_catalog():
+    """Cleaned titles with the text the recommender is fitted on"""
+    df = read_clean(["title", "metadata", "genres_str"]).reset_index(drop=True)
+    df["metadata"] = df["metadata"].fillna("").astype(str)
+    df["genres_str"] = df["genres_str"].astype("string").fillna("").astype(str)
+    df["source_row"] = np.arange(len(df)) # Row of the cleaned dataset (and of its genre matrix)
+    return df
+
+
+def scaled_catalog(df, scale, seed=0):
+    """
+    Catalog of scale x len(df) titles; beyond 1x every synthetic title joins the first half of one
+    title's metadata with the second half of another's, keeping the vocabulary realistic
+    """
+    if scale == 1:
+        return df
+    rng = np.random.default_rng(seed)
+    n = int(len(df) * scale)
+    words = df["metadata"].str.split().to_numpy()
+    first, second = rng.integers(len(df), size=n), rng.integers(len(df), size=n)
+    metadata = [" ".join(words[a][:len(words[a]) // 2] + words[b][len(words[b]) // 2:]) for a, b in zip(first, second)]
+    return pd.DataFrame({
+        "title": [f"synthetic {i}" for i in range(n)],
+        "metadata": metadata,
+        "genres_str": df["genres_str"].to_numpy()[first], # Genres follow the first half
+        "source_row": df["source_row"].to_numpy()[first],
+    })
+
+
+def combined_features(df):
+    """Same feature text as notebooks/04_recommender"""
+    return df["metadata"].str.lower() + " " + df["genres_str"].str.lower()
+
+
+# ───────────────────── Measurements ─────────────────────
+def percentiles_ms(fn, args_list):
+    """p50 / p99 latency of fn over args_list, in milliseconds"""
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 99))
+
+
+def genre_precision(source_rows, queries, neighbors):
+    """Share of recommended titles sharing at least one genre with their query title (genre Jaccard > 0)"""
+    matrix = load_genre_matrix()[1][source_rows]
+    hits = []
+    for q, row in zip(queries, neighbors):
+        row = row[row >= 0]
+        hits.extend(genre_jaccard(matrix, q, row) > 0)
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def bench_scale(scale, n_queries=1000, seed=0):
+    """Every measurement for one catalog scale (run in a fresh process)"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    df = scaled_catalog(load_catalog(), scale, seed)
+    features = combined_features(df)
+    result = {"scale": scale, "n_titles": len(df)}
+
+    # TF-IDF fit (notebooks/04_recommender settings)
+    start = time.perf_counter()
+    tfidf = TfidfVectorizer(stop_words="english", max_features=5000)
+    tfidf_matrix = tfidf.fit_transform(features)
+    result["tfidf_fit_s"] = time.perf_counter() - start
+    result["vocabulary"] = len(tfidf.vocabulary_)
+
+    # Index build: what artifacts.ensure_artifacts builds at this size
+    n = tfidf_matrix.shape[0]
+    use_ann = n >= ANN_MIN_TITLES
+    result["backend"] = "ivf" if use_ann else "exact"
+    start = time.perf_counter()
+    ann_index = build_ann_index(tfidf_matrix) if use_ann else None
+    neighbors = (ann_index.search(tfidf_matrix, np.arange(n), DEFAULT_TOP_K) if use_ann
+                 else build_neighbor_index(tfidf_matrix, DEFAULT_TOP_K))
+    result["index_build_s"] = time.perf_counter() - start
+
+    # Artifacts: size on disk and memory-mapped load time
+    with tempfile.TemporaryDirectory() as model_dir:
+        save_tfidf_matrix(model_dir, tfidf_matrix)
+        save_neighbor_index(model_dir, *neighbors)
+        result["artifact_mb"] = sum(f.stat().st_size for f in Path(model_dir).iterdir()) / 2**20
+        start = time.perf_counter()
+        matrix = load_tfidf_matrix(model_dir, mmap_mode="r")
+        neighbor_idx, _ = load_neighbor_index(model_dir, mmap_mode="r")
+        result["artifact_load_s"] = time.perf_counter() - start
+
+        rng = np.random.default_rng(seed)
+        queries = rng.choice(n, size=min(n_queries, n), replace=False)
+        titles = df["title"]
+
+        # recommend(): precomputed table lookup, then on-demand scoring (deeper lists / filters)
+        result["table_p50_ms"], result["table_p99_ms"] = percentiles_ms(
+            lambda q: titles.iloc[neighbor_idx[q, :K]].to_numpy(), [(q,) for q in queries])
+        on_demand = (lambda q: ann_index.search(matrix, [q], K)) if use_ann else (lambda q: similar_titles(matrix, q, K))
+        result["on_demand_p50_ms"], result["on_demand_p99_ms"] = percentiles_ms(on_demand, [(q,) for q in queries])
+
+        # Free-text queries (cold: the LRU cache is bypassed by a fresh encoder per query)
+        text_args = [(TEXT_QUERIES[i % len(TEXT_QUERIES)],) for i in range(min(n_queries, 200))]
+        result["text_p50_ms"], result["text_p99_ms"] = percentiles_ms(
+            lambda text: similar_to_text(matrix, TextQueryEncoder(tfidf)(text), K), text_args)
+
+        # Batch throughput
+        start = time.perf_counter()
+        batch_idx, _ = (ann_index.search(matrix, queries, K) if use_ann else similar_titles_batch(matrix, queries, K))
+        result["batch_titles_per_s"] = len(queries) / (time.perf_counter() - start)
+
+        # Quality: neighbour table vs exact search, and genre agreement of the recommendations
+        exact_idx, _ = similar_titles_batch(matrix, queries, K)
+        result["recall_at_10"] = recall_at_k(np.asarray(neighbor_idx[queries, :K]), exact_idx, K)
+        result["genre_precision_at_10"] = genre_precision(df["source_row"].to_numpy(), queries, batch_idx)
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+# ───────────────────── Baseline comparison ─────────────────────
+def compare(results, baseline, tolerance):
+    """Metrics that got worse than the baseline by more than tolerance (relative), per scale"""
+    base_by_scale = {r["scale"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        base = base_by_scale.get(result["scale"])
+        if base is None:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            if metric not in result or metric not in base or not base[metric]:
+                continue
+            floor = next((v for suffix, v in NOISE_FLOOR.items() if metric.endswith(suffix)), 0)
+            if abs(result[metric] - base[metric]) < floor:
+                continue
+            change = (result[metric] - base[metric]) / abs(base[metric])
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append((result["scale"], metric, base[metric], result[metric], change))
+    return regressions
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import scipy
+    import sklearn
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "scikit_learn": sklearn.__version__,
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recommender over scaled catalogs.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 2, 5, 10], help="Catalog sizes relative to the cleaned dataset.")
+    parser.add_argument("--queries", type=int, default=1000, help="Sampled query titles per scale.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/<timestamp>.json).")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown / quality loss vs the baseline.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scales:
+        scale = int(scale) if float(scale).is_integer() else scale
+        # Fresh interpreter per scale: peak RSS and caches are not shared between scales
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(bench_scale, scale, args.queries, args.seed).result()
+        results.append(result)
+        print(f"{scale:>5}x {result['n_titles']:>9,} titles [{result['backend']}]  fit {result['tfidf_fit_s']:6.1f}s  "
+              f"build {result['index_build_s']:7.1f}s  on-demand p50/p99 {result['on_demand_p50_ms']:.2f}/{result['on_demand_p99_ms']:.2f} ms  "
+              f"batch {result['batch_titles_per_s']:,.0f}/s  recall {result['recall_at_10']:.3f}  RSS {result['peak_rss_mb']:,.0f} MB")
+
+    report = {"meta": run_metadata(), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print("Saved:", output)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for scale, metric, before, after, change in regressions:
+            print(f"REGRESSION {scale}x {metric}: {before:.4g} -> {after:.4g} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
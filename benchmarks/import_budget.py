@@ -0,0 +1,88 @@
+"""
+Import-time budget per Streamlit page
+
+- Reads the top-level imports of every page (App.py and app/pages/*.py)
+- Imports them in a fresh interpreter, after streamlit itself, and times what the page adds on top
+- Fails when a page exceeds its budget or when a landing page pulls in a heavy library
+
+Usage (from the project root):
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --runs 5 --json benchmarks/results/import_budget.json
+"""
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+# Page -> milliseconds allowed on top of `import streamlit`
+BUDGET_MS = {
+    "App.py": 150,
+    "01_Home.py": 150,
+    "02_Dashboards.py": 1000,
+    "03_Recommender.py": 1500,
+}
+# Landing pages must render without these
+HEAVY_MODULES = ["pandas", "plotly.express", "plotly.graph_objects", "sklearn", "joblib", "scipy", "pyarrow"]
+LIGHT_PAGES = {"App.py", "01_Home.py"}
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {app_dir!r})
+import streamlit
+before = set(sys.modules)
+start = time.perf_counter()
+{imports}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def page_imports(path):
+    """Top-level import statements of a page, as source lines"""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(path, runs):
+    """Median import time (ms) of a page's top-level imports, and the modules they load"""
+    code = _PROBE.format(app_dir=str(APP_DIR), imports="\n".join(page_imports(path)))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=APP_DIR)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(s["ms"] for s in samples), samples[-1]["modules"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import-time budget of every page.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per page (median is reported).")
+    parser.add_argument("--json", help="Also write the measurements to this JSON file.")
+    args = parser.parse_args(argv)
+
+    pages = [APP_DIR / "App.py", *sorted((APP_DIR / "pages").glob("[0-9]*.py"))]
+    results, failures = [], []
+    for path in pages:
+        ms, modules = measure(path, args.runs)
+        budget = BUDGET_MS.get(path.name)
+        heavy = [m for m in HEAVY_MODULES if m in modules] if path.name in LIGHT_PAGES else []
+        ok = (budget is None or ms <= budget) and not heavy
+        results.append({"page": path.name, "import_ms": ms, "budget_ms": budget, "heavy_modules": heavy, "ok": ok})
+        print(f"{'OK  ' if ok else 'FAIL'} {path.name:<20} {ms:8.1f} ms  (budget {budget} ms)" + (f"  heavy: {', '.join(heavy)}" if heavy else ""))
+        if not ok:
+            failures.append(path.name)
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Warm-up step for the recommender: fetch and prepare every model artifact before the app starts
+
+- Downloads the Hugging Face files listed in app/model_manifest.json (parallel, resumable, SHA-256 checked)
+- Derives the TF-IDF matrix, neighbour index and title index, so the first page load only memory-maps files
+
+Usage (from the project root):
+    python scripts/01_fetch_models.py
+    python scripts/01_fetch_models.py --workers 8 --verify
+    python scripts/01_fetch_models.py --pin   # record the SHA-256 of the current files in the manifest
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from model_fetch import fetch_models, pin_manifest
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch and prepare the recommender model artifacts.")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR), help="Where the artifacts live.")
+    parser.add_argument("--base-url", help="Download from this URL instead of the manifest base_url.")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel downloads.")
+    parser.add_argument("--verify", action="store_true", help="Also check files already present against the manifest.")
+    parser.add_argument("--no-derive", action="store_true", help="Only download; skip building the derived artifacts.")
+    parser.add_argument("--pin", action="store_true", help="Write the SHA-256 of the files in --model-dir into the manifest and exit.")
+    args = parser.parse_args(argv)
+
+    if args.pin:
+        for name, entry in pin_manifest(args.model_dir)["files"].items():
+            print(f"Pinned {name}: {entry['sha256']}")
+        return
+
+    start = time.perf_counter()
+    fetched = fetch_models(args.model_dir, base_url=args.base_url, workers=args.workers, verify_existing=args.verify)
+    print(f"Downloaded: {', '.join(fetched) if fetched else 'nothing (all files present)'} in {time.perf_counter() - start:.1f}s")
+
+    if not args.no_derive:
+        from artifacts import ensure_artifacts # Imports streamlit; only needed for the derived files
+
+        start = time.perf_counter()
+        version = ensure_artifacts(args.model_dir)
+        print(f"Derived artifacts ready in {time.perf_counter() - start:.1f}s (serving model version {version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Streaming cleaning pipeline (script version of notebooks/02_data_cleaning.ipynb)
+
+- Reads the raw CSV / XLSX in chunks instead of loading the whole file
+- Cleans every chunk with vectorized string operations (no row-wise apply / lambdas)
+- Drops duplicate title + type + release_year across chunks
+- Writes the cleaned CSV and typed Parquet chunk by chunk, optionally cleaning chunks in a process pool
+- Emits the genre vocabulary + sparse multi-hot genre matrix (genre_matrix.npz, see app/genres.py)
+
+Usage (from the project root):
+    python scripts/02_clean.py
+    python scripts/02_clean.py --input data/raw/netflix_titles.xlsx --chunksize 20000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from data_store import apply_schema, arrow_schema
+from genres import GenreMatrixBuilder, save_genre_matrix
+
+RAW_DIR = Path("data/raw")
+RAW_CSV = RAW_DIR / "netflix_titles.csv"
+RAW_XLSX = RAW_DIR / "netflix_titles.xlsx"
+CLEAN_DIR = Path("data/cleaned")
+CLEAN_CSV = CLEAN_DIR / "netflix_titles_clean.csv"
+CLEAN_PARQUET = CLEAN_DIR / "netflix_titles_clean.parquet"
+
+DEDUPE_KEYS = ['title', 'type', 'release_year']
+# Output columns, title first (same selection as the notebook)
+OUTPUT_COLUMNS = ['title', 'show_id', 'type', 'release_year', 'primary_country', 'genres_str', 'rating',
+                  'date_added', 'date_added_year', 'date_added_month', 'director_primary', 'cast_primary', 'metadata']
+METADATA_FIELDS = ['title', 'description', 'genres_str', 'director_primary', 'cast_primary', 'primary_country']
+
+
+# ───────────────────── Reading ─────────────────────
+def read_chunks(path, chunksize):
+    """Yield raw DataFrames of at most chunksize rows from a CSV or XLSX file"""
+    path = Path(path)
+    if path.suffix.lower() in ('.xlsx', '.xlsm'):
+        workbook = load_workbook(path, read_only=True, data_only=True) # Streams rows instead of building the whole sheet
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(c) for c in next(rows)]
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=True)
+
+
+# ───────────────────── Cleaning (vectorized, one chunk) ─────────────────────
+def first_item(series):
+    """First comma-separated item of every value, stripped (vectorized split)"""
+    return series.str.split(',', n=1).str[0].str.strip()
+
+
+def join_non_empty(frame, sep=' | '):
+    """Join the non-empty string columns of every row with sep, column by column instead of row by row"""
+    result = np.full(len(frame), '', dtype=object)
+    for col in frame.columns:
+        part = frame[col].fillna('').astype(str).to_numpy(dtype=object)
+        has_part = part != ''
+        result = np.where(has_part & (result != ''), result + sep + part, np.where(has_part, part, result))
+    return pd.Series(result, index=frame.index, dtype='string')
+
+
+def clean_chunk(df):
+    """Clean one raw chunk; same rules as notebooks/02_data_cleaning.ipynb"""
+    # Normalize column names and trim whitespace in text columns
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    for c in df.select_dtypes(include=['object', 'string']).columns:
+        df[c] = df[c].astype('string').str.strip()
+
+    # Convert date_added to datetime and extract year/month
+    if 'date_added' in df.columns:
+        df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce', format='mixed')
+        df['date_added_year'] = df['date_added'].dt.year.astype('Int64')
+        df['date_added_month'] = df['date_added'].dt.month.astype('Int64')
+
+    # Primary country
+    if 'country' in df.columns:
+        df['primary_country'] = first_item(df['country'].fillna('')).replace('', 'Unknown').astype('string')
+    else:
+        df['primary_country'] = 'Unknown'
+
+    # Parse listed_in -> genres_str ("a, b ,c" -> "a|b|c", empty items dropped)
+    if 'listed_in' in df.columns:
+        df['genres_str'] = (df['listed_in'].fillna('')
+                            .str.replace(r'\s*,\s*', '|', regex=True)
+                            .str.replace(r'\|{2,}', '|', regex=True)
+                            .str.strip('|'))
+    else:
+        df['genres_str'] = ''
+
+    # Director and cast: missing flag + first listed name (missing stays NA, as in the notebook)
+    for col in ['director', 'cast']:
+        if col in df.columns:
+            df[col] = df[col].fillna('')
+            df[f'{col}_missing'] = df[col] == ''
+            df[f'{col}_primary'] = first_item(df[col].replace('', pd.NA))
+        else:
+            df[f'{col}_missing'] = True
+            df[f'{col}_primary'] = 'Unknown'
+
+    # Numeric and categorical cleanups
+    if 'release_year' in df.columns:
+        df['release_year'] = pd.to_numeric(df['release_year'], errors='coerce').astype('Int64')
+    if 'rating' in df.columns:
+        df['rating'] = df['rating'].fillna('Not Rated').astype('string')
+    if 'type' in df.columns:
+        df['type'] = df['type'].astype('string').str.strip().str.title() # Movie / Tv Show
+
+    # Metadata text column (for TF-IDF later)
+    df['metadata'] = join_non_empty(df[[f for f in METADATA_FIELDS if f in df.columns]])
+
+    return df[[c for c in OUTPUT_COLUMNS if c in df.columns]]
+
+
+# ───────────────────── Dedupe across chunks ─────────────────────
+def drop_seen(df, seen):
+    """Drop rows whose title + type + release_year was already written (in this chunk or an earlier one) -> (rows, seen); seen: sorted key hashes written so far"""
+    keys = [k for k in DEDUPE_KEYS if k in df.columns]
+    if not keys:
+        return df, seen
+    hashes = pd.util.hash_pandas_object(df[keys], index=False).to_numpy()
+    order = np.argsort(hashes, kind='stable') # Sorted lookups walk seen in order; stable keeps the first row of a duplicate
+    ordered = hashes[order]
+    first = np.ones(len(ordered), dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    at = np.searchsorted(seen, ordered)
+    earlier = (at < len(seen)) & (seen[np.minimum(at, len(seen) - 1)] == ordered) if len(seen) else np.zeros(len(ordered), dtype=bool)
+    new = first & ~earlier
+    keep = np.zeros(len(df), dtype=bool)
+    keep[order[new]] = True
+    return df[keep], np.insert(seen, at[new], ordered[new]) # Merged in one pass, stays sorted
+
+
+# ───────────────────── Writing ─────────────────────
+class ChunkWriter:
+    """Appends cleaned chunks to the CSV and Parquet outputs (+ genre matrix rows), then moves them into place atomically"""
+
+    def __init__(self, csv_path, parquet_path=None):
+        self.csv_path, self.parquet_path = Path(csv_path), Path(parquet_path) if parquet_path else None
+        self.csv_tmp = self.csv_path.with_name(self.csv_path.name + '.tmp')
+        self.parquet_tmp = self.parquet_path.with_name(self.parquet_path.name + '.tmp') if self.parquet_path else None
+        self.parquet_writer = None
+        self.genres = GenreMatrixBuilder() # Multi-hot titles × genres rows, in written-row order
+        self.rows = 0
+
+    def write(self, df):
+        df.to_csv(self.csv_tmp, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        if self.parquet_path is not None:
+            table = pa.Table.from_pandas(apply_schema(df), schema=arrow_schema(df.columns), preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.parquet_tmp, table.schema)
+            self.parquet_writer.write_table(table)
+        self.genres.add(df['genres_str'] if 'genres_str' in df.columns else [''] * len(df))
+        self.rows += len(df)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+            os.replace(self.parquet_tmp, self.parquet_path)
+        os.replace(self.csv_tmp, self.csv_path)
+        vocab, matrix = self.genres.finish() # Written last, so it is never older than the data it indexes
+        save_genre_matrix(vocab, matrix, str(self.csv_path.parent))
+
+
+def cleaned_chunks(chunks, workers):
+    """Clean chunks in order; with workers > 1 a bounded number of chunks is in flight in a process pool"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield clean_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(clean_chunk, chunk))
+            if len(pending) >= 2 * workers: # Bounded read-ahead keeps memory flat
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run(input_path, output_csv=CLEAN_CSV, output_parquet=CLEAN_PARQUET, chunksize=50_000, workers=1):
+    """Clean input_path chunk by chunk into output_csv (+ output_parquet); returns (rows read, rows written)"""
+    Path(output_csv).parent.mkdir(parents=True, exist_ok=True)
+    writer = ChunkWriter(output_csv, output_parquet)
+    seen = np.empty(0, dtype=np.uint64)
+    rows_in = 0
+    for chunk in cleaned_chunks(read_chunks(input_path, chunksize), workers):
+        rows_in += len(chunk)
+        chunk, seen = drop_seen(chunk, seen)
+        if len(chunk):
+            writer.write(chunk)
+    if writer.rows == 0:
+        raise SystemExit(f"ERROR: no rows read from {input_path}.")
+    writer.close()
+    return rows_in, writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean the raw Netflix titles file in chunks.")
+    parser.add_argument("--input", help="Raw CSV or XLSX (default: data/raw/netflix_titles.csv, then .xlsx).")
+    parser.add_argument("--output", default=str(CLEAN_CSV), help="Cleaned CSV path.")
+    parser.add_argument("--parquet", default=str(CLEAN_PARQUET), help="Typed Parquet path ('' to skip).")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Rows per chunk.")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to clean chunks in parallel.")
+    args = parser.parse_args(argv)
+
+    input_path = args.input
+    if input_path is None:
+        if RAW_CSV.exists():
+            input_path = RAW_CSV
+        elif RAW_XLSX.exists():
+            input_path = RAW_XLSX
+        else:
+            raise SystemExit("No dataset found in data/raw. Put netflix_titles.csv or netflix_titles.xlsx there.")
+
+    rows_in, rows_out = run(input_path, args.output, args.parquet or None, args.chunksize, args.workers)
+    print(f"Cleaned {input_path}: rows before = {rows_in}, after dedupe = {rows_out}, removed = {rows_in - rows_out}")
+    print("Saved:", args.output, "and", args.parquet if args.parquet else "(no Parquet)", "+ genre matrix")
+
+
+if __name__ == "__main__":
+    main()
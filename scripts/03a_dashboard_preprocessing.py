@@ -1,45 +1,220 @@
+import argparse
+import os
+import sys
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from data_store import apply_schema, read_clean
+from genres import build_genre_matrix, genre_counts, load_genre_matrix
+
 clean_path = Path("data/cleaned/netflix_titles_clean.csv")
 out_dir = Path("data/cleaned")
-out_dir.mkdir(parents=True, exist_ok=True)
-
-if not clean_path.exists():
-    raise SystemExit(f"ERROR: cleaned CSV not found at {clean_path}. Run notebooks/02 first.")
-
-df = pd.read_csv(clean_path)
-
-# Aggregation 1: Titles added by year/type
-agg_by_year_type = (
-    df.groupby(['date_added_year', 'type']) # Group by year and type
-      .size() # Counts occurrences in each group
-      .reset_index(name='count') # Convert Series to DataFrame
-      .sort_values(['date_added_year','type']) # Sort by year and type
-)
-agg_by_year_type.to_csv(out_dir / "agg_by_year_type.csv", index=False)
-
-# Aggregation 2: Titles by genre (exploded)
-df_genres = df.dropna(subset=['genres_str']).copy() # Drop rows with NaN genres
-df_genres['genres_list'] = df_genres['genres_str'].str.split('|') # Split pipe-joined genres into lists
-df_genres = df_genres.explode('genres_list') # Explode lists into separate rows
-# Now aggregate by genre
-agg_by_genre = (
-    df_genres['genres_list'].value_counts() # Count occurrences of each genre
-    .reset_index() # Convert Series to DataFrame
-    .rename(columns={'index': 'genre', 'genres_list': 'count'}) # Rename columns
-)
-agg_by_genre.to_csv(out_dir / "agg_by_genre.csv", index=False)
-
-# Aggregation 3: Titles by primary country (top N)
-agg_by_country = (
-    df['primary_country'].value_counts()
-      .reset_index() # Convert Series to DataFrame
-      .rename(columns={'index':'primary_country','primary_country':'count'})
-)
-agg_by_country.to_csv(out_dir / "agg_by_country.csv", index=False)
-
-print("Saved helper files:")
-print("-", out_dir / "agg_by_year_type.csv")
-print("-", out_dir / "agg_by_genre.csv")
-print("-", out_dir / "agg_by_country.csv")
+state_dir = out_dir / "agg_state" # Per-title snapshot + running counts, used by incremental refreshes
+titles_dir = state_dir / "titles" # Snapshot split by show_id hash: a refresh rewrites only the partitions it touches
+SNAPSHOT_PARTITIONS = 64
+
+KEY = 'show_id'
+AGG_COLUMNS = ['date_added_year', 'type', 'genres_str', 'primary_country']
+COUNT_KEYS = {'year_type': ['date_added_year', 'type'], 'genre': ['genres_str'], 'country': ['primary_country']}
+
+
+# ───────────────────── Counting ─────────────────────
+def count_rows(df, genres=None):
+    """Aggregate counts contributed by a set of rows -> {'year_type', 'genre', 'country'} Series; genres: their (vocab, genre matrix) when known"""
+    # Aggregation 1: Titles added by year/type
+    year_type = df.dropna(subset=['date_added_year', 'type'])
+    year_type = (
+        year_type.assign(date_added_year=year_type['date_added_year'].astype(int), type=year_type['type'].astype(str))
+        .groupby(['date_added_year', 'type']) # Group by year and type
+        .size() # Counts occurrences in each group
+    )
+
+    # Aggregation 2: Titles by genre (column sums of the multi-hot genre matrix; no split / explode)
+    vocab, genre_matrix = genres if genres is not None else build_genre_matrix(df['genres_str'])
+    genre = pd.Series(genre_counts(genre_matrix), index=pd.Index(vocab, name='genres_str'), name='count')
+    genre = genre[genre > 0]
+
+    # Aggregation 3: Titles by primary country
+    country = df['primary_country'].dropna().astype(str).value_counts()
+
+    return {'year_type': year_type, 'genre': genre, 'country': country}
+
+
+def apply_delta(counts, added, removed):
+    """Running counts + contributions of added rows - contributions of removed rows (zero counts dropped)"""
+    plus, minus = count_rows(added), count_rows(removed)
+    result = {}
+    for name, series in counts.items():
+        merged = series.add(plus[name], fill_value=0).sub(minus[name], fill_value=0)
+        result[name] = merged[merged > 0].astype(int).sort_index()
+    return result
+
+
+def same_counts(a, b):
+    """True when two sets of running counts are identical"""
+    return all(a[name].sort_index().astype(int).to_dict() == b[name].sort_index().astype(int).to_dict() for name in COUNT_KEYS)
+
+
+# ───────────────────── Output files ─────────────────────
+def atomic_write(df, path):
+    """Write to a temp file next to the target, then rename over it (readers never see a partial file)"""
+    tmp = path.with_name(path.name + '.tmp')
+    if path.suffix == '.parquet':
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def write_outputs(counts):
+    """Write the helper tables read by the Dashboards page"""
+    agg_by_year_type = (
+        counts['year_type'].rename('count').reset_index() # Convert Series to DataFrame
+        .sort_values(['date_added_year', 'type']) # Sort by year and type
+    )
+    # Genre / country files keep the header the original value_counts() + rename produced: 'count,count'
+    agg_by_genre = counts['genre'].sort_index().sort_values(ascending=False, kind='stable').reset_index()
+    agg_by_genre.columns = ['count', 'count']
+    agg_by_country = counts['country'].sort_index().sort_values(ascending=False, kind='stable').reset_index()
+    agg_by_country.columns = ['count', 'count']
+
+    atomic_write(agg_by_year_type, out_dir / "agg_by_year_type.csv")
+    atomic_write(agg_by_genre, out_dir / "agg_by_genre.csv")
+    atomic_write(agg_by_country, out_dir / "agg_by_country.csv")
+    print("Saved helper files:")
+    print("-", out_dir / "agg_by_year_type.csv")
+    print("-", out_dir / "agg_by_genre.csv")
+    print("-", out_dir / "agg_by_country.csv")
+
+
+# ───────────────────── Persisted state ─────────────────────
+def partition_of(ids):
+    """Snapshot partition of each show_id (stable hash: a title always lives in the same file)"""
+    hashes = pd.util.hash_pandas_object(pd.Series(ids, dtype='string').astype(str), index=False).to_numpy()
+    return (hashes % SNAPSHOT_PARTITIONS).astype(int)
+
+
+def partition_path(partition):
+    return titles_dir / f'part-{partition:03d}.parquet'
+
+
+def save_snapshot(snapshot, partitions=None):
+    """Write the snapshot rows of the given partitions (all when None); partitions left empty are removed"""
+    titles_dir.mkdir(parents=True, exist_ok=True)
+    snapshot = apply_schema(snapshot[[KEY] + AGG_COLUMNS].reset_index(drop=True))
+    buckets = partition_of(snapshot[KEY])
+    for partition in (range(SNAPSHOT_PARTITIONS) if partitions is None else partitions):
+        rows, path = snapshot[buckets == partition], partition_path(partition)
+        if len(rows):
+            atomic_write(rows, path)
+        elif path.exists():
+            path.unlink()
+
+
+def load_snapshot(partitions=None):
+    """Snapshot rows of the given partitions (all when None)"""
+    paths = [partition_path(p) for p in (range(SNAPSHOT_PARTITIONS) if partitions is None else partitions)]
+    frames = [pd.read_parquet(path) for path in paths if path.exists()]
+    return apply_schema(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[KEY] + AGG_COLUMNS))
+
+
+def save_counts(counts):
+    """Persist the running counts (one small file per aggregate)"""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    for name, series in counts.items():
+        atomic_write(series.rename('count').reset_index(), state_dir / f'{name}.parquet')
+
+
+def load_counts():
+    """Running counts from the last run, or None when there is no (current) incremental state"""
+    if not titles_dir.is_dir() or not all((state_dir / f'{name}.parquet').exists() for name in COUNT_KEYS):
+        return None
+    return {name: pd.read_parquet(state_dir / f'{name}.parquet').set_index(keys)['count'] for name, keys in COUNT_KEYS.items()}
+
+
+def fingerprint(df):
+    """One hash per row over the aggregated columns, used to spot changed titles"""
+    return pd.util.hash_pandas_object(df[AGG_COLUMNS].astype(str), index=False).to_numpy()
+
+
+def diff_against_snapshot(snapshot, current):
+    """Rows of current that are new or changed, and show_ids of snapshot rows that disappeared"""
+    old_hash = pd.Series(fingerprint(snapshot), index=snapshot[KEY])
+    new_hash = fingerprint(current)
+    changed = current[old_hash.reindex(current[KEY]).to_numpy() != new_hash] # NaN (new id) never equals a hash
+    removed_ids = snapshot.loc[~snapshot[KEY].isin(current[KEY]), KEY]
+    return changed, removed_ids
+
+
+# ───────────────────── Full / incremental runs ─────────────────────
+def full_rebuild():
+    """Recompute every aggregate from the whole cleaned dataset and reset the incremental state"""
+    if not clean_path.exists():
+        raise SystemExit(f"ERROR: cleaned CSV not found at {clean_path}. Run notebooks/02 first.")
+    df = read_clean([KEY] + AGG_COLUMNS, str(out_dir)) # Typed columns, only what the aggregations use
+    counts = count_rows(df, load_genre_matrix(str(out_dir))) # Genre counts from the persisted genre matrix
+    (state_dir / 'titles.parquet').unlink(missing_ok=True) # Single-file snapshot of older versions
+    save_snapshot(df)
+    save_counts(counts)
+    write_outputs(counts)
+    print(f"Full rebuild over {len(df)} titles.")
+    return counts
+
+
+def incremental_refresh(counts, delta_path=None, remove_path=None, verify=False):
+    """Apply only added / changed / removed titles to the running counts"""
+    if delta_path or remove_path:
+        # Explicit delta files: neither the full catalog nor the full snapshot is read
+        upserts = apply_schema(pd.DataFrame(columns=[KEY] + AGG_COLUMNS))
+        if delta_path and str(delta_path).endswith('.parquet'):
+            upserts = apply_schema(pd.read_parquet(delta_path, columns=[KEY] + AGG_COLUMNS))
+        elif delta_path:
+            upserts = apply_schema(pd.read_csv(delta_path, usecols=[KEY] + AGG_COLUMNS))
+        removed_ids = pd.Series(Path(remove_path).read_text().split(), dtype='string') if remove_path else pd.Series([], dtype='string')
+        partitions = sorted(set(partition_of(pd.concat([upserts[KEY], removed_ids]))))
+        snapshot = load_snapshot(partitions)
+    else:
+        # No delta given: diff the cleaned dataset against the snapshot by row fingerprint
+        snapshot = load_snapshot()
+        upserts, removed_ids = diff_against_snapshot(snapshot, read_clean([KEY] + AGG_COLUMNS, str(out_dir)))
+        partitions = sorted(set(partition_of(pd.concat([upserts[KEY], removed_ids]))))
+        snapshot = snapshot[np.isin(partition_of(snapshot[KEY]), partitions)]
+
+    # snapshot holds only the partitions of the touched titles; the others are neither read back nor rewritten
+    touched = snapshot[KEY].isin(upserts[KEY]) | snapshot[KEY].isin(removed_ids)
+    counts = apply_delta(counts, added=upserts, removed=snapshot[touched]) # Old versions out, new versions in
+    snapshot = apply_schema(pd.concat([snapshot[~touched], upserts], ignore_index=True)) if len(upserts) else snapshot[~touched]
+
+    if verify:
+        untouched = load_snapshot(sorted(set(range(SNAPSHOT_PARTITIONS)) - set(partitions)))
+        if not same_counts(counts, count_rows(pd.concat([untouched, snapshot], ignore_index=True))):
+            raise SystemExit("ERROR: incremental counts differ from a full recount. Run with --full.")
+
+    save_snapshot(snapshot, partitions)
+    save_counts(counts)
+    write_outputs(counts)
+    print(f"Incremental refresh: {len(upserts)} added/changed, {len(removed_ids)} removed, "
+          f"{len(partitions)} of {SNAPSHOT_PARTITIONS} snapshot partitions rewritten.")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the dashboard helper tables (agg_by_*.csv).")
+    parser.add_argument("--full", action="store_true", help="Recompute from the whole cleaned dataset (default when no state exists).")
+    parser.add_argument("--delta", help="CSV/Parquet of added or changed cleaned rows to apply without reading the full dataset.")
+    parser.add_argument("--remove", help="Text file with one show_id per line to remove.")
+    parser.add_argument("--verify", action="store_true", help="After an incremental run, recount from the tracked titles and fail on any mismatch.")
+    args = parser.parse_args(argv)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = None if args.full else load_counts()
+    if counts is None:
+        full_rebuild()
+    else:
+        incremental_refresh(counts, args.delta, args.remove, args.verify)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Build the approximate nearest-neighbour (IVF) index and report its recall against exact search
+
+- Fits TruncatedSVD + k-means lists over the served TF-IDF matrix and publishes them (ann.*.npy) as a new
+  model version on top of the current one
+- Measures recall@k and per-query latency for several nprobe values on a random sample of titles
+
+Usage (from the project root, after scripts/01_fetch_models.py):
+    python scripts/04_ann_index.py
+    python scripts/04_ann_index.py --components 256 --lists 1000 --nprobe 4 8 16 32 --queries 2000
+    python scripts/04_ann_index.py --report-only   # reuse the saved index
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from ann import ANN_INDEX_FILE, DEFAULT_COMPONENTS, build_ann_index, load_ann_index, recall_at_k, save_ann_index
+from recommender import load_tfidf_matrix, similar_titles_batch
+from registry import current_dir, discard_staging, publish_version, stage_version
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+
+
+def recall_report(index, tfidf_matrix, nprobes, k=10, queries=1000, seed=0):
+    """recall@k and mean query latency per nprobe, measured on a random sample against exact search"""
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(tfidf_matrix.shape[0], size=min(queries, tfidf_matrix.shape[0]), replace=False)
+    exact, _ = similar_titles_batch(tfidf_matrix, sample, k)
+    rows = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        approx, _ = index.search(tfidf_matrix, sample, k, nprobe=nprobe)
+        latency_ms = (time.perf_counter() - start) / len(sample) * 1000
+        rows.append((nprobe, recall_at_k(approx, exact, k), latency_ms))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the ANN index and report recall@k against exact search.")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR), help="Where the artifacts live.")
+    parser.add_argument("--components", type=int, default=DEFAULT_COMPONENTS, help="TruncatedSVD dimensions.")
+    parser.add_argument("--lists", type=int, help="Number of IVF lists (default ~sqrt(N)).")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="nprobe values to report.")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (recall@k).")
+    parser.add_argument("--queries", type=int, default=1000, help="Sampled query titles.")
+    parser.add_argument("--report-only", action="store_true", help="Load the saved index instead of rebuilding it.")
+    args = parser.parse_args(argv)
+
+    served = current_dir(args.model_dir)
+    tfidf_matrix = load_tfidf_matrix(served)
+    if args.report_only:
+        index = load_ann_index(served)
+    else:
+        start = time.perf_counter()
+        index = build_ann_index(tfidf_matrix, args.components, args.lists)
+        staging = stage_version(args.model_dir, exclude=[ANN_INDEX_FILE]) # Every other component is shared with the current version
+        try:
+            save_ann_index(staging, index)
+            version = publish_version(args.model_dir, staging, note=f"ANN index ({index.n_lists} lists)")
+        except BaseException:
+            discard_staging(staging)
+            raise
+        print(f"Built ANN index over {tfidf_matrix.shape[0]} titles ({index.n_lists} lists, "
+              f"{index.components.shape[0]} dims) in {time.perf_counter() - start:.1f}s; published as version {version}")
+
+    print(f"{'nprobe':>6}  recall@{args.k:<3}  ms/query")
+    for nprobe, recall, latency_ms in recall_report(index, tfidf_matrix, args.nprobe, args.k, args.queries):
+        print(f"{nprobe:>6}  {recall:>9.3f}  {latency_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
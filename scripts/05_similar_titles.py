@@ -0,0 +1,154 @@
+"""
+Batch "similar titles" table for the whole catalog
+
+- Scores the TF-IDF matrix in row blocks (block x N sparse products, never N x N)
+- Spreads the blocks over a process pool; each worker memory-maps the matrix and holds one dense block at a time
+- Writes one part file per block, so an interrupted run resumes from the missing blocks
+- Merges the parts into a neighbour table keyed by show_id (Parquet or CSV) and reports titles per second
+
+Usage (from the project root, after scripts/01_fetch_models.py):
+    python scripts/05_similar_titles.py
+    python scripts/05_similar_titles.py --k 20 --workers 8 --max-block-mb 256 --output data/cleaned/similar_titles.csv
+    python scripts/05_similar_titles.py --restart   # ignore parts from an earlier run
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from recommender import load_tfidf_matrix, similar_titles_batch
+from registry import current_dir
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+OUTPUT = Path("data/cleaned/similar_titles.parquet")
+
+# Set once per worker process by init_worker
+_matrix = None
+_show_ids = None
+
+
+# ───────────────────── Inputs ─────────────────────
+def catalog_show_ids(model_dir):
+    """show_id of every TF-IDF row (data reference order)"""
+    from artifacts import catalog_details # Imports streamlit; only needed here
+
+    df_ref = joblib.load(Path(model_dir) / "data_reference.pkl")
+    details = catalog_details(df_ref, ["show_id"])
+    if details is None:
+        raise SystemExit("ERROR: data reference has no show_id and does not line up with the cleaned dataset.")
+    return details["show_id"].astype(str).to_numpy()
+
+
+def rows_per_block(n_rows, max_block_mb):
+    """Rows whose dense float32 score block (rows x N) fits in max_block_mb"""
+    return max(1, int(max_block_mb * 2**20 // (4 * n_rows)))
+
+
+# ───────────────────── Workers ─────────────────────
+def init_worker(model_dir, show_ids):
+    global _matrix, _show_ids
+    _matrix = load_tfidf_matrix(str(model_dir), mmap_mode="r") # Shared through the OS page cache
+    _show_ids = show_ids
+
+
+def run_block(start, stop, k, part_path):
+    """Top-k neighbours of rows [start, stop), written to part_path; returns the number of titles"""
+    rows = np.arange(start, stop)
+    indices, scores = similar_titles_batch(_matrix, rows, k, block_size=stop - start)
+    valid = indices >= 0
+    table = pd.DataFrame({
+        "show_id": np.repeat(_show_ids[rows], k)[valid.ravel()],
+        "rank": np.tile(np.arange(1, k + 1, dtype=np.int16), len(rows))[valid.ravel()],
+        "similar_show_id": _show_ids[indices[valid]],
+        "score": scores[valid].astype(np.float32),
+    })
+    tmp = part_path.with_name(part_path.name + ".tmp")
+    table.to_parquet(tmp, index=False)
+    os.replace(tmp, part_path) # A part exists only once complete: resuming never reads half a block
+    return stop - start
+
+
+# ───────────────────── Run ─────────────────────
+def prepare_parts_dir(parts_dir, meta, restart):
+    """Create the parts folder, or check that existing parts come from the same settings"""
+    meta_path = parts_dir / "meta.json"
+    if restart and parts_dir.exists():
+        shutil.rmtree(parts_dir)
+    if meta_path.exists():
+        if json.loads(meta_path.read_text()) != meta:
+            raise SystemExit(f"ERROR: {parts_dir} holds parts from other settings. Run with --restart.")
+    else:
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(json.dumps(meta))
+
+
+def merge_parts(parts, output):
+    """Concatenate the part files into the final neighbour table (Parquet or CSV by suffix)"""
+    table = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    tmp = output.with_name(output.name + ".tmp")
+    if output.suffix == ".parquet":
+        table.to_parquet(tmp, index=False)
+    else:
+        table.to_csv(tmp, index=False)
+    os.replace(tmp, output)
+    return len(table)
+
+
+def run(model_dir=MODEL_DIR, output=OUTPUT, k=10, workers=1, max_block_mb=64, restart=False):
+    model_dir = Path(current_dir(str(model_dir))) # The served model version; parts never mix two versions
+    matrix = load_tfidf_matrix(str(model_dir))
+    n_rows = matrix.shape[0]
+    show_ids = catalog_show_ids(model_dir)
+    block = rows_per_block(n_rows, max_block_mb)
+    blocks = [(start, min(start + block, n_rows)) for start in range(0, n_rows, block)]
+
+    output = Path(output)
+    parts_dir = output.with_name(output.stem + "_parts")
+    prepare_parts_dir(parts_dir, {"n_rows": n_rows, "k": k, "block": block, "models": model_dir.name}, restart)
+    parts = [parts_dir / f"part-{i:05d}.parquet" for i in range(len(blocks))]
+    todo = [(b, p) for b, p in zip(blocks, parts) if not p.exists()]
+    print(f"{n_rows} titles, {len(blocks)} blocks of {block} rows: {len(blocks) - len(todo)} done, {len(todo)} to go")
+
+    start_time, done = time.perf_counter(), 0
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=init_worker, initargs=(model_dir, show_ids)) as pool:
+        pending = deque()
+        for (lo, hi), part in todo:
+            pending.append(pool.submit(run_block, lo, hi, k, part))
+            if len(pending) >= 2 * workers: # Bounded queue: at most 2 blocks in flight per worker
+                done += pending.popleft().result()
+        while pending:
+            done += pending.popleft().result()
+    elapsed = time.perf_counter() - start_time
+    if done:
+        print(f"Scored {done} titles in {elapsed:.1f}s ({done / elapsed:,.0f} titles/s)")
+
+    rows = merge_parts(parts, output)
+    shutil.rmtree(parts_dir)
+    print(f"Saved {output} ({rows} rows, top {k} per show_id)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the top-k similar titles of every title.")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR), help="Where the TF-IDF artifacts live.")
+    parser.add_argument("--output", default=str(OUTPUT), help="Neighbour table (.parquet or .csv).")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per title.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--max-block-mb", type=float, default=64, help="Memory for one dense score block per worker.")
+    parser.add_argument("--restart", action="store_true", help="Discard parts left by an interrupted run.")
+    args = parser.parse_args(argv)
+    run(Path(args.model_dir), args.output, args.k, args.workers, args.max_block_mb, args.restart)
+
+
+if __name__ == "__main__":
+    main()
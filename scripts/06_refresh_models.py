@@ -0,0 +1,80 @@
+"""
+Incremental recommender refresh: apply added / changed / removed titles without refitting the vectorizer
+
+- By default diffs the cleaned dataset against the data reference in app/models (keyed by show_id)
+- --delta / --remove apply explicit change files instead, without reading the full catalog
+- Publishes the result as a new model version (app/registry.py) and points CURRENT at it
+- Prints the rows touched, the stage timings and the drift report; exits 2 with --fail-on-drift when
+  a full refit is due
+
+Usage (from the project root, after scripts/02_clean.py):
+    python scripts/06_refresh_models.py
+    python scripts/06_refresh_models.py --delta new_rows.csv --remove removed_ids.txt
+    python scripts/06_refresh_models.py --dry-run --verify   # report only, neighbour lists checked against a full rebuild
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from data_store import apply_schema, read_clean
+from registry import version_dir
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+
+
+def read_delta(path, columns):
+    """Cleaned rows from a CSV / Parquet file, restricted to the columns the refresh uses"""
+    if str(path).endswith(".parquet"):
+        return apply_schema(pd.read_parquet(path, columns=columns))
+    return apply_schema(pd.read_csv(path, usecols=columns))
+
+
+def main(argv=None):
+    from artifacts import MODEL_FILES, ensure_artifacts
+    from model_refresh import CATALOG_COLUMNS, diff_catalog, reference_frame, refresh_models
+
+    parser = argparse.ArgumentParser(description="Apply catalog changes to the recommender artifacts without a full rebuild.")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR), help="Where the artifacts live.")
+    parser.add_argument("--delta", help="CSV/Parquet of added or changed cleaned rows to apply without reading the full dataset.")
+    parser.add_argument("--remove", help="Text file with one show_id per line to remove.")
+    parser.add_argument("--dry-run", action="store_true", help="Compute everything, write nothing.")
+    parser.add_argument("--verify", action="store_true", help="Check the patched neighbour lists against a full rebuild (all-pairs, small catalogs only).")
+    parser.add_argument("--fail-on-drift", action="store_true", help="Exit with status 2 when the drift report asks for a full refit.")
+    args = parser.parse_args(argv)
+
+    removed = Path(args.remove).read_text().split() if args.remove else []
+    if args.delta or args.remove:
+        upserts = read_delta(args.delta, CATALOG_COLUMNS) if args.delta else pd.DataFrame(columns=CATALOG_COLUMNS)
+    else:
+        catalog = read_clean(CATALOG_COLUMNS)
+        served = version_dir(args.model_dir, ensure_artifacts(args.model_dir))
+        df_ref = reference_frame(joblib.load(Path(served) / MODEL_FILES["data_ref"]), catalog)
+        upserts, removed = diff_catalog(df_ref, catalog)
+
+    report = refresh_models(upserts, removed, args.model_dir, dry_run=args.dry_run, verify=args.verify)
+    timings = "  ".join(f"{name} {seconds:.2f}s" for name, seconds in report.pop("timings").items())
+    drift = report.pop("drift")
+    print(f"{'Dry run' if args.dry_run else 'Refreshed'}: {report['titles']} titles, {report['added']} added, "
+          f"{report['changed']} changed, {report['removed']} removed, {report['details_only']} details only; "
+          f"{report['lists_rebuilt']} neighbour lists rebuilt, {report['lists_checked']} patched")
+    print(f"Timings: {timings}")
+    if "version" in report:
+        print(f"Published and activated model version {report['version']}")
+    if "verified" in report:
+        print(f"Verify: {report['verified']:.2%} of neighbour scores match a full rebuild")
+    print("Drift since last fit: " + json.dumps({k: round(v, 4) for k, v in drift.items() if isinstance(v, float)}))
+    if drift["needs_refit"]:
+        print("Full refit recommended: " + "; ".join(drift["reasons"]))
+        if args.fail_on_drift:
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
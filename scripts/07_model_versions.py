@@ -0,0 +1,83 @@
+"""
+Model version registry: list, inspect, verify, roll forward / back and prune the published versions
+
+- Versions live in app/models/versions/<id>/ with a manifest.json (hashes, row counts, schema); CURRENT names
+  the one the app serves, and switching it is a single atomic write picked up on the next rerun
+- rollback activates the parent of the current version
+
+Usage (from the project root):
+    python scripts/07_model_versions.py list
+    python scripts/07_model_versions.py show [VERSION]
+    python scripts/07_model_versions.py verify [VERSION]
+    python scripts/07_model_versions.py activate VERSION
+    python scripts/07_model_versions.py rollback
+    python scripts/07_model_versions.py prune --keep 3
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from registry import RegistryError, activate, current_version, list_versions, read_manifest, remove_versions, verify_version
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+
+
+def describe(manifest, current):
+    """One line per version: marker, id, creation time, rows, size, parent, note"""
+    size_mb = sum(f["bytes"] for c in manifest["components"].values() for f in c["files"].values()) / 2**20
+    marker = "*" if manifest["version"] == current else " "
+    return (f"{marker} {manifest['version']}  {manifest['created']}  {manifest['rows'] or '?':>8} titles  "
+            f"{size_mb:7.1f} MB  parent {manifest['parent'] or '-':<12}  {manifest['note']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the published recommender model versions.")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR), help="Where the artifacts live.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Every version, oldest first (* = served).")
+    for name, help_text in (("show", "Print a version's manifest (default: the served one)."),
+                            ("verify", "Re-hash a version's files against its manifest (default: the served one).")):
+        commands.add_parser(name, help=help_text).add_argument("version", nargs="?")
+    commands.add_parser("activate", help="Serve VERSION.").add_argument("version")
+    commands.add_parser("rollback", help="Serve the parent of the current version.")
+    commands.add_parser("prune", help="Delete old versions.").add_argument("--keep", type=int, default=3, help="Most recent versions to keep.")
+    args = parser.parse_args(argv)
+
+    model_dir = args.model_dir
+    current = current_version(model_dir)
+    version = getattr(args, "version", None) or current
+    try:
+        if version is None and args.command in ("show", "verify", "rollback"):
+            raise RegistryError("No model version published yet (run scripts/01_fetch_models.py)")
+        if args.command == "list":
+            for manifest in list_versions(model_dir):
+                print(describe(manifest, current))
+        elif args.command == "show":
+            print(json.dumps(read_manifest(model_dir, version), indent=2))
+        elif args.command == "verify":
+            problems = verify_version(model_dir, version)
+            print(f"{version}: " + ("intact" if not problems else "; ".join(problems)))
+            return 1 if problems else 0
+        elif args.command == "activate":
+            activate(model_dir, args.version)
+            print(f"Serving {args.version} (was {current})")
+        elif args.command == "rollback":
+            parent = read_manifest(model_dir, current)["parent"]
+            if parent is None:
+                raise RegistryError(f"{current} has no parent version to roll back to")
+            activate(model_dir, parent)
+            print(f"Serving {parent} (was {current})")
+        elif args.command == "prune":
+            removed = remove_versions(model_dir, args.keep)
+            print(f"Removed {len(removed)} version(s): {', '.join(removed) or '-'}")
+    except (RegistryError, FileNotFoundError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
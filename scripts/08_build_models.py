@@ -0,0 +1,70 @@
+"""
+Full recommender build: fit a new vectorizer on the cleaned dataset and publish every artifact as a model version
+
+- Streams the cleaned data in chunks (app/model_build.py); --method hashing skips the vocabulary entirely
+- The new version starts a fresh drift baseline for scripts/06_refresh_models.py
+- Prints the stage timings, peak RSS and the artifact sizes next to those of the version it replaces
+
+Usage (from the project root, after scripts/02_clean.py):
+    python scripts/08_build_models.py
+    python scripts/08_build_models.py --method hashing --n-features 262144 --chunksize 20000
+    python scripts/08_build_models.py --input data/cleaned/netflix_titles_clean.csv --no-activate
+"""
+
+import argparse
+import resource
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from registry import current_version, read_manifest
+
+MODEL_DIR = Path(__file__).resolve().parents[1] / "app" / "models"
+# Components whose size the build changes directly
+SIZE_COMPONENTS = ["tfidf_vectorizer", "tfidf_matrix", "data_reference"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def component_sizes(model_dir, version):
+    """Component -> MB on disk in a published version"""
+    components = read_manifest(model_dir, version)["components"]
+    return {name: sum(f["bytes"] for f in c["files"].values()) / 2**20 for name, c in components.items()}
+
+
+def main(argv=None):
+    from model_build import BUILD_METHODS, DEFAULT_CHUNKSIZE, MAX_FEATURES, build_models
+    from recommender import HASHING_FEATURES
+
+    parser = argparse.ArgumentParser(description="Fit the recommender on the cleaned dataset and publish a new model version.")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR), help="Where the artifacts live.")
+    parser.add_argument("--input", help="Cleaned CSV / Parquet to build from (default: the cleaned dataset).")
+    parser.add_argument("--method", choices=BUILD_METHODS, default="tfidf", help="tfidf: fitted vocabulary; hashing: no vocabulary.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk.")
+    parser.add_argument("--max-features", type=int, default=MAX_FEATURES, help="Vocabulary size (tfidf).")
+    parser.add_argument("--n-features", type=int, default=HASHING_FEATURES, help="Hashed columns (hashing).")
+    parser.add_argument("--no-activate", action="store_true", help="Publish without serving it (see scripts/07_model_versions.py activate).")
+    args = parser.parse_args(argv)
+
+    previous = current_version(args.model_dir)
+    report = build_models(args.model_dir, args.method, args.input, args.chunksize, args.max_features, args.n_features,
+                          activate=not args.no_activate)
+    timings = "  ".join(f"{name} {seconds:.2f}s" for name, seconds in report["timings"].items())
+    print(f"Built {report['titles']} titles with {report['method']}: {report['columns']} columns "
+          f"({report['vocabulary']} in use), {report['nnz']:,} non-zeros")
+    print(f"Timings: {timings}")
+    print(f"Peak RSS: {peak_rss_mb():,.0f} MB")
+    print(f"Published model version {report['version']}" + (" (not activated)" if args.no_activate else ""))
+    if previous is not None and previous != report["version"]:
+        before, after = component_sizes(args.model_dir, previous), component_sizes(args.model_dir, report["version"])
+        for name in SIZE_COMPONENTS:
+            print(f"  {name:<17} {before.get(name, 0):8.2f} MB -> {after.get(name, 0):8.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
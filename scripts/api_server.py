@@ -0,0 +1,45 @@
+"""
+Serve the recommendation HTTP / JSON API on its own (see app/api.py for the endpoints)
+
+Usage (from the project root, after scripts/01_fetch_models.py):
+    python scripts/api_server.py
+    python scripts/api_server.py --host 0.0.0.0 --port 8502 --max-batch 64 --max-wait-ms 2
+    curl 'http://127.0.0.1:8502/recommend?title=Breaking%20Bad&k=5'
+    curl -X POST http://127.0.0.1:8502/recommend/batch -d '{"queries": [{"title": "Ozark"}, {"q": "korean crime thriller", "k": 3}]}'
+
+`python scripts/serve.py --api-port 8502` runs the same API inside the Streamlit server process instead,
+sharing its in-memory index.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from api import MAX_BATCH, MAX_WAIT_MS, make_server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the recommendation HTTP/JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Queries coalesced into one scoring product at most.")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="How long a batch waits for more queries (0 = no waiting).")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    start = time.perf_counter()
+    health = server.service.health() # Loads the served model version before the first request
+    print(f"Model version {health['model_version']} ({health['titles']} titles) loaded in {time.perf_counter() - start:.1f}s")
+    print(f"Serving on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Start the Streamlit server and warm its caches right away, before the first visitor
+
+- Runs `streamlit run app/App.py` in this process, plus a thread that starts the app's background
+  warm-up (app/warmup.py) as soon as the Streamlit runtime exists
+- Data, figures and the recommender index land in the same st.cache_* entries the pages read, so
+  the first request on a fresh (e.g. autoscaled) instance is served at warm latency
+- With --api-port the HTTP / JSON recommendation API (app/api.py) runs in the same process and reads
+  the same cached index as the Streamlit sessions
+
+Usage (from the project root; extra arguments go to `streamlit run`):
+    python scripts/serve.py
+    python scripts/serve.py --server.port 8080 --server.headless true
+    python scripts/serve.py --api-port 8502 --server.headless true
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+sys.path.insert(0, str(APP_DIR))
+
+
+def warm_when_server_is_up(api_port=None, api_host="127.0.0.1", poll_seconds: float = 0.1) -> None:
+    """Wait for the Streamlit runtime (caches filled earlier would not be the ones sessions read), then warm up."""
+    from streamlit import runtime
+    from warmup import start_background_warmup
+
+    while not runtime.exists():
+        time.sleep(poll_seconds)
+    if api_port is not None:
+        from api import start_in_background
+
+        start_in_background(api_host, api_port)
+        print(f"API: serving on http://{api_host}:{api_port}", flush=True)
+    status = start_background_warmup()
+    status.wait()
+    for label, s in status.snapshot().items():
+        detail = f"failed: {s['error']}" if s["error"] else "ready"
+        print(f"warm-up: {label} {detail} ({s['seconds']:.1f}s)", flush=True)
+
+
+def main(argv=None):
+    import argparse
+    from streamlit.web import cli
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--api-port", type=int, help="Also serve the recommendation API on this port.")
+    parser.add_argument("--api-host", default="127.0.0.1")
+    args, streamlit_args = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    threading.Thread(target=warm_when_server_is_up, args=(args.api_port, args.api_host),
+                     name="netflix-warmup-starter", daemon=True).start()
+    sys.argv = ["streamlit", "run", str(APP_DIR / "App.py"), *streamlit_args]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())